@@ -1,3 +1,16 @@
-from .__main__ import summarize_transcript
+import typing as ty
+
+if ty.TYPE_CHECKING:
+    from .__main__ import summarize_transcript
+
+
+def __getattr__(name: str) -> ty.Any:
+    # lazily, so that importing any cc module doesn't import the whole pipeline
+    if name == "summarize_transcript":
+        from .__main__ import summarize_transcript
+
+        return summarize_transcript
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ["summarize_transcript"]
@@ -1,39 +1,61 @@
+import dataclasses
 import itertools
 import logging
+import sys
 import time
+from concurrent.futures import as_completed
 from functools import partial
 from pathlib import Path
 
-from cc import llm
+from thds.core.concurrency import contextful_threadpool_executor
+
+from cc import batch, daemon, jobs, llm, metrics, profiling, schedule, spans, stages, transcribe
 from cc.config import (
+    ConfidentConfidantConfig,
     collect_configs_root_to_file,
     interpret_dir_config,
     read_config_from_directory_hierarchy,
     resolve_prompt,
 )
-from cc.files import copy_file, create_unique_file_path, generate_new_filename, hash_file
-from cc.output_note import create_transcript_note
+from cc.files import archive_file, create_unique_file_path, generate_new_filename, hash_file
+from cc.output_note import create_transcript_note, remove_stale_partials, write_streamed_text
+from cc.transcribe import gc
 from cc.vault import (
     VaultIndex,
+    VaultIndexCache,
     build_vault_index,
     extract_prompt_tags,
+    find_link_context,
     find_linking_notes,
     find_vault_root,
     link_line_has_tag,
     replace_links_in_notes,
+    replace_note_links,
 )
-from cc.transcribe import transcribe_audio_file
 
 logger = logging.getLogger(__name__)
 
 
+def _summarize_config(transcript_path: Path) -> tuple[ConfidentConfidantConfig, str]:
+    """The config for summarizing the transcript, and the prompt to summarize it with."""
+    # looked up by directory, so that a batch reads each directory's configs once
+    tconfig = read_config_from_directory_hierarchy(transcript_path.parent)
+    return tconfig, resolve_prompt(collect_configs_root_to_file(transcript_path.parent), [])
+
+
+def _summarize_settings(transcript_path: Path) -> dict[str, str]:
+    """What, besides the transcript, decides its summary (see cc.batch)."""
+    tconfig, prompt = _summarize_config(transcript_path.resolve())
+    return {"model": tconfig.note_model, "prompt": prompt, "context": tconfig.transcription_context}
+
+
 def summarize_transcript(transcript_path: Path, output_path: Path | None = None) -> Path:
     """Summarize an existing transcript file and write the result to a markdown file.
 
     Args:
         transcript_path: Path to the transcript .txt file to summarize
-        output_path: Optional output file path. If not provided, generates a filename
-                    using the same pattern as audio processing: {timestamp}_{title}.md
+        output_path: Optional output file path. If not provided (or a directory), generates a
+                    filename using the same pattern as audio processing: {timestamp}_{title}.md
 
     Returns:
         Path to the created markdown file
@@ -55,65 +77,97 @@ def summarize_transcript(transcript_path: Path, output_path: Path | None = None)
         raise ValueError("Transcript file is empty")
 
     # Load config from directory hierarchy
-    tconfig = read_config_from_directory_hierarchy(transcript_path)
-    prompt = resolve_prompt(collect_configs_root_to_file(transcript_path), [])
+    tconfig, prompt = _summarize_config(transcript_path)
 
     # Perform the summarization
     logger.info(f"Generating summary using model: {tconfig.note_model}")
-    title, note_content = llm.summarize.summarize_transcript(
+    title, note_body = llm.summarize.stream_transcript_note(
         ll_model=tconfig.note_model,
         transcript=transcript_content,
         prompt=prompt,
         context=tconfig.transcription_context,
+        long_transcript_tokens=tconfig.long_transcript_tokens,
     )
 
     # Determine output path
-    if output_path is None:
+    if output_path is None or output_path.is_dir():
         filename_base = generate_new_filename(tconfig.datetime_fmt, transcript_path, title)
-        output_path = transcript_path.parent / f"{filename_base}.md"
+        output_path = (output_path or transcript_path.parent).resolve() / f"{filename_base}.md"
     else:
         output_path = output_path.resolve()
 
-    # Write the note
-    full_content = f"# {title}\n\n{note_content}"
-    output_path.write_text(full_content, encoding="utf-8")
+    # Write the note as it is generated
+    write_streamed_text(output_path, itertools.chain([f"# {title}\n\n"], note_body))
     logger.info(f"Summary written to: {output_path}")
 
     return output_path
 
 
+def _resumable(job: jobs.Job) -> bool:
+    """The recording is still the one whose note was written, and the note is still there."""
+    return (
+        job.audio_path.exists()
+        and hash_file(job.audio_path) == job.sha256
+        and job.note_path is not None
+        and job.note_path.exists()
+    )
+
+
+def _link_and_archive(
+    index: VaultIndex,
+    vault_root: Path,
+    dry_run: bool,
+    journal: jobs.Journal,
+    job: jobs.Job,
+    linking_notes: list[Path],
+) -> Path:
+    """Point the links at the new note and audio, then move the audio there."""
+    assert job.note_path and job.new_audio_path and job.title is not None
+    with stages.stage(stages.VAULT):
+        # Verify file integrity before final operations (cheap unless the file has changed)
+        if hash_file(job.audio_path) != job.sha256:
+            raise ValueError(f"File hash changed during processing for {job.audio_path.name}, aborting")
+
+        if job.stage != jobs.LINKED:
+            replace_links_in_notes(
+                index,
+                vault_root,
+                linking_notes,
+                job.audio_path,
+                job.note_path,
+                job.title,
+                dry_run=dry_run,
+            )
+            journal.advance(job.audio_path, jobs.LINKED)
+        archive_file(job.audio_path, job.new_audio_path, job.sha256, dry_run=dry_run)
+        journal.advance(job.audio_path, jobs.ARCHIVED)
+
+    logger.info(f"Successfully processed {job.audio_path} -> {job.note_path.relative_to(vault_root)}")
+    return job.note_path
+
+
 def process_audio_file(
     index: VaultIndex, vault_root: Path, dry_run: bool, audio_path: Path
 ) -> None | Path:
     """Process a single audio file through the complete workflow.
 
     All configuration for this is read from the directory hierarchy of the audio file.
+
+    Progress is recorded in the vault's journal (see cc.jobs), so a recording whose note was
+    written by a run that died is finished off, rather than getting a second note.
     """
     if vault_root / ".trash" in audio_path.parents:
         return None
 
-    audio_filename = audio_path.name
-    tconfig = read_config_from_directory_hierarchy(audio_path)
+    with spans.span(
+        spans.RECORDING, audio=audio_path.name, bytes=audio_path.stat().st_size, dry_run=dry_run
+    ) as s:
+        note = _process_audio_file(index, vault_root, dry_run, audio_path)
+        s.set(processed=note is not None)
+        return note
 
-    if dry_run:
-        print(tconfig)
 
-    if tconfig.skip_dir:
-        return None
-
-    linking_notes = find_linking_notes(index, vault_root, audio_path)
-    if not linking_notes:
-        logger.info(f"No notes link to {audio_path}; we will leave this one untranscribed.")
-        return None
-
-    if any(
-        link_line_has_tag(index, in_md_file=note, target_file=audio_path, tag="#diarize")
-        for note in linking_notes
-    ):
-        logger.info(f"Skipping {audio_path} - tagged #diarize (use coco-meeting instead)")
-        return None
-
-    # extract prompt tags from link lines and resolve hierarchical prompt
+def _prompt_tags(index: VaultIndex, audio_path: Path, linking_notes: list[Path]) -> list[str]:
     prompt_tags: list[str] = []
     seen: set[str] = set()
     for note in linking_notes:
@@ -121,65 +175,330 @@ def process_audio_file(
             if tag not in seen:
                 prompt_tags.append(tag)
                 seen.add(tag)
-    prompt = resolve_prompt(collect_configs_root_to_file(audio_path), prompt_tags)
-
-    logger.info(f"Processing audio file: {audio_path}")
-    original_audio_hash = hash_file(audio_path)
-
-    transcript_file = transcribe_audio_file(
+    return prompt_tags
+
+
+_PROVISIONAL_BODY = """> [!note] The summary is on its way
+> This is the raw transcript. coco replaces this note with the summarized one once it is ready.
+
+# Transcript
+
+{transcript}"""
+
+
+def _write_provisional_note(
+    index: VaultIndex,
+    vault_root: Path,
+    journal: jobs.Journal,
+    tconfig: ConfidentConfidantConfig,
+    audio_path: Path,
+    sha256: str,
+    transcript: str,
+    linking_notes: list[Path],
+    prompt_tags: list[str],
+) -> jobs.Job:
+    """Write a note with just the raw transcript, and point the links at it for now."""
+    title = f"{audio_path.stem} (transcript)"
+    with stages.stage(stages.VAULT):
+        note_path = create_unique_file_path(
+            audio_path.with_suffix(".md"),
+            interpret_dir_config(vault_root, audio_path, tconfig.notes_dir),
+            generate_new_filename(tconfig.datetime_fmt, audio_path, title),
+            create=True,
+        )
+        create_transcript_note(
+            vault_root,
+            audio_path,
+            note_path,
+            title,
+            _PROVISIONAL_BODY.format(transcript=transcript),
+            sha256,
+        )
+        # journaled before the links move, so a run that dies in between leaves them to be
+        # finished off rather than pointing at a note nothing knows about
+        journal.advance(
+            audio_path,
+            jobs.PROVISIONAL,
+            title=title,
+            note_path=note_path,
+            linking_notes=linking_notes,
+            prompt_tags=prompt_tags,
+        )
+        replace_links_in_notes(index, vault_root, linking_notes, audio_path, note_path, title)
+    logger.info(f"Provisional note for {audio_path}: {note_path.relative_to(vault_root)}")
+    return jobs.Job(
         audio_path,
-        transcription_model=tconfig.transcription_model,
-        transcription_context=tconfig.transcription_context,
-        reformat_model=tconfig.reformat_model,
-        split_audio_approx_every_s=tconfig.split_audio_approx_every_s,
-        silence_threshold_db=tconfig.silence_threshold_db,
-    )
-    title, note = llm.summarize.summarize_transcript(
-        tconfig.note_model,
-        transcript=transcript_file.read_text(),
-        prompt=prompt,
-        context=tconfig.transcription_context,
+        sha256,
+        jobs.PROVISIONAL,
+        title=title,
+        note_path=note_path,
+        linking_notes=linking_notes,
+        prompt_tags=prompt_tags,
     )
 
-    filename_base = generate_new_filename(tconfig.datetime_fmt, audio_path, title)
-    new_audio_path = create_unique_file_path(
-        audio_path, interpret_dir_config(vault_root, audio_path, tconfig.audio_dir), filename_base
-    )
-    copy_file(audio_path, new_audio_path, dry_run=dry_run)
 
-    # Create transcript note
-    transcript_note_path = (
-        interpret_dir_config(vault_root, audio_path, tconfig.notes_dir) / f"{filename_base}.md"
-    )
-    create_transcript_note(
-        vault_root,
-        audio_path if dry_run else new_audio_path,
-        transcript_note_path,
-        title,
-        note,
-        original_audio_hash,
-    )
+def _rewrite_provisional_note(
+    vault_root: Path, provisional: jobs.Job, sha256: str, transcript: str
+) -> None:
+    """Bring a provisional note left by an earlier run up to date with the recording as it is now."""
+    assert provisional.note_path and provisional.title is not None
+    with stages.stage(stages.VAULT):
+        create_transcript_note(
+            vault_root,
+            provisional.audio_path,
+            provisional.note_path,
+            provisional.title,
+            _PROVISIONAL_BODY.format(transcript=transcript),
+            sha256,
+        )
+    logger.info(f"Rewrote provisional note for {provisional.audio_path}: {provisional.note_path}")
+
+
+def _replace_provisional_note(
+    index: VaultIndex,
+    vault_root: Path,
+    dry_run: bool,
+    journal: jobs.Journal,
+    provisional: jobs.Job,
+    summarized: jobs.Job,
+) -> jobs.Job:
+    """Point the links at the summarized note instead of the provisional one, then remove it."""
+    assert provisional.note_path and provisional.title is not None
+    assert summarized.note_path and summarized.title is not None
+    audio_path = provisional.audio_path
+    with stages.stage(stages.VAULT):
+        # a run that died while writing the provisional note may have left some at the audio
+        still_at_audio = [
+            note
+            for note in provisional.linking_notes
+            if find_link_context(index, in_md_file=note, target_file=audio_path)
+        ]
+        if still_at_audio:
+            replace_links_in_notes(
+                index,
+                vault_root,
+                still_at_audio,
+                audio_path,
+                summarized.note_path,
+                summarized.title,
+                dry_run=dry_run,
+            )
+        replace_note_links(
+            vault_root,
+            provisional.linking_notes,
+            provisional.note_path,
+            summarized.note_path,
+            provisional.title,
+            summarized.title,
+            dry_run=dry_run,
+        )
+        journal.advance(
+            audio_path,
+            jobs.LINKED,
+            title=summarized.title,
+            note_path=summarized.note_path,
+            new_audio_path=summarized.new_audio_path,
+        )
+        if not dry_run and provisional.note_path != summarized.note_path:
+            provisional.note_path.unlink(missing_ok=True)
+    return dataclasses.replace(summarized, stage=jobs.LINKED)
 
-    # Verify file integrity before final operations
-    if hash_file(audio_path) != original_audio_hash:
-        raise ValueError(f"File hash changed during processing for {audio_filename}, aborting")
 
-    replace_links_in_notes(
-        index, vault_root, linking_notes, audio_path, transcript_note_path, title, dry_run=dry_run
-    )
-    if not dry_run:
-        logger.info(f"Removing original audio file because everything else succeeded: {audio_path}")
-        audio_path.unlink()
+def _process_audio_file(
+    index: VaultIndex, vault_root: Path, dry_run: bool, audio_path: Path
+) -> None | Path:
+    journal = jobs.Journal(vault_root, dry_run=dry_run)
+    job = journal.get(audio_path)
+    provisional: jobs.Job | None = None  # the raw-transcript note standing in for the real one
+    provisional_is_stale = False
+    if job and job.stage in (jobs.PROVISIONAL, jobs.SUMMARIZED, jobs.LINKED):
+        if not _resumable(job):
+            logger.warning(
+                f"Starting {audio_path} over: it or its note changed since it was {job.stage}"
+            )
+            if job.stage == jobs.PROVISIONAL:
+                # the links point at the provisional note, so only the journal knows which
+                # notes they are; the note itself is out of date (or gone), so it is rewritten
+                # once the recording has been transcribed again, and the links keep pointing at it
+                provisional = job
+                provisional_is_stale = True
+        elif job.stage == jobs.PROVISIONAL:
+            logger.info(f"Resuming {audio_path}, whose provisional note was written by an earlier run")
+            provisional = job
+        else:
+            logger.info(f"Resuming {audio_path}, which was {job.stage} by an earlier run")
+            with journal.recording_failures(audio_path):
+                return _link_and_archive(
+                    index,
+                    vault_root,
+                    dry_run,
+                    journal,
+                    job,
+                    find_linking_notes(index, vault_root, audio_path),
+                )
+
+    with spans.span(spans.CONFIG):
+        tconfig = read_config_from_directory_hierarchy(audio_path)
+
+    if dry_run:
+        print(tconfig)
+
+    if tconfig.skip_dir:
+        return None
+
+    if provisional:
+        linking_notes = provisional.linking_notes  # their links point at the provisional note now
+    else:
+        linking_notes = find_linking_notes(index, vault_root, audio_path)
+        if not linking_notes:
+            logger.info(f"No notes link to {audio_path}; we will leave this one untranscribed.")
+            return None
+
+        if any(
+            link_line_has_tag(index, in_md_file=note, target_file=audio_path, tag="#diarize")
+            for note in linking_notes
+        ):
+            logger.info(f"Skipping {audio_path} - tagged #diarize (use coco-meeting instead)")
+            return None
+
+    # extract prompt tags from link lines and resolve hierarchical prompt
+    with spans.span(spans.CONFIG, prompt=True):
+        prompt_tags = (
+            provisional.prompt_tags if provisional else _prompt_tags(index, audio_path, linking_notes)
+        )
+        prompt = resolve_prompt(collect_configs_root_to_file(audio_path), prompt_tags)
+
+    logger.info(f"Processing audio file: {audio_path}")
+    original_audio_hash = hash_file(audio_path)
+    if not provisional:
+        journal.discovered(audio_path, original_audio_hash)
+    elif provisional.sha256 != original_audio_hash:  # starting over a changed recording
+        journal.discovered(audio_path, original_audio_hash)
+        journal.advance(
+            audio_path,
+            jobs.PROVISIONAL,
+            title=provisional.title,
+            note_path=provisional.note_path,
+            linking_notes=provisional.linking_notes,
+            prompt_tags=provisional.prompt_tags,
+        )
+
+    with journal.recording_failures(audio_path):
+        transcript_file = transcribe.transcribe_audio_file(
+            audio_path,
+            transcription_model=tconfig.transcription_model,
+            transcription_context=tconfig.transcription_context,
+            reformat_model=tconfig.reformat_model,
+            split_audio_approx_every_s=tconfig.split_audio_approx_every_s,
+            silence_threshold_db=tconfig.silence_threshold_db,
+            pipelined=tconfig.pipelined_transcription,
+            stitch_mode=tconfig.stitch_mode,
+        )
+        transcript = transcript_file.read_text()
+        if not provisional:
+            journal.advance(audio_path, jobs.TRANSCRIBED)
+            if tconfig.provisional_note and not dry_run:
+                provisional = _write_provisional_note(
+                    index,
+                    vault_root,
+                    journal,
+                    tconfig,
+                    audio_path,
+                    original_audio_hash,
+                    transcript,
+                    linking_notes,
+                    prompt_tags,
+                )
+        elif provisional_is_stale and not dry_run:
+            _rewrite_provisional_note(vault_root, provisional, original_audio_hash, transcript)
+
+        with stages.stage(stages.LLM):
+            # the title arrives first; the rest of the note is written as it streams in, so
+            # the summarize span ends at the title, and note_write covers the rest
+            with spans.span(spans.SUMMARIZE, model=tconfig.note_model):
+                title, note = llm.summarize.stream_transcript_note(
+                    tconfig.note_model,
+                    transcript=transcript,
+                    prompt=prompt,
+                    context=tconfig.transcription_context,
+                    long_transcript_tokens=tconfig.long_transcript_tokens,
+                )
+
+            with stages.stage(stages.VAULT):
+                filename_base = generate_new_filename(tconfig.datetime_fmt, audio_path, title)
+                new_audio_path = create_unique_file_path(
+                    audio_path,
+                    interpret_dir_config(vault_root, audio_path, tconfig.audio_dir),
+                    filename_base,
+                )
+                # created (empty) right away, so no other recording can pick the same name
+                transcript_note_path = create_unique_file_path(
+                    audio_path.with_suffix(".md"),
+                    interpret_dir_config(vault_root, audio_path, tconfig.notes_dir),
+                    filename_base,
+                    create=True,
+                )
+
+            # Create transcript note; the audio is moved into place once everything else succeeded
+            try:
+                create_transcript_note(
+                    vault_root,
+                    audio_path if dry_run else new_audio_path,
+                    transcript_note_path,
+                    title,
+                    note,
+                    original_audio_hash,
+                    audio_size_bytes=audio_path.stat().st_size,
+                )
+            except BaseException:
+                transcript_note_path.unlink(missing_ok=True)  # still the empty placeholder
+                raise
+
+        summarized = jobs.Job(
+            audio_path,
+            original_audio_hash,
+            jobs.SUMMARIZED,
+            title=title,
+            note_path=transcript_note_path,
+            new_audio_path=new_audio_path,
+        )
+        if provisional:
+            linked = _replace_provisional_note(
+                index, vault_root, dry_run, journal, provisional, summarized
+            )
+            return _link_and_archive(index, vault_root, dry_run, journal, linked, linking_notes)
+
+        journal.advance(
+            audio_path,
+            jobs.SUMMARIZED,
+            title=title,
+            note_path=transcript_note_path,
+            new_audio_path=new_audio_path,
+        )
+        return _link_and_archive(index, vault_root, dry_run, journal, summarized, linking_notes)
 
-    logger.info(f"Successfully processed {audio_path} -> {transcript_note_path.relative_to(vault_root)}")
-    return transcript_note_path
 
+def process_vault_recordings(
+    process_vault_path: Path,
+    dry_run: bool,
+    limits: stages.StageLimits = stages.DEFAULT_LIMITS,
+    indexes: VaultIndexCache | None = None,
+    max_in_flight: int | None = None,
+) -> None:
+    """Main function to process all audio files in the vault.
 
-def process_vault_recordings(process_vault_path: Path, dry_run: bool) -> None:
-    """Main function to process all audio files in the vault."""
+    Recordings are processed concurrently, each moving through the stages (split,
+    transcribe, llm, vault) as slots free up; see cc.stages for the limits. At most
+    max_in_flight recordings (by default, enough to keep every stage busy) are in progress,
+    started shortest first (see cc.schedule).
+
+    Pass the same indexes to repeated runs to avoid re-listing the whole vault each time.
+    """
     vault_root = find_vault_root(process_vault_path)
-    index = build_vault_index(vault_root)
+    index = indexes.index(vault_root) if indexes else build_vault_index(vault_root)
     logger.info(f"Built vault index with {len(index)} unique file stems")
+    # notes left half-written by a run that was killed
+    remove_stale_partials(itertools.chain.from_iterable(index.values()), dry_run=dry_run)
 
     process_recording = partial(process_audio_file, index, vault_root, dry_run)
 
@@ -189,32 +508,49 @@ def process_vault_recordings(process_vault_path: Path, dry_run: bool) -> None:
     else:
         # Find all unrenamed audio recordings
         audio_patterns = ["Recording*.webm", "Recording*.m4a"]
-        all_audio_files = itertools.chain.from_iterable(  # type: ignore[assignment]
-            process_vault_path.rglob(p) for p in audio_patterns
-        )
         logger.info(f"Looking for linked audio recordings in directory: {process_vault_path}")
+        all_audio_files = schedule.shortest_first(
+            itertools.chain.from_iterable(process_vault_path.rglob(p) for p in audio_patterns)
+        )
 
     processed_count = 0
     error_count = 0
-    for audio_file in all_audio_files:
-        try:
-            if process_recording(audio_file):
-                processed_count += 1
-        except Exception as e:
-            logger.exception(f"Error processing {audio_file}: {e}")
-            error_count += 1
+    with (
+        stages.limited(limits),
+        contextful_threadpool_executor(max_workers=max_in_flight or limits.max_in_flight) as executor,
+    ):
+        futures = {executor.submit(process_recording, f): f for f in all_audio_files}
+        for future in as_completed(futures):
+            audio_file = futures[future]
+            try:
+                if future.result():
+                    processed_count += 1
+            except Exception as e:
+                logger.exception(f"Error processing {audio_file}: {e}")
+                error_count += 1
 
     msg = f"Files successfully processed: {processed_count}"
     if error_count > 0:
         msg += f"; errors encountered: {error_count}"
     if processed_count + error_count > 0:
         logger.info(msg)
+        logger.info(f"LLM usage so far: {llm.complete.USAGE}")
 
 
 def main() -> None:
     """Entry point for `cc` command - process audio recordings."""
     import argparse
 
+    if sys.argv[1:2] == ["gc"]:
+        gc.main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["daemon"]:
+        daemon.main(sys.argv[2:])
+        return
+    if sys.argv[1:2] == ["status"]:
+        jobs.main(sys.argv[2:])
+        return
+
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
     parser = argparse.ArgumentParser(
@@ -222,6 +558,11 @@ def main() -> None:
             "The (overly?) Confident Confidant. "
             "Turn audio recordings into helpful Obsidian notes with transcripts."
         ),
+        epilog=(
+            "`coco gc` trims the intermediate transcription files; see `coco gc --help`."
+            " `coco daemon` keeps coco warm in the background; see `coco daemon --help`."
+            " `coco status` shows how far each recording in a vault has got."
+        ),
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser.add_argument(
@@ -239,10 +580,98 @@ def main() -> None:
         action="store_true",
         help="Run the script in a loop, processing new files as they appear.",
     )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Always call the LLM, rather than reusing a cached response to an identical request.",
+    )
+
+    parser.add_argument(
+        "--split-workers",
+        type=int,
+        default=stages.DEFAULT_LIMITS.split,
+        help="How many recordings may be split with ffmpeg at once.",
+    )
+    parser.add_argument(
+        "--transcribe-workers",
+        type=int,
+        default=stages.DEFAULT_LIMITS.transcribe,
+        help="How many recordings may be sent for transcription at once.",
+    )
+    parser.add_argument(
+        "--llm-workers",
+        type=int,
+        default=stages.DEFAULT_LIMITS.llm,
+        help="How many recordings may be stitched or summarized by an LLM at once.",
+    )
+    parser.add_argument(
+        "--report-dir",
+        type=Path,
+        default=None,
+        help="Write a JSON report of each run's timing spans (see cc.spans) into this directory.",
+    )
+    parser.add_argument(
+        "--otlp",
+        action="store_true",
+        help="With --report-dir, also export the spans as OTLP/JSON, for OpenTelemetry collectors.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=metrics.PORT(),
+        help=(
+            "With --loop, serve Prometheus metrics at http://127.0.0.1:PORT/metrics; 0 to not."
+            " While a daemon does the work, it serves them instead."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Profile each stage with cProfile and tracemalloc (see cc.profiling), processing one"
+            " recording at a time, in this process rather than a daemon."
+        ),
+    )
 
     args = parser.parse_args()
+    if args.no_llm_cache:
+        llm.response_cache.ENABLED.set_global(False)
     process_vault_dir = args.process_vault_dir.resolve()
-    run = partial(process_vault_recordings, process_vault_dir, args.no_mutate)
+    limits = stages.StageLimits(
+        split=args.split_workers, transcribe=args.transcribe_workers, llm=args.llm_workers
+    )
+
+    report_dir = args.report_dir.resolve() if args.report_dir else None
+    indexes = VaultIndexCache()
+
+    def run() -> None:
+        if not args.profile and daemon.submit(
+            "process",
+            path=str(process_vault_dir),
+            dry_run=args.no_mutate,
+            limits=dataclasses.asdict(limits),
+            llm_cache=not args.no_llm_cache,
+            report_dir=str(report_dir) if report_dir else None,
+            otlp=args.otlp,
+        ):
+            return
+        with (
+            spans.run_report(report_dir, otlp=args.otlp),
+            metrics.observed(),
+            profiling.profiled("vault", args.profile),
+        ):
+            process_vault_recordings(
+                process_vault_dir,
+                args.no_mutate,
+                limits,
+                indexes,
+                max_in_flight=1 if args.profile else None,
+            )
+        if gc.AUTO():
+            gc.collect_workdir_garbage()
+
+    if args.loop and args.metrics_port:
+        metrics.serve(args.metrics_port)
     run()
     if args.loop:
         while True:
@@ -257,24 +686,75 @@ def main_summarize() -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
     parser = argparse.ArgumentParser(
-        description="Summarize an existing transcript file using an LLM.",
+        description="Summarize existing transcript files using an LLM.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser.add_argument(
-        "transcript_file",
-        type=Path,
-        help="Path to the transcript .txt file to summarize",
+        "transcript_files",
+        nargs="+",
+        help="Paths to the transcript .txt files to summarize, or glob patterns (see cc.batch)",
     )
     parser.add_argument(
         "--output",
         "-o",
         type=Path,
         default=None,
-        help="Output file path (default: generates {timestamp}_{title}.md in same directory)",
+        help=(
+            "Output file path, or directory (default: generates {timestamp}_{title}.md in the"
+            " transcript's directory). Must be a directory if there are several transcripts."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=batch.WORKERS(),
+        help="How many transcripts to summarize at a time.",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=None,
+        help="Record finished transcripts here, and skip those it already lists.",
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Always call the LLM, rather than reusing a cached response to an identical request.",
     )
 
     args = parser.parse_args()
-    summarize_transcript(args.transcript_file, args.output)
+    transcripts = batch.expand(args.transcript_files)
+    if not transcripts:
+        parser.error("no transcripts to summarize")
+    single = len(transcripts) == 1 and not args.manifest
+    if not single and args.output and not args.output.is_dir():
+        parser.error("--output must be a directory when summarizing several transcripts")
+
+    if single and daemon.submit(
+        "summarize",
+        transcript=str(transcripts[0].resolve()),
+        output=str(args.output.resolve()) if args.output else None,
+        llm_cache=not args.no_llm_cache,
+    ):
+        return
+    if args.no_llm_cache:
+        llm.response_cache.ENABLED.set_global(False)
+    if single:
+        summarize_transcript(transcripts[0], args.output)
+        return
+
+    summary = batch.run(
+        transcripts,
+        partial(summarize_transcript, output_path=args.output),
+        "Summarized",
+        "transcripts",
+        workers=args.workers,
+        manifest=args.manifest,
+        settings=_summarize_settings,
+    )
+    print(summary.format(), file=sys.stderr)
+    if summary.failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+"""Run `coco-summarize` or `transcribe` over many inputs in one process.
+
+Inputs are files or glob patterns (`'old/**/*.txt'`; quote them, or the shell expands them
+first). They are worked on by a bounded pool of threads; the stage limits (see cc.stages)
+still apply inside it, so a pool larger than those mostly waits. Configs are read once per
+directory, not once per input.
+
+With a manifest, every input that finishes is appended to it (a JSON object per line: the
+input, its sha256, a hash of the settings it was processed with, and its output). A later batch
+given the same manifest skips the inputs it lists whose contents and settings (e.g. the model
+and prompt) haven't changed since, so an interrupted batch picks up where it left off.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import typing as ty
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from thds.core import config
+from thds.core.concurrency import contextful_threadpool_executor
+
+from cc.files import hash_file
+
+logger = logging.getLogger(__name__)
+
+WORKERS = config.item("workers", 4)
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def expand(inputs: ty.Iterable[str]) -> list[Path]:
+    """The files named by inputs, in order, each once; glob patterns are expanded (sorted)."""
+    paths: list[Path] = []
+    seen: set[Path] = set()
+    for pattern in inputs:
+        pattern = os.path.expanduser(pattern)
+        if _GLOB_CHARS.isdisjoint(pattern):
+            matches = [Path(pattern)]  # if it doesn't exist, that's an error for its job
+        else:
+            matches = sorted(Path(p) for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+            if not matches:
+                logger.warning(f"No files match {pattern}")
+        for path in matches:
+            if (resolved := path.resolve()) not in seen:
+                seen.add(resolved)
+                paths.append(path)
+    return paths
+
+
+class Manifest:
+    """The inputs finished by earlier batches, kept in a JSON-lines file (if there is one)."""
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._done: dict[str, tuple[str, str]] = {}  # resolved input -> sha256, settings
+        self._cut_short = False  # the last line is incomplete
+        if path is None or not path.exists():
+            return
+        text = path.read_text(encoding="utf-8")
+        self._cut_short = bool(text) and not text.endswith("\n")
+        for line in text.splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # e.g. cut short by the interruption
+            self._done[entry["input"]] = entry["sha256"], entry.get("settings", "")
+
+    def done(self, input_path: Path, sha256: str, settings: str) -> bool:
+        return self._done.get(str(input_path.resolve())) == (sha256, settings)
+
+    def record(self, input_path: Path, sha256: str, settings: str, output: Path | None) -> None:
+        if self.path is None:
+            return
+        entry = {
+            "input": str(input_path.resolve()),
+            "sha256": sha256,
+            "settings": settings,
+            "output": str(output or ""),
+        }
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(("\n" if self._cut_short else "") + json.dumps(entry) + "\n")
+            self._cut_short = False
+            self._done[entry["input"]] = sha256, settings
+
+
+def settings_hash(settings: ty.Mapping[str, ty.Any]) -> str:
+    """A short hash of the (JSON-serializable) settings an input is processed with."""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class Summary:
+    verb: str  # past tense, e.g. "Summarized"
+    noun: str  # plural, e.g. "transcripts"
+    finished: list[tuple[Path, Path | None]] = field(default_factory=list)  # input, output
+    failed: list[tuple[Path, str]] = field(default_factory=list)  # input, error
+    skipped: list[Path] = field(default_factory=list)  # finished by an earlier batch
+    elapsed_s: float = 0.0
+
+    def format(self) -> str:
+        per_minute = len(self.finished) / self.elapsed_s * 60 if self.elapsed_s else 0.0
+        lines = [
+            (
+                f"{self.verb} {len(self.finished)} {self.noun} in {self.elapsed_s:.1f}s"
+                f" ({per_minute:.1f}/min); {len(self.failed)} failed,"
+                f" {len(self.skipped)} skipped as already done"
+            )
+        ]
+        lines += [f"  {path}: {error}" for path, error in self.failed]
+        return "\n".join(lines)
+
+
+def run(
+    inputs: ty.Sequence[Path],
+    work: ty.Callable[[Path], Path | None],
+    verb: str,
+    noun: str,
+    workers: int | None = None,
+    manifest: Path | None = None,
+    settings: ty.Callable[[Path], ty.Mapping[str, ty.Any]] | None = None,
+) -> Summary:
+    """Call work on each input (that the manifest doesn't list as done) through a pool of
+    threads, and return a summary of how it went. One input failing doesn't stop the rest.
+
+    settings gives what, besides its contents, decides an input's output; an input the
+    manifest lists is only done if those haven't changed either.
+    """
+    done = Manifest(manifest)
+    summary = Summary(verb, noun)
+    start = time.monotonic()
+
+    def one(input_path: Path) -> None:
+        try:
+            sha256 = hash_file(input_path)
+            settings_key = settings_hash(settings(input_path)) if settings else ""
+            if done.done(input_path, sha256, settings_key):
+                logger.info(f"Skipping {input_path}: done by an earlier batch")
+                summary.skipped.append(input_path)
+                return
+            output = work(input_path)
+        except Exception as e:
+            logger.exception(f"Failed on {input_path}")
+            summary.failed.append((input_path, f"{type(e).__name__}: {e}"))
+            return
+        done.record(input_path, sha256, settings_key, output)
+        summary.finished.append((input_path, output))
+
+    with contextful_threadpool_executor(max_workers=workers or WORKERS()) as executor:
+        list(executor.map(one, inputs))
+
+    summary.elapsed_s = time.monotonic() - start
+    return summary
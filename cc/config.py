@@ -1,5 +1,7 @@
 import logging
+import stat
 import textwrap
+import threading
 import typing as ty
 from dataclasses import dataclass, field
 from functools import lru_cache
@@ -11,7 +13,7 @@ from cc.md import extract_code_block, extract_heading_content, extract_headings_
 
 logger = logging.getLogger(__name__)
 
-DEFAULT_NOTE_PROMPT = textwrap.dedent(
+_DEFAULT_NOTE_ITEMS = textwrap.dedent(
     """
     2. A concise summary (2-3 sentences) - I am the speaker, so use first-person perspective
     3. A complete and organized markdown-native outline,
@@ -27,24 +29,26 @@ DEFAULT_NOTE_PROMPT = textwrap.dedent(
           B. specific 'tasks' for the future (format as Markdown tasks, e.g. ` - [ ] <task text>`
           C. Remaining insights, through-lines, or points to ponder.
         If you think it fits neither of these categories, use your best judgment on the outline.
+    """
+)
+_DEFAULT_TRANSCRIPT_ITEM = textwrap.dedent(
+    """\
     4. A readable transcript of the audio, broken up into paragraphs.
         Never leave the most key thoughts buried in long paragraphs.
         Change ONLY whitespace!
-
-    Format your response as:
-    # Summary
-
-    {summary}
-
-    # Outline
-
-    {outline}
-
-    # Full transcript
-
-    {full_readable_transcript}
     """
 )
+_DEFAULT_NOTE_FORMAT = "\nFormat your response as:\n# Summary\n\n{summary}\n\n# Outline\n\n{outline}\n"
+DEFAULT_TRANSCRIPT_HEADING = "Full transcript"
+
+DEFAULT_NOTE_PROMPT = (
+    _DEFAULT_NOTE_ITEMS
+    + _DEFAULT_TRANSCRIPT_ITEM
+    + _DEFAULT_NOTE_FORMAT
+    + f"\n# {DEFAULT_TRANSCRIPT_HEADING}\n\n{{full_readable_transcript}}\n"
+)
+# for transcripts too long for the LLM to echo back, which are attached to the note as they are
+DEFAULT_NOTE_PROMPT_WITHOUT_TRANSCRIPT = _DEFAULT_NOTE_ITEMS + _DEFAULT_NOTE_FORMAT
 
 
 @dataclass
@@ -55,16 +59,24 @@ class ConfidentConfidantConfig:
     # names, terms, pronunciations — passed to both transcription API and summarizer
     reformat_model: str = "gpt-4o"
     # ^ for stitching together chunk-transcripts if the audio file is long
+    stitch_mode: str = "reformat"
+    # "reformat" sends the whole stitched transcript through reformat_model; "boundaries" only
+    # sends the text around each chunk seam, and adds paragraph breaks locally.
     split_audio_approx_every_s: int = 20 * 60  # 20 minutes
     silence_threshold_db: float = -35.0  # dB
     # higher (less negative) thresholds count quieter sound as "silence" — raise this when
     # constant background noise (fans, dehumidifiers) is keeping speech-pause sections above -35dB
     diarization_model: str = "gpt-4o-transcribe-diarize"
+    pipelined_transcription: bool = False
+    # if True, start transcribing each chunk as soon as ffmpeg has written it, instead of
+    # waiting for the whole file to be split first. Helps most for very long recordings.
 
     # for summarizing:
     note_model: str = "anthropic/claude-sonnet-4-20250514"
     note_prompts: dict[str, str] = field(default_factory=dict)
     # keyed by prompt name ("default", "meeting", etc.)
+    long_transcript_tokens: int = 30_000
+    # transcripts longer than this (roughly) are summarized section by section, then combined
 
     # for outputting:
     audio_dir: str = "./cc/audio"
@@ -73,6 +85,12 @@ class ConfidentConfidantConfig:
     datetime_fmt: str = "%y-%m-%d_%H%M"  # very opinionated, sorry - I don't expect to live until 2100
     skip_dir: bool = False
     # if True, skip any files in this directory, and in subdirectories that do not have more specific config.
+    provisional_note: bool = False
+    # if True, a note with just the raw transcript is written, and linked in place of the audio, as
+    # soon as transcription finishes; the summarized note replaces it once it is ready.
+    processing_priority: int = 0
+    # when there is a backlog, recordings in directories with a higher priority are processed first;
+    # otherwise, shortest first (see cc.schedule).
 
 
 DEFAULT_CONFIG = ConfidentConfidantConfig(note_prompts={"default": DEFAULT_NOTE_PROMPT})
@@ -125,36 +143,80 @@ def _parse_config_md(config_md: str) -> ConfidentConfidantConfig:
 _CONFIG_FILENAMES = (".cc-config.md", "cc-config.md")
 
 
-def _find_config_in_dir(current_dir: Path) -> ConfidentConfidantConfig | None:
-    """Return the first non-empty config found in current_dir, or None."""
+@lru_cache(maxsize=1024)
+def _read_config_file(config_file: Path, mtime_ns: int) -> ConfidentConfidantConfig:
+    """Parsed once per version of the file: mtime_ns is only there to be part of the cache key,
+    so that a long-running process (e.g. the daemon) sees configs as they are edited."""
+    return _parse_config_md(config_file.read_text())
+
+
+_Versions = tuple[tuple[Path, int], ...]  # (path, mtime_ns) of directories and config files
+
+# the configs from each directory up, and the versions of every directory and config file they
+# came from. Creating, removing or renaming a config file changes its directory's mtime and
+# editing one changes its own, so checking an entry takes a stat per directory instead of a
+# stat per candidate file per directory.
+_HIERARCHIES: dict[Path, tuple[_Versions, tuple[ConfidentConfidantConfig, ...]]] = {}
+_HIERARCHIES_LOCK = threading.Lock()
+
+
+def _versions(paths: ty.Iterable[Path]) -> _Versions:
+    versions = []
+    for path in paths:
+        try:
+            versions.append((path, path.stat().st_mtime_ns))
+        except (FileNotFoundError, NotADirectoryError):
+            versions.append((path, -1))
+    return tuple(versions)
+
+
+def _find_config_in_dir(current_dir: Path) -> tuple[ConfidentConfidantConfig | None, _Versions]:
+    """Return the first non-empty config found in current_dir (or None), and the versions of
+    the config files read to find it."""
     config_files = (
         *(current_dir / name for name in _CONFIG_FILENAMES),
         current_dir / (current_dir.name + ".md"),
     )
+    read: list[tuple[Path, int]] = []
     for config_file in config_files:
-        if config_file.is_file():
-            config = _parse_config_md(config_file.read_text())
+        try:
+            st = config_file.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        if stat.S_ISREG(st.st_mode):
+            read.append((config_file, st.st_mtime_ns))
+            config = _read_config_file(config_file, st.st_mtime_ns)
             if config != ConfidentConfidantConfig():
-                return config
+                return config, tuple(read)
 
-    return None
+    return None, tuple(read)
 
 
-@lru_cache
 def collect_configs_root_to_file(any_path: Path) -> tuple[ConfidentConfidantConfig, ...]:
-    """Collect all non-empty configs from filesystem root down to any_path's directory."""
+    """Collect all non-empty configs from filesystem root down to any_path's directory.
+
+    Cached per directory until one of the directories or config files involved changes.
+    """
+    start = any_path if any_path.is_dir() else any_path.parent
+    with _HIERARCHIES_LOCK:
+        cached = _HIERARCHIES.get(start)
+    if cached is not None and _versions(path for path, _ in cached[0]) == cached[0]:
+        return cached[1]
+
+    directories = [start, *start.parents][:-1]  # never the filesystem root itself
+    versions = _versions(directories)  # before looking, so a change made meanwhile is seen later
     configs: list[ConfidentConfidantConfig] = []
-    current = any_path if any_path.is_dir() else any_path.parent
-    while current != current.parent:
-        config = _find_config_in_dir(current)
+    for directory in directories:
+        config, read = _find_config_in_dir(directory)
+        versions += read
         if config is not None:
             configs.append(config)
-        current = current.parent
     configs.reverse()  # root-to-file order
+    with _HIERARCHIES_LOCK:
+        _HIERARCHIES[start] = (versions, tuple(configs))
     return tuple(configs)
 
 
-@lru_cache
 def read_config_from_directory_hierarchy(any_path: Path) -> ConfidentConfidantConfig:
     """Return the nearest non-default config for scalar fields.
 
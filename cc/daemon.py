@@ -0,0 +1,364 @@
+"""A long-running coco process that runs jobs submitted over a Unix socket.
+
+Every console script run pays to import litellm, openai and mops, to set up API clients
+and to index the vault. `coco daemon` pays once and keeps all of that warm. While it is
+running, `coco`, `coco-summarize` and `coco-meeting` hand their work to it and stream back
+its log output; when it is not, they do the work themselves, as before. Nor does the daemon
+take jobs from a client whose `CC_*` environment differs from its own, since the job would
+not run as that client configured it; the client does that work itself too.
+
+The protocol is one JSON object per line. The client sends {"job": ..., "params": {...}};
+the daemon replies with {"log": ...} and {"out": ...} lines while the job runs, then a final
+{"result": ...} or {"error": ...}. Jobs run one at a time - each already spreads its own work
+across threads (see cc.stages).
+
+This module is imported by every console script, so it must stay cheap to import: the
+jobs import what they need when they run.
+"""
+
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+import typing as ty
+from pathlib import Path
+
+from thds.core import config
+
+if ty.TYPE_CHECKING:
+    from cc.vault import VaultIndexCache
+
+logger = logging.getLogger(__name__)
+
+SOCKET_PATH = config.item("socket", Path.home() / ".cache" / "coco" / "coco.sock", parse=Path)
+ENABLED = config.item("enabled", True)  # false: console scripts never look for a daemon
+
+_LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class NotRunning(Exception):
+    """No daemon is listening on the socket."""
+
+
+class Refused(Exception):
+    """The daemon won't run the job: it would not be configured as the client is."""
+
+
+class JobFailed(RuntimeError):
+    """The daemon ran the job, and it raised."""
+
+
+# set by the server, not by the jobs it runs
+_DAEMON_ONLY_ENV = ("CC_DAEMON_", "CC_METRICS_")
+
+
+def _job_env() -> dict[str, str]:
+    """The CC_* environment variables, which configure what a job does."""
+    return {
+        name: value
+        for name, value in os.environ.items()
+        if name.startswith("CC_") and not name.startswith(_DAEMON_ONLY_ENV)
+    }
+
+
+# jobs
+
+
+def _process(
+    path: str,
+    dry_run: bool,
+    limits: dict[str, int],
+    report_dir: str | None = None,
+    otlp: bool = False,
+) -> None:
+    from cc import spans, stages
+    from cc.__main__ import process_vault_recordings
+    from cc.transcribe import gc
+
+    with spans.run_report(Path(report_dir) if report_dir else None, otlp=otlp):
+        process_vault_recordings(Path(path), dry_run, stages.StageLimits(**limits), indexes=_INDEXES)
+    if gc.AUTO():
+        gc.collect_workdir_garbage()
+
+
+def _summarize(transcript: str, output: str | None) -> str:
+    from cc.__main__ import summarize_transcript
+
+    return str(summarize_transcript(Path(transcript), Path(output) if output else None))
+
+
+def _meeting(audio: str, dry_run: bool) -> str | None:
+    from cc.meeting import process_meeting
+
+    note = process_meeting(Path(audio), dry_run, indexes=_INDEXES)
+    return str(note) if note else None
+
+
+JOBS: dict[str, ty.Callable[..., ty.Any]] = {
+    "process": _process,
+    "summarize": _summarize,
+    "meeting": _meeting,
+}
+
+_INDEXES: "VaultIndexCache | None" = None  # set once the daemon is serving
+_ENV: dict[str, str] = {}  # the daemon's own _job_env, from when it started serving
+
+
+# server
+
+
+class _Replies:
+    """Writes reply lines to the client; a client that has gone away doesn't stop the job."""
+
+    def __init__(self, wfile: io.BufferedIOBase) -> None:
+        self._wfile = wfile
+        self._lock = threading.Lock()
+        self.connected = True
+
+    def send(self, **message: ty.Any) -> None:
+        if not self.connected:
+            return
+        line = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            try:
+                self._wfile.write(line)
+                self._wfile.flush()
+            except OSError:
+                self.connected = False
+
+
+class _ReplyLogHandler(logging.Handler):
+    def __init__(self, replies: _Replies) -> None:
+        super().__init__()
+        self.replies = replies
+        self.setFormatter(logging.Formatter(_LOG_FORMAT))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.replies.send(log=self.format(record))
+
+
+class _ReplyStdout(io.TextIOBase):
+    """Stands in for sys.stdout during a job, so whatever it prints reaches the client."""
+
+    def __init__(self, replies: _Replies) -> None:
+        self.replies = replies
+
+    def write(self, text: str) -> int:
+        if text:
+            self.replies.send(out=text)
+        return len(text)
+
+
+@contextlib.contextmanager
+def _llm_cache(enabled: bool) -> ty.Iterator[None]:
+    from cc.llm import response_cache
+
+    # jobs run one at a time, and their worker threads must see this too
+    previous = response_cache.ENABLED()
+    response_cache.ENABLED.set_global(enabled)
+    try:
+        yield
+    finally:
+        response_cache.ENABLED.set_global(previous)
+
+
+_JOB_LOCK = threading.Lock()
+
+
+def _run_job(request: dict[str, ty.Any], replies: _Replies) -> None:
+    job = JOBS.get(request.get("job", ""))
+    if job is None:
+        replies.send(error=f"Unknown job {request.get('job')!r}; known jobs are {sorted(JOBS)}")
+        return
+
+    if (env := request.get("env", {})) != _ENV:
+        differing = sorted(name for name in env.keys() | _ENV.keys() if env.get(name) != _ENV.get(name))
+        replies.send(refused=f"the daemon was started with different values of {', '.join(differing)}")
+        return
+
+    params = dict(request.get("params", {}))
+    llm_cache = params.pop("llm_cache", True)
+    if not _JOB_LOCK.acquire(blocking=False):
+        replies.send(log="Waiting for the daemon to finish another job")
+        _JOB_LOCK.acquire()
+
+    from cc import metrics
+
+    handler = _ReplyLogHandler(replies)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(handler)
+    try:
+        with (
+            _llm_cache(llm_cache),
+            metrics.observed(),
+            contextlib.redirect_stdout(_ReplyStdout(replies)),
+        ):
+            result = job(**params)
+    except Exception as e:
+        logger.exception(f"Job {request['job']} failed")
+        replies.send(error=f"{type(e).__name__}: {e}")
+    else:
+        replies.send(result=result)
+    finally:
+        root_logger.removeHandler(handler)
+        _JOB_LOCK.release()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        replies = _Replies(self.wfile)
+        try:
+            request = json.loads(self.rfile.readline())
+        except json.JSONDecodeError as e:
+            replies.send(error=f"Malformed request: {e}")
+            return
+        _run_job(request, replies)
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def _claim_socket(socket_path: Path) -> None:
+    """Remove a socket left behind by a daemon that died; refuse to replace a live one."""
+    if not socket_path.exists():
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        return
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+    except ConnectionRefusedError:
+        socket_path.unlink()
+        return
+    raise RuntimeError(f"A coco daemon is already listening on {socket_path}")
+
+
+def make_server(socket_path: Path) -> socketserver.BaseServer:
+    """Bind the socket (readable only by this user); call serve_forever to start taking jobs."""
+    global _INDEXES, _ENV
+    from cc.vault import VaultIndexCache
+
+    _INDEXES = _INDEXES or VaultIndexCache()
+    _ENV = _job_env()
+    _claim_socket(socket_path)
+    old_umask = os.umask(0o077)
+    try:
+        return _Server(str(socket_path), _Handler)
+    finally:
+        os.umask(old_umask)
+
+
+def serve(socket_path: Path, metrics_port: int = 0) -> None:
+    # pay for the heavy imports now, rather than during the first job
+    import litellm  # noqa: F401
+
+    import cc.__main__
+    import cc.meeting
+    import cc.transcribe.core  # noqa: F401
+    from cc import metrics
+
+    server = make_server(socket_path)
+    logger.info(f"coco daemon listening on {socket_path}")
+    if metrics_port:
+        metrics.serve(metrics_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("coco daemon shutting down")
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+        metrics.shutdown()
+
+
+# client
+
+
+def request(job: str, params: dict[str, ty.Any], socket_path: Path | None = None) -> ty.Any:
+    """Run a job in the daemon, relaying its log output and printing as it goes.
+
+    Raises NotRunning if there is no daemon to connect to, Refused if it won't run the job,
+    and JobFailed if the job raised.
+    """
+    socket_path = socket_path or SOCKET_PATH()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError) as e:
+        sock.close()
+        raise NotRunning(str(socket_path)) from e
+
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(
+            (json.dumps({"job": job, "params": params, "env": _job_env()}) + "\n").encode("utf-8")
+        )
+        stream.flush()
+        for line in stream:
+            reply = json.loads(line)
+            if "log" in reply:
+                print(reply["log"], file=sys.stderr, flush=True)
+            elif "out" in reply:
+                sys.stdout.write(reply["out"])
+                sys.stdout.flush()
+            elif "refused" in reply:
+                raise Refused(reply["refused"])
+            elif "error" in reply:
+                raise JobFailed(reply["error"])
+            elif "result" in reply:
+                return reply["result"]
+    raise JobFailed("The daemon hung up before the job finished")
+
+
+def submit(job: str, **params: ty.Any) -> bool:
+    """Hand the job to the daemon if one is running. False means: do it yourself.
+
+    Paths must be absolute (the daemon has its own working directory), and everything
+    must be JSON-serializable. A failed job exits, as it would have in-process; its
+    traceback has already been relayed.
+    """
+    if not ENABLED():
+        return False
+    try:
+        request(job, params)
+    except NotRunning:
+        return False
+    except Refused as e:
+        logger.info(f"Not using the coco daemon: {e}")
+        return False
+    except JobFailed as e:
+        raise SystemExit(f"coco daemon: {e}") from e
+    return True
+
+
+def main(argv: ty.Sequence[str] | None = None) -> None:
+    """Entry point for `coco daemon`."""
+    import argparse
+
+    from cc import metrics
+
+    logging.basicConfig(level=logging.INFO, format=_LOG_FORMAT)
+
+    parser = argparse.ArgumentParser(
+        prog="coco daemon",
+        description=(
+            "Keep coco warm in the background. While it runs, coco, coco-summarize and"
+            " coco-meeting hand their work to it."
+        ),
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--socket", type=Path, default=SOCKET_PATH(), help="The Unix socket to listen on."
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=metrics.PORT(),
+        help="Serve Prometheus metrics at http://127.0.0.1:PORT/metrics; 0 to not.",
+    )
+    args = parser.parse_args(argv)
+    serve(args.socket, args.metrics_port)
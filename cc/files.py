@@ -1,21 +1,96 @@
+import contextlib
 import hashlib
 import logging
+import os
 import re
 import shutil
+import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
 
+from thds.core import config, hashing
+
+from cc import spans
+
 logger = logging.getLogger(__name__)
 
+# Hashes are cached by the file's identity and version - (device, inode, size, mtime_ns) - so a
+# recording is read once per process no matter how many places need its hash. If persisted, they
+# are also remembered across runs.
+HASH_CACHE_DB = config.item(
+    "hash_cache_db", Path.home() / ".cache" / "coco" / "file-hashes.sqlite3", parse=Path
+)
+PERSIST_HASHES = config.item("persist_hashes", True)
+
+_FileKey = tuple[int, int, int, int]
+_HASHES: dict[_FileKey, str] = {}
+_HASHES_LOCK = threading.Lock()
+
+
+def _file_key(st: os.stat_result) -> _FileKey:
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _connect_hash_db() -> sqlite3.Connection:
+    db_path = HASH_CACHE_DB()
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS sha256 ("
+        " dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER, hexdigest TEXT NOT NULL,"
+        " PRIMARY KEY (dev, ino, size, mtime_ns))"
+    )
+    return conn
+
+
+def _load_persisted_hash(key: _FileKey) -> str | None:
+    with contextlib.closing(_connect_hash_db()) as conn, conn:
+        row = conn.execute(
+            "SELECT hexdigest FROM sha256 WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?", key
+        ).fetchone()
+    return row[0] if row else None
+
+
+def _persist_hash(key: _FileKey, hexdigest: str) -> None:
+    with contextlib.closing(_connect_hash_db()) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO sha256 VALUES (?, ?, ?, ?, ?)", (*key, hexdigest))
+
 
 def hash_file(file_path: Path) -> str:
-    """Generate SHA-256 hash of file contents."""
+    """Generate SHA-256 hash of file contents.
+
+    Cached by (device, inode, size, mtime_ns), so an unchanged file is only read once.
+    """
+    key = _file_key(file_path.stat())
+    with _HASHES_LOCK:
+        cached = _HASHES.get(key)
+    if cached is None and PERSIST_HASHES():
+        cached = _load_persisted_hash(key)
+    if cached is not None:
+        logger.debug(f"Reusing hash of unchanged file: {file_path}")
+        with _HASHES_LOCK:
+            _HASHES[key] = cached
+        return cached
+
     logger.info(f"Hashing file: {file_path}")
-    hasher = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hasher.update(chunk)
-    return hasher.hexdigest()
+    _, _, size, _ = key
+    with spans.span(spans.HASH, bytes=size), open(file_path, "rb") as f:
+        hexdigest = hashlib.file_digest(f, "sha256").hexdigest()  # large reads into one buffer
+
+    if _file_key(file_path.stat()) != key:
+        logger.warning(f"File changed while it was being hashed, not caching its hash: {file_path}")
+        return hexdigest
+    with _HASHES_LOCK:
+        _HASHES[key] = hexdigest
+    if PERSIST_HASHES():
+        _persist_hash(key, hexdigest)
+    return hexdigest
+
+
+def sha256_of(file_path: Path) -> hashing.Hash:
+    """The cached hash of the file, in the form thds Sources (and so mops) use."""
+    return hashing.Hash("sha256", bytes.fromhex(hash_file(file_path)))
 
 
 def _sanitize_title(title: str) -> str:
@@ -35,25 +110,123 @@ def generate_new_filename(datetime_fmt: str, input_path: Path, title: str) -> st
     return f"{timestamp}_{_sanitize_title(title)}"
 
 
-def create_unique_file_path(original_path: Path, target_dir: Path, new_filename: str) -> Path:
+# paths handed out by create_unique_file_path, so concurrent recordings never share one
+_CLAIMED_PATHS: set[Path] = set()
+_CLAIMED_PATHS_LOCK = threading.Lock()
+
+
+def create_unique_file_path(
+    original_path: Path, target_dir: Path, new_filename: str, create: bool = False
+) -> Path:
+    """A path in target_dir named new_filename (plus a counter if need be) with the original's
+    suffix, that no file has and no earlier call in this process has returned.
+
+    With create, the (empty) file is created exclusively, so other processes can't take the
+    path either.
+    """
+    if create:
+        target_dir.mkdir(parents=True, exist_ok=True)
     new_path = target_dir / f"{new_filename}{original_path.suffix}"
 
     # Handle filename conflicts
     counter = 1
-    while new_path.exists():
-        new_path = target_dir / f"{new_filename}-{counter}{original_path.suffix}"
-        counter += 1
+    with _CLAIMED_PATHS_LOCK:
+        while new_path in _CLAIMED_PATHS or not _claim(new_path, create):
+            new_path = target_dir / f"{new_filename}-{counter}{original_path.suffix}"
+            counter += 1
+        _CLAIMED_PATHS.add(new_path)
 
     return new_path
 
 
-def copy_file(original_path: Path, new_path: Path, dry_run: bool = True) -> None:
+def _claim(path: Path, create: bool) -> bool:
+    if not create:
+        return not path.exists()
+    try:
+        with open(path, "x"):
+            return True
+    except FileExistsError:
+        return False
+
+
+_COPY_BUFFER_BYTES = 8 * 2**20
+
+
+def _copy_and_hash(src: Path, dst: Path) -> str:
+    """Copy in a single streamed pass, hashing the bytes on their way through."""
+    hasher = hashlib.sha256()
+    buffer = bytearray(_COPY_BUFFER_BYTES)
+    view = memoryview(buffer)
+    with open(src, "rb", buffering=0) as fin, open(dst, "wb") as fout:
+        while n_read := fin.readinto(buffer):
+            hasher.update(view[:n_read])
+            fout.write(view[:n_read])
+        fout.flush()
+        os.fsync(fout.fileno())
+    shutil.copystat(src, dst)
+    return hasher.hexdigest()
+
+
+def _same_filesystem(a: Path, b: Path) -> bool:
+    return a.stat().st_dev == b.stat().st_dev
+
+
+def _rename_noreplace(src: Path, dst: Path) -> None:
+    """Rename, failing with FileExistsError rather than replace a file already at dst."""
+    try:
+        os.link(src, dst)  # atomically fails if dst exists, unlike rename
+    except FileExistsError:
+        raise
+    except OSError:  # a filesystem without hard links; the best we can do is check first
+        if dst.exists():
+            raise FileExistsError(f"Refusing to overwrite {dst}") from None
+        os.rename(src, dst)
+        return
+    os.unlink(src)
+
+
+def archive_file(original_path: Path, new_path: Path, expected_hash: str, dry_run: bool = True) -> None:
+    """Move the original file to its new home, verifying that it is still the file we hashed.
+
+    Within one filesystem this is a rename (after checking the cached hash, which only
+    re-reads the file if it has changed). Across filesystems the file is copied and hashed
+    in the same pass, and the original is removed only once the copy is known to match.
+    """
+    with spans.span(spans.ARCHIVE, dry_run=dry_run) as span:
+        _archive_file(original_path, new_path, expected_hash, dry_run, span)
+
+
+def _archive_file(
+    original_path: Path, new_path: Path, expected_hash: str, dry_run: bool, span: spans.Span
+) -> None:
     if original_path.resolve() == new_path.resolve():
-        logger.info(f"Skipping copy to same location: {original_path}")
+        logger.info(f"Skipping move to same location: {original_path}")
+        return
+    if dry_run:
+        logger.info(f"DRY RUN: Would move {original_path} -> {new_path}")
         return
-    if not dry_run:
-        logger.info(f"Copying audio file: {original_path} -> {new_path}")
-        new_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(original_path, new_path)
-    else:
-        logger.info(f"DRY RUN: Would copy {original_path} -> {new_path}")
+    if new_path.exists():
+        raise FileExistsError(f"Refusing to overwrite {new_path}")
+
+    new_path.parent.mkdir(parents=True, exist_ok=True)
+    span.set(bytes=original_path.stat().st_size)
+    if _same_filesystem(original_path, new_path.parent):
+        span.set(copied=False)
+        if hash_file(original_path) != expected_hash:
+            raise ValueError(f"File hash changed during processing for {original_path.name}, aborting")
+        logger.info(f"Moving audio file: {original_path} -> {new_path}")
+        _rename_noreplace(original_path, new_path)
+        return
+
+    logger.info(f"Copying audio file to another filesystem: {original_path} -> {new_path}")
+    span.set(copied=True)
+    partial = new_path.with_name(new_path.name + ".partial")
+    try:
+        copied_hash = _copy_and_hash(original_path, partial)
+        if copied_hash != expected_hash:
+            raise ValueError(f"File hash changed during processing for {original_path.name}, aborting")
+        _rename_noreplace(partial, new_path)
+    finally:
+        partial.unlink(missing_ok=True)
+    logger.info(f"Removing original audio file now that the copy is verified: {original_path}")
+    original_path.unlink(missing_ok=True)
@@ -0,0 +1,263 @@
+"""A per-vault record of how far each recording has got through processing.
+
+Kept in `<vault>/.coco/jobs.sqlite3`. Once a recording's note has been written, the vault is
+mid-change: the note exists, but the links and the audio haven't moved yet. If coco dies
+there, the next run picks the recording up where it left off instead of writing a second
+note. Once the links point at the new note, this record is the only way to find the audio.
+The same goes for a provisional note (the raw transcript, linked while the summary is being
+written): the record keeps which notes link to it, and with which prompt tags, so the next run
+can finish the summary and point them at it.
+
+Transcription needs no such care - it is memoized - so a recording that was only
+discovered or transcribed simply starts over.
+"""
+
+import contextlib
+import json
+import logging
+import sqlite3
+import statistics
+import time
+import typing as ty
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DISCOVERED = "discovered"  # linked from a note, and about to be transcribed
+TRANSCRIBED = "transcribed"
+PROVISIONAL = "provisional"  # a raw-transcript note is written, and links are moving to it
+SUMMARIZED = "summarized"  # the note is written; links and audio are unchanged
+LINKED = "linked"  # links point at the new note; the audio hasn't moved yet
+ARCHIVED = "archived"  # the audio is in its new home, and gone from the old one
+STAGES = (DISCOVERED, TRANSCRIBED, PROVISIONAL, SUMMARIZED, LINKED, ARCHIVED)
+# only recordings in directories configured with provisional_note pass through PROVISIONAL
+
+_COLUMNS = (
+    "audio_path, sha256, stage, title, note_path, new_audio_path, linking_notes, prompt_tags,"
+    " error, " + ", ".join(f"{stage}_at" for stage in STAGES)
+)
+_TABLE_COLUMNS = (
+    "audio_path TEXT PRIMARY KEY",
+    "sha256 TEXT NOT NULL",
+    "stage TEXT NOT NULL",
+    "title TEXT",
+    "note_path TEXT",
+    "new_audio_path TEXT",
+    "error TEXT",
+    *(f"{stage}_at REAL" for stage in STAGES),
+    "linking_notes TEXT",  # JSON lists, kept while a provisional note stands in for the real one
+    "prompt_tags TEXT",
+)
+
+
+@dataclass
+class Job:
+    audio_path: Path
+    sha256: str
+    stage: str
+    title: str | None = None
+    note_path: Path | None = None
+    new_audio_path: Path | None = None
+    linking_notes: list[Path] = field(default_factory=list)
+    prompt_tags: list[str] = field(default_factory=list)
+    error: str | None = None
+    stage_times: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def finished(self) -> bool:
+        return self.stage == ARCHIVED
+
+
+class Journal:
+    """The vault's jobs. A dry-run journal reads the record but never writes to it."""
+
+    def __init__(self, vault_root: Path, dry_run: bool = False) -> None:
+        self.vault_root = vault_root
+        self.db_path = vault_root / ".coco" / "jobs.sqlite3"
+        self.dry_run = dry_run
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS recordings ({', '.join(_TABLE_COLUMNS)})")
+        # journals written before a column was added lack it
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(recordings)")}
+        for column in _TABLE_COLUMNS:
+            if column.split()[0] not in existing:
+                conn.execute(f"ALTER TABLE recordings ADD COLUMN {column}")
+        return conn
+
+    def _key(self, path: Path) -> str:
+        """Relative to the vault, so the record survives the vault moving; absolute if outside it."""
+        return (
+            path.relative_to(self.vault_root).as_posix()
+            if path.is_relative_to(self.vault_root)
+            else str(path)
+        )
+
+    def _job(self, row: tuple[ty.Any, ...]) -> Job:
+        (
+            audio_path,
+            sha256,
+            stage,
+            title,
+            note_path,
+            new_audio_path,
+            linking_notes,
+            prompt_tags,
+            error,
+            *times,
+        ) = row
+        return Job(
+            audio_path=self.vault_root / audio_path,
+            sha256=sha256,
+            stage=stage,
+            title=title,
+            note_path=self.vault_root / note_path if note_path else None,
+            new_audio_path=self.vault_root / new_audio_path if new_audio_path else None,
+            linking_notes=[self.vault_root / note for note in json.loads(linking_notes or "[]")],
+            prompt_tags=json.loads(prompt_tags or "[]"),
+            error=error,
+            stage_times={stage: t for stage, t in zip(STAGES, times) if t is not None},
+        )
+
+    def get(self, audio_path: Path) -> Job | None:
+        if not self.db_path.exists():
+            return None
+        with contextlib.closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM recordings WHERE audio_path = ?", (self._key(audio_path),)
+            ).fetchone()
+        return self._job(row) if row else None
+
+    def all(self) -> list[Job]:
+        if not self.db_path.exists():
+            return []
+        with contextlib.closing(self._connect()) as conn, conn:
+            rows = conn.execute(f"SELECT {_COLUMNS} FROM recordings ORDER BY audio_path").fetchall()
+        return [self._job(row) for row in rows]
+
+    def discovered(self, audio_path: Path, sha256: str) -> None:
+        """Start (or start over) the recording's job."""
+        if self.dry_run:
+            return
+        with contextlib.closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO recordings (audio_path, sha256, stage, {DISCOVERED}_at)"
+                " VALUES (?, ?, ?, ?)",
+                (self._key(audio_path), sha256, DISCOVERED, time.time()),
+            )
+
+    def advance(
+        self,
+        audio_path: Path,
+        stage: str,
+        *,
+        title: str | None = None,
+        note_path: Path | None = None,
+        new_audio_path: Path | None = None,
+        linking_notes: ty.Sequence[Path] | None = None,
+        prompt_tags: ty.Sequence[str] | None = None,
+    ) -> None:
+        """Record that the recording has completed the stage (and anything learned on the way)."""
+        assert stage in STAGES, stage
+        if self.dry_run:
+            return
+        with contextlib.closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"UPDATE recordings SET stage = ?, {stage}_at = ?, error = NULL,"
+                " title = coalesce(?, title), note_path = coalesce(?, note_path),"
+                " new_audio_path = coalesce(?, new_audio_path),"
+                " linking_notes = coalesce(?, linking_notes), prompt_tags = coalesce(?, prompt_tags)"
+                " WHERE audio_path = ?",
+                (
+                    stage,
+                    time.time(),
+                    title,
+                    self._key(note_path) if note_path else None,
+                    self._key(new_audio_path) if new_audio_path else None,
+                    json.dumps([self._key(n) for n in linking_notes])
+                    if linking_notes is not None
+                    else None,
+                    json.dumps(list(prompt_tags)) if prompt_tags is not None else None,
+                    self._key(audio_path),
+                ),
+            )
+
+    def failed(self, audio_path: Path, error: str) -> None:
+        """Note the error; the recording stays at the last stage it completed."""
+        if self.dry_run:
+            return
+        with contextlib.closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE recordings SET error = ? WHERE audio_path = ?", (error, self._key(audio_path))
+            )
+
+    @contextlib.contextmanager
+    def recording_failures(self, audio_path: Path) -> ty.Iterator[None]:
+        try:
+            yield
+        except Exception as e:
+            self.failed(audio_path, f"{type(e).__name__}: {e}")
+            raise
+
+
+def stage_latencies(jobs: ty.Iterable[Job]) -> dict[str, list[float]]:
+    """For each stage after the first, how long each recording took to complete it (from the
+    last stage it went through before, as not every recording goes through every stage)."""
+    latencies: dict[str, list[float]] = {stage: [] for stage in STAGES[1:]}
+    for job in jobs:
+        previous: float | None = None
+        for stage in STAGES:
+            if (at := job.stage_times.get(stage)) is None:
+                continue
+            if previous is not None:
+                latencies[stage].append(at - previous)
+            previous = at
+    return latencies
+
+
+def format_status(journal: Journal) -> str:
+    jobs = journal.all()
+    unfinished = [job for job in jobs if not job.finished]
+    by_stage = {stage: sum(job.stage == stage for job in unfinished) for stage in STAGES[:-1]}
+    lines = [
+        f"Vault: {journal.vault_root}",
+        f"In progress: {len(unfinished)} ("
+        + ", ".join(f"{n} {stage}" for stage, n in by_stage.items())
+        + ")",
+        f"Archived: {len(jobs) - len(unfinished)}",
+        "Stage latency (median / max):",
+    ]
+    for stage, seconds in stage_latencies(jobs).items():
+        if seconds:
+            lines.append(
+                f"  {stage:<12} {statistics.median(seconds):8.1f}s / {max(seconds):8.1f}s"
+                f"  ({len(seconds)} recordings)"
+            )
+    failed = [job for job in unfinished if job.error]
+    if failed:
+        lines.append(f"Failed ({len(failed)}):")
+        lines.extend(
+            f"  {job.audio_path.relative_to(journal.vault_root)} after {job.stage}: {job.error}"
+            for job in failed
+        )
+    return "\n".join(lines)
+
+
+def main(argv: ty.Sequence[str] | None = None) -> None:
+    """Entry point for `coco status`."""
+    import argparse
+
+    from cc.vault import find_vault_root
+
+    parser = argparse.ArgumentParser(
+        prog="coco status",
+        description="Show how far each recording in a vault has got through processing.",
+    )
+    parser.add_argument(
+        "vault_dir", type=Path, nargs="?", default=Path.cwd(), help="Any directory in the vault."
+    )
+    args = parser.parse_args(argv)
+    print(format_status(Journal(find_vault_root(args.vault_dir.resolve()))))
@@ -1,3 +1,27 @@
-from . import summarize, transcribe
+import importlib
+import typing as ty
 
-__all__ = ["summarize", "transcribe"]
+if ty.TYPE_CHECKING:
+    from . import cassette, complete, fake, providers, response_cache, summarize, transcribe
+
+_SUBMODULES = frozenset(
+    {"cassette", "complete", "fake", "providers", "response_cache", "summarize", "transcribe"}
+)
+
+
+def __getattr__(name: str) -> ty.Any:
+    # litellm and openai take seconds to import, so submodules are loaded on first use
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "cassette",
+    "complete",
+    "fake",
+    "providers",
+    "response_cache",
+    "summarize",
+    "transcribe",
+]
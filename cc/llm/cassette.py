@@ -0,0 +1,293 @@
+"""Record real provider calls, and replay them offline with their original timing.
+
+`CC_LLM_PROVIDERS_BACKEND=record` makes real calls and appends each one - a fingerprint of
+the request, the response and how long it took - to the cassette at `CC_LLM_CASSETTE_PATH`.
+`CC_LLM_PROVIDERS_BACKEND=replay` answers from the cassette instead, waiting as long as the
+provider did, divided by `CC_LLM_CASSETTE_SPEED` (0 means don't wait at all).
+
+Transcription is recorded at the HTTP level, so retried 429s and server errors are played
+back in order, just as they happened. Completions are recorded per call, including the time
+to the first streamed token; a completion recorded streaming can be replayed either way.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import typing as ty
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+from thds.core import config
+
+from cc.llm import fake
+
+if ty.TYPE_CHECKING:
+    from openai import OpenAI
+
+PATH = config.item("path", Path.home() / ".cache" / "coco" / "cassette.jsonl", parse=Path)
+SPEED = config.item("speed", 1.0)
+
+_TRANSCRIPTION = "transcription"
+_COMPLETION = "completion"
+
+
+class CassetteMiss(KeyError):
+    """The request being replayed was never recorded."""
+
+
+def _fingerprint(payload: ty.Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _wait(seconds: float) -> None:
+    if (speed := SPEED()) > 0:
+        time.sleep(seconds / speed)
+
+
+# the cassette file
+
+_WRITE_LOCK = threading.Lock()
+
+
+def _record(entry: dict[str, ty.Any]) -> None:
+    path = PATH()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _WRITE_LOCK, path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class _Tape:
+    """The recorded entries for each request, played in the order they were recorded."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: dict[tuple[str, str], list[dict[str, ty.Any]]] = defaultdict(list)
+        self._played: dict[tuple[str, str], int] = defaultdict(int)
+        self._lock = threading.Lock()
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[(entry["kind"], entry["key"])].append(entry)
+
+    def next(self, kind: str, key: str) -> dict[str, ty.Any]:
+        """The next recorded response; once they run out, the last one again."""
+        with self._lock:
+            entries = self._entries.get((kind, key))
+            if not entries:
+                raise CassetteMiss(f"No {kind} request with fingerprint {key[:12]} in {self.path}")
+            played = self._played[(kind, key)]
+            self._played[(kind, key)] = played + 1
+            return entries[min(played, len(entries) - 1)]
+
+
+_TAPES: dict[Path, _Tape] = {}
+_TAPES_LOCK = threading.Lock()
+
+
+def _tape() -> _Tape:
+    path = PATH()
+    with _TAPES_LOCK:
+        if path not in _TAPES:
+            _TAPES[path] = _Tape(path)
+        return _TAPES[path]
+
+
+# transcription
+
+
+def _transcription_key(request: httpx.Request) -> str:
+    fields = fake.form_fields(request)
+    return _fingerprint(
+        {
+            "path": request.url.path,
+            "fields": {
+                name: hashlib.sha256(value).hexdigest() if name == "file" else value.decode()
+                for name, value in fields.items()
+            },
+        }
+    )
+
+
+class _RecordingTransport(httpx.BaseTransport):
+    def __init__(self) -> None:
+        self._real = httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = _transcription_key(request)
+        start = time.monotonic()
+        response = self._real.handle_request(request)
+        body = response.read()
+        _record(
+            {
+                "kind": _TRANSCRIPTION,
+                "key": key,
+                "latency_s": time.monotonic() - start,
+                "status": response.status_code,
+                "headers": {
+                    name: value
+                    for name, value in response.headers.items()
+                    if name.lower() in ("content-type", "retry-after", "retry-after-ms")
+                },
+                "body": body.decode("utf-8"),
+            }
+        )
+        return httpx.Response(response.status_code, headers=response.headers, content=body)
+
+    def close(self) -> None:
+        self._real.close()
+
+
+def _replay_transcription(request: httpx.Request) -> httpx.Response:
+    entry = _tape().next(_TRANSCRIPTION, _transcription_key(request))
+    _wait(entry["latency_s"])
+    return httpx.Response(entry["status"], headers=entry["headers"], content=entry["body"].encode())
+
+
+def openai_client(recording: bool) -> "OpenAI":
+    from openai import OpenAI
+
+    if recording:
+        from cc.env import activate_api_keys
+
+        activate_api_keys()
+        return OpenAI(http_client=httpx.Client(transport=_RecordingTransport()))
+    return OpenAI(
+        api_key="replay",
+        http_client=httpx.Client(transport=httpx.MockTransport(_replay_transcription)),
+    )
+
+
+# completions
+
+_NOT_PART_OF_THE_REQUEST = frozenset({"stream", "stream_options", "mock_response"})
+
+
+def _completion_key(kwargs: dict[str, ty.Any]) -> str:
+    return _fingerprint({k: v for k, v in kwargs.items() if k not in _NOT_PART_OF_THE_REQUEST})
+
+
+def _recorded_error(e: Exception) -> dict[str, str]:
+    return {"type": type(e).__name__, "message": str(e)}
+
+
+def _record_streamed(key: str, chunks: ty.Iterable[ty.Any], start: float) -> ty.Iterator[ty.Any]:
+    parts: list[str] = []
+    first_token_s: float | None = None
+    try:
+        for chunk in chunks:
+            if chunk.choices and (delta := chunk.choices[0].delta.content):
+                if first_token_s is None:
+                    first_token_s = time.monotonic() - start
+                parts.append(delta)
+            yield chunk
+    except Exception as e:
+        _record(
+            {
+                "kind": _COMPLETION,
+                "key": key,
+                "latency_s": time.monotonic() - start,
+                "error": _recorded_error(e),
+            }
+        )
+        raise
+    _record(
+        {
+            "kind": _COMPLETION,
+            "key": key,
+            "latency_s": time.monotonic() - start,
+            "first_token_s": first_token_s,
+            "content": "".join(parts),
+        }
+    )
+
+
+def record_completion(**kwargs: ty.Any) -> ty.Any:
+    import litellm
+
+    from cc.env import activate_api_keys
+
+    activate_api_keys()
+    key = _completion_key(kwargs)
+    start = time.monotonic()
+    try:
+        response = litellm.completion(**kwargs)
+    except Exception as e:
+        _record(
+            {
+                "kind": _COMPLETION,
+                "key": key,
+                "latency_s": time.monotonic() - start,
+                "error": _recorded_error(e),
+            }
+        )
+        raise
+    if kwargs.get("stream"):
+        return _record_streamed(key, response, start)
+
+    _record(
+        {
+            "kind": _COMPLETION,
+            "key": key,
+            "latency_s": time.monotonic() - start,
+            "content": response["choices"][0]["message"]["content"] or "",
+        }
+    )
+    return response
+
+
+def _raise_recorded(error: dict[str, str], model: str) -> ty.NoReturn:
+    import litellm
+
+    # the provider errors, which the retries tell apart; anything else replays as a RuntimeError
+    provider_errors: dict[str, ty.Callable[..., Exception]] = {
+        error_type.__name__: error_type
+        for error_type in (
+            litellm.APIConnectionError,
+            litellm.AuthenticationError,
+            litellm.BadGatewayError,
+            litellm.BadRequestError,
+            litellm.ContentPolicyViolationError,
+            litellm.ContextWindowExceededError,
+            litellm.InternalServerError,
+            litellm.NotFoundError,
+            litellm.RateLimitError,
+            litellm.ServiceUnavailableError,
+            litellm.Timeout,
+        )
+    }
+    if (error_type := provider_errors.get(error["type"])) is not None:
+        raise error_type(error["message"], llm_provider="replay", model=model)
+    raise RuntimeError(f"{error['type']}: {error['message']}")
+
+
+def _paced(chunks: list[ty.Any], first_token_s: float, latency_s: float) -> ty.Iterator[ty.Any]:
+    """Yield the chunks on the recorded schedule: the first token, then the rest evenly."""
+    _wait(first_token_s)
+    between = max(0.0, latency_s - first_token_s) / max(1, len(chunks) - 1)
+    for i, chunk in enumerate(chunks):
+        if i:
+            _wait(between)
+        yield chunk
+
+
+def replay_completion(**kwargs: ty.Any) -> ty.Any:
+    import litellm
+
+    entry = _tape().next(_COMPLETION, _completion_key(kwargs))
+    if "error" in entry:
+        _wait(entry["latency_s"])
+        _raise_recorded(entry["error"], kwargs["model"])
+
+    response = litellm.completion(**kwargs, mock_response=entry["content"])
+    if not kwargs.get("stream"):
+        _wait(entry["latency_s"])
+        return response
+    first_token_s = entry.get("first_token_s")
+    return _paced(
+        list(response),
+        entry["latency_s"] if first_token_s is None else first_token_s,
+        entry["latency_s"],
+    )
@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+import typing as ty
+from dataclasses import dataclass
+
+from cc import spans
+from cc.llm import response_cache
+from cc.llm.providers import completion
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TokenUsage:
+    prompt_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    completion_tokens: int = 0
+
+    def __str__(self) -> str:
+        hit_rate = self.cache_read_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+        return (
+            f"{self.prompt_tokens} prompt tokens ({self.cache_read_tokens} read from cache,"
+            f" {hit_rate:.0%}; {self.cache_creation_tokens} written to cache),"
+            f" {self.completion_tokens} completion tokens"
+        )
+
+
+USAGE = TokenUsage()  # running total for this process
+_USAGE_LOCK = threading.Lock()
+
+
+def _needs_cache_control(model: str) -> bool:
+    # OpenAI caches long prompt prefixes automatically; Anthropic models must be told where.
+    return model.startswith("anthropic/") or "claude" in model
+
+
+def _min_cacheable_tokens(model: str) -> int:
+    # Anthropic doesn't cache shorter prefixes; a breakpoint on one is silently ignored
+    return 2048 if "haiku" in model else 1024
+
+
+def cacheable_text(text: str, model: str) -> str | list[dict[str, ty.Any]]:
+    """Message content that ends a prompt prefix worth caching, marked where the provider needs it.
+
+    Put stable instructions first (e.g. in the system message) and per-call content last,
+    so that repeated calls share as long a prefix as possible. Anthropic only caches prefixes
+    of at least 1024 tokens (2048 for Haiku), which few instructions reach on their own, so
+    mark the large content they're followed by (a transcript) as well: retries and repeated
+    calls about the same transcript then read all of it from the cache. Text too short to be
+    worth a breakpoint (at ~4 characters per token) is left unmarked.
+    """
+    if not _needs_cache_control(model) or len(text) // 4 < _min_cacheable_tokens(model):
+        return text
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+def _usage_of(response: ty.Any) -> TokenUsage:
+    usage = response.get("usage")
+    if not usage:
+        return TokenUsage()
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    return TokenUsage(
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        cache_read_tokens=(
+            getattr(usage, "cache_read_input_tokens", 0) or getattr(details, "cached_tokens", 0) or 0
+        ),
+        cache_creation_tokens=getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+    )
+
+
+def _record_usage(model: str, usage: TokenUsage, latency: str) -> None:
+    with _USAGE_LOCK:
+        USAGE.prompt_tokens += usage.prompt_tokens
+        USAGE.cache_read_tokens += usage.cache_read_tokens
+        USAGE.cache_creation_tokens += usage.cache_creation_tokens
+        USAGE.completion_tokens += usage.completion_tokens
+    logger.info(f"{model}: {latency}; {usage}")
+
+
+def _span_attributes(usage: TokenUsage) -> dict[str, int]:
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "cache_read_tokens": usage.cache_read_tokens,
+        "completion_tokens": usage.completion_tokens,
+    }
+
+
+def complete(
+    model: str,
+    messages: list[dict[str, ty.Any]],
+    valid: response_cache.Valid = bool,
+    **params: ty.Any,
+) -> str:
+    """Run a litellm completion and return just the response text.
+
+    Identical requests are served from the on-disk response cache, which only keeps
+    responses that are `valid`. Token usage, including
+    how much of the prompt the provider read from its prompt cache, is logged per call.
+    """
+
+    with spans.span(spans.COMPLETION, model=model, cached=True) as s:
+
+        def _call() -> str:
+            start = time.monotonic()
+            response = completion(model=model, messages=messages, **params)
+            usage = _usage_of(response)
+            _record_usage(model, usage, f"responded in {time.monotonic() - start:.1f}s")
+            s.set(cached=False, **_span_attributes(usage))
+            return response["choices"][0]["message"]["content"] or ""
+
+        return response_cache.get_or_compute(model, messages, params, _call, valid)
+
+
+def stream_complete(
+    model: str,
+    messages: list[dict[str, ty.Any]],
+    valid: response_cache.Valid = bool,
+    **params: ty.Any,
+) -> ty.Iterator[str]:
+    """Like complete, but yields the response text as it is generated.
+
+    A cached response is yielded all at once. Time to first token and total latency are
+    logged per call.
+    """
+    if (cached := response_cache.lookup(model, messages, params, valid)) is not None:
+        spans.record(spans.COMPLETION, time.time_ns(), model=model, cached=True, streamed=True)
+        yield cached
+        return
+
+    start_ns = time.time_ns()
+    start = time.monotonic()
+    time_to_first_token: float | None = None
+    usage = TokenUsage()
+    parts: list[str] = []
+    for chunk in completion(
+        model=model, messages=messages, stream=True, stream_options={"include_usage": True}, **params
+    ):
+        if chunk_usage := getattr(chunk, "usage", None):
+            usage = _usage_of({"usage": chunk_usage})
+        if chunk.choices and (delta := chunk.choices[0].delta.content):
+            if time_to_first_token is None:
+                time_to_first_token = time.monotonic() - start
+                logger.info(f"{model}: first token after {time_to_first_token:.2f}s")
+            parts.append(delta)
+            yield delta
+
+    _record_usage(
+        model,
+        usage,
+        f"streamed in {time.monotonic() - start:.1f}s"
+        f" (first token after {time_to_first_token or 0.0:.2f}s)",
+    )
+    spans.record(
+        spans.COMPLETION,
+        start_ns,
+        model=model,
+        cached=False,
+        streamed=True,
+        first_token_s=round(time_to_first_token or 0.0, 6),
+        **_span_attributes(usage),
+    )
+    response_cache.store(model, messages, params, "".join(parts), valid)
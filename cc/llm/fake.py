@@ -0,0 +1,240 @@
+"""An offline stand-in for the transcription and LLM providers.
+
+Selected with `CC_LLM_PROVIDERS_BACKEND=fake`. Responses are deterministic - the same audio
+or messages always get the same transcript or completion - while latency and failures are
+drawn at random, so concurrency, retries and throughput can be exercised without a network:
+
+- `CC_LLM_FAKE_LATENCY`: seconds per request; `0.5` (fixed), `0.2-1.5` (uniform) or
+  `lognormal:0.8,0.5` (median, sigma).
+- `CC_LLM_FAKE_ERROR_RATE`: the fraction of requests that fail with a server error.
+- `CC_LLM_FAKE_RATE_LIMIT_RATE`: the fraction of requests that are rate limited (429).
+
+Transcription goes through a real OpenAI client whose HTTP transport is replaced, and
+completions through litellm's `mock_response`, so response parsing, streaming and the
+clients' own retries behave as they do against the real providers.
+"""
+
+import email.parser
+import email.policy
+import hashlib
+import math
+import random
+import threading
+import time
+import typing as ty
+
+from thds.core import config
+
+if ty.TYPE_CHECKING:
+    import httpx
+    from openai import OpenAI
+
+
+def parse_latency(spec: str) -> ty.Callable[[random.Random], float]:
+    """A sampler of request latencies, in seconds, from '0.5', '0.2-1.5' or 'lognormal:0.8,0.5'."""
+    spec = str(spec).strip()
+    if spec.startswith("lognormal:"):
+        median, sigma = (float(x) for x in spec.removeprefix("lognormal:").split(","))
+        return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    if "-" in spec.lstrip("-"):
+        low, high = (float(x) for x in spec.split("-", 1))
+        return lambda rng: rng.uniform(low, high)
+    fixed = float(spec)
+    return lambda _rng: fixed
+
+
+LATENCY = config.item("latency", "0")
+ERROR_RATE = config.item("error_rate", 0.0)
+RATE_LIMIT_RATE = config.item("rate_limit_rate", 0.0)
+SEED = config.item("seed", 0)  # for latencies and failures; responses never vary
+
+_RNG: tuple[int, random.Random] | None = None  # the seed, and the generator started from it
+_RNG_LOCK = threading.Lock()
+
+_OK, _SERVER_ERROR, _RATE_LIMITED = "ok", "server error", "rate limited"
+
+
+def _rng() -> random.Random:
+    """The generator for the current SEED, restarted whenever that changes; hold _RNG_LOCK."""
+    global _RNG
+    seed = SEED()
+    if _RNG is None or _RNG[0] != seed:
+        _RNG = seed, random.Random(seed)
+    return _RNG[1]
+
+
+def _draw() -> tuple[float, str]:
+    """How long this request takes, and how it ends."""
+    with _RNG_LOCK:
+        rng = _rng()
+        latency = max(0.0, parse_latency(LATENCY())(rng))
+        roll = rng.random()
+    if roll < RATE_LIMIT_RATE():
+        return latency, _RATE_LIMITED
+    if roll < RATE_LIMIT_RATE() + ERROR_RATE():
+        return latency, _SERVER_ERROR
+    return latency, _OK
+
+
+# deterministic content
+
+_WORDS = (
+    "we should probably look at the numbers again before the meeting on thursday and then decide"
+    " whether the new plan makes sense for everyone involved since the last time it took far"
+    " longer than expected because nobody had the right access to the shared drive so maybe this"
+    " time we start earlier and check in with the team about what they need first"
+).split()
+
+
+def _rng_for(*material: str | bytes) -> random.Random:
+    digest = hashlib.sha256()
+    for m in material:
+        digest.update(m.encode("utf-8") if isinstance(m, str) else m)
+    return random.Random(digest.digest())
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(_WORDS, k=rng.randint(6, 16))
+    return " ".join(words).capitalize() + rng.choice([".", ".", ".", "?"])
+
+
+def _audio_seconds(audio: bytes) -> float:
+    """Compressed speech runs at roughly 16 kB/s - close enough for fake timings."""
+    return max(1.0, len(audio) / 16_000)
+
+
+def transcript_text(audio: bytes) -> str:
+    rng = _rng_for(audio)
+    n_sentences = max(1, int(_audio_seconds(audio) / 4))  # a sentence every ~4s
+    return " ".join(_sentence(rng) for _ in range(n_sentences))
+
+
+def diarized_segments(audio: bytes) -> list[dict[str, ty.Any]]:
+    rng = _rng_for(audio)
+    speakers = "AB" if rng.random() < 0.7 else "ABC"
+    duration = _audio_seconds(audio)
+    segments: list[dict[str, ty.Any]] = []
+    start = 0.0
+    while start < duration:
+        end = min(duration, start + rng.uniform(3.0, 15.0))
+        segments.append(
+            {
+                "id": f"seg_{len(segments)}",
+                "type": "transcript.text.segment",
+                "speaker": rng.choice(speakers),
+                "text": _sentence(rng),
+                "start": round(start, 2),
+                "end": round(end, 2),
+            }
+        )
+        start = end
+    return segments
+
+
+def _text_of(content: ty.Any) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content or [])
+
+
+def completion_text(messages: list[dict[str, ty.Any]]) -> str:
+    """A note (title first) when asked for one; otherwise the material, unchanged.
+
+    Echoing is a valid answer to every editing prompt (reformatting, seam repair), which may
+    only change whitespace and punctuation.
+    """
+    instructions = _text_of(messages[0]["content"]) if len(messages) > 1 else ""
+    material = _text_of(messages[-1]["content"])
+    if "title" not in instructions.lower():
+        return material
+
+    rng = _rng_for(instructions, material)
+    title = " ".join(rng.sample(_WORDS, k=rng.randint(3, 7))).title()
+    bullets = "\n".join(f"- {_sentence(rng)}" for _ in range(rng.randint(3, 6)))
+    return f"{title}\n# Summary\n\n{_sentence(rng)}\n\n# Notes\n\n{bullets}"
+
+
+# completions
+
+
+def completion(**kwargs: ty.Any) -> ty.Any:
+    """litellm.completion with a fake response (or failure) and latency."""
+    import litellm
+
+    model = kwargs["model"]
+    latency, outcome = _draw()
+    time.sleep(latency)
+    if outcome == _RATE_LIMITED:
+        kwargs["mock_response"] = litellm.RateLimitError(
+            "Fake rate limit", llm_provider="fake", model=model
+        )
+    elif outcome == _SERVER_ERROR:
+        kwargs["mock_response"] = litellm.InternalServerError(
+            "Fake server error", llm_provider="fake", model=model
+        )
+    else:
+        kwargs["mock_response"] = completion_text(kwargs["messages"])
+    return litellm.completion(**kwargs)
+
+
+# transcription
+
+
+def form_fields(request: "httpx.Request") -> dict[str, bytes]:
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {request.headers['content-type']}\r\n\r\n".encode() + request.read()
+    )
+    fields: dict[str, bytes] = {}
+    for part in message.iter_parts():  # type: ignore[attr-defined]
+        name = part.get_param("name", header="content-disposition")
+        payload = part.get_payload(decode=True)
+        if isinstance(name, str) and isinstance(payload, bytes):
+            fields[name] = payload
+    return fields
+
+
+def _json_response(status: int, body: dict[str, ty.Any], **headers: str) -> "httpx.Response":
+    import httpx
+
+    return httpx.Response(status, json=body, headers=headers)
+
+
+def handle_openai_request(request: "httpx.Request") -> "httpx.Response":
+    """Answers OpenAI API requests the way the real service would, for the endpoints coco uses."""
+    latency, outcome = _draw()
+    time.sleep(latency)
+    if outcome == _RATE_LIMITED:
+        error = {"message": "Fake rate limit", "type": "requests", "code": "rate_limit_exceeded"}
+        return _json_response(429, {"error": error}, **{"retry-after-ms": "50"})
+    if outcome == _SERVER_ERROR:
+        return _json_response(500, {"error": {"message": "Fake server error", "type": "server_error"}})
+
+    if not request.url.path.endswith("/audio/transcriptions"):
+        return _json_response(404, {"error": {"message": f"Not faked: {request.url.path}"}})
+
+    fields = form_fields(request)
+    audio = fields.get("file", b"")
+    response_format = fields.get("response_format", b"json").decode()
+    if response_format == "diarized_json":
+        segments = diarized_segments(audio)
+        return _json_response(
+            200,
+            {
+                "task": "transcribe",
+                "duration": segments[-1]["end"],
+                "text": " ".join(s["text"] for s in segments),
+                "segments": segments,
+            },
+        )
+    return _json_response(200, {"text": transcript_text(audio)})
+
+
+def openai_client() -> "OpenAI":
+    import httpx
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key="fake",
+        base_url="http://fake-openai.invalid/v1",
+        http_client=httpx.Client(transport=httpx.MockTransport(handle_openai_request)),
+    )
@@ -0,0 +1,79 @@
+"""Where transcription and LLM requests go.
+
+Every call to OpenAI's transcription API and to litellm's completion goes through here, so
+that the backend can be switched with `CC_LLM_PROVIDERS_BACKEND`:
+
+- `live` (the default): the real providers, with API keys from the environment or ~/.keys.
+- `fake`: an offline stand-in with deterministic responses and configurable latency and
+  failures, for tests and benchmarks; see cc.llm.fake.
+- `record`: the real providers, with every call saved to a cassette; see cc.llm.cassette.
+- `replay`: the calls saved in the cassette, with their recorded latencies, offline.
+
+Backends other than live keep their results out of the LLM response cache and the mops
+memo store used by live runs, so a fake transcript never turns up in a real note.
+
+Cheap to import: the provider libraries are imported when a client is first needed.
+"""
+
+import typing as ty
+
+from thds.core import config
+
+if ty.TYPE_CHECKING:
+    from openai import OpenAI
+
+LIVE = "live"
+FAKE = "fake"
+RECORD = "record"
+REPLAY = "replay"
+
+BACKEND = config.item("backend", LIVE)
+
+
+def cache_namespace() -> str:
+    """Distinguishes cached results by backend; empty for live, so existing caches still hit."""
+    backend = BACKEND()
+    return "" if backend == LIVE else backend
+
+
+def openai_client() -> "OpenAI":
+    backend = BACKEND()
+    if backend == FAKE:
+        from cc.llm import fake
+
+        return fake.openai_client()
+    if backend in (RECORD, REPLAY):
+        from cc.llm import cassette
+
+        return cassette.openai_client(recording=backend == RECORD)
+
+    from openai import OpenAI
+
+    from cc.env import activate_api_keys
+
+    activate_api_keys()
+    return OpenAI()
+
+
+def completion(**kwargs: ty.Any) -> ty.Any:
+    """litellm.completion, against the configured backend."""
+    backend = BACKEND()
+    if backend == FAKE:
+        from cc.llm import fake
+
+        return fake.completion(**kwargs)
+    if backend == RECORD:
+        from cc.llm import cassette
+
+        return cassette.record_completion(**kwargs)
+    if backend == REPLAY:
+        from cc.llm import cassette
+
+        return cassette.replay_completion(**kwargs)
+
+    import litellm
+
+    from cc.env import activate_api_keys
+
+    activate_api_keys()
+    return litellm.completion(**kwargs)
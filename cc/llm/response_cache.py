@@ -0,0 +1,182 @@
+"""Content-addressed on-disk cache of LLM responses.
+
+Keyed by the model, the full request messages and any other request parameters, so a
+retried summary (or reformat) of the same transcript with the same prompt is free. The
+cache is bounded in size; the least recently used responses are evicted first.
+
+Only responses that parse (say, a summary that starts with its title) are cached, and a
+cached response that doesn't is treated as a miss, so a bad response is never stuck in here.
+Caching is best effort: a cache that can't be written doesn't fail the (paid for) request.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+import typing as ty
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from thds.core import config
+
+from cc.llm import providers
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = config.item("directory", Path.home() / ".cache" / "coco" / "llm-responses", parse=Path)
+MAX_BYTES = config.item("max_bytes", 256 * 2**20)
+ENABLED = config.item("enabled", True)
+
+# bytes in each cache directory as of its last scan, plus whatever was stored since; the
+# directory is only scanned again (and trimmed) once this goes over MAX_BYTES
+_SIZES: dict[Path, int] = {}
+_SIZES_LOCK = threading.Lock()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, hits: int = 0, misses: int = 0, evictions: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions"
+
+
+STATS = CacheStats()
+
+
+def request_key(model: str, messages: list[dict[str, ty.Any]], params: dict[str, ty.Any]) -> str:
+    request = {"model": model, "messages": messages, "params": params}
+    if namespace := providers.cache_namespace():
+        request["backend"] = namespace
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(cache_dir: Path, key: str) -> Path:
+    return cache_dir / key[:2] / f"{key}.json"
+
+
+def _stat_entries(cache_dir: Path) -> list[tuple[Path, os.stat_result]]:
+    entries = []
+    for path in cache_dir.glob("*/*.json"):
+        try:
+            entries.append((path, path.stat()))
+        except FileNotFoundError:
+            pass  # evicted or replaced by another thread or process since it was listed
+    return entries
+
+
+def _evict_least_recently_used(cache_dir: Path, max_bytes: int) -> int:
+    """Trim the cache to max_bytes, returning the bytes left in it."""
+    entries = _stat_entries(cache_dir)
+    total = sum(st.st_size for _, st in entries)
+    # hits touch the mtime, so the oldest mtime is the least recently used
+    for path, st in sorted(entries, key=lambda e: e[1].st_mtime_ns):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= st.st_size
+        STATS.add(evictions=1)
+    return total
+
+
+def _account(cache_dir: Path, added_bytes: int) -> None:
+    with _SIZES_LOCK:
+        total = _SIZES.get(cache_dir)
+        if total is None or total + added_bytes > MAX_BYTES():
+            _SIZES[cache_dir] = _evict_least_recently_used(cache_dir, MAX_BYTES())
+        else:
+            _SIZES[cache_dir] = total + added_bytes
+
+
+Valid = ty.Callable[[str], bool]  # whether a response parses; empty ones never do
+
+
+def lookup(
+    model: str,
+    messages: list[dict[str, ty.Any]],
+    params: dict[str, ty.Any],
+    valid: Valid = bool,
+) -> str | None:
+    """The cached response for this exact request, if there is one (and it is valid)."""
+    if not ENABLED():
+        return None
+
+    key = request_key(model, messages, params)
+    entry = _entry_path(CACHE_DIR(), key)
+    try:
+        content = json.loads(entry.read_text(encoding="utf-8"))["content"]
+        if not isinstance(content, str) or not valid(content):
+            logger.warning(f"Discarding cached {model} response {key[:12]}, which doesn't parse")
+            entry.unlink(missing_ok=True)
+            raise KeyError(key)
+    except (OSError, ValueError, TypeError, KeyError):
+        # missing, unreadable, evicted under us, or not the JSON object we wrote
+        STATS.add(misses=1)
+        return None
+    with contextlib.suppress(OSError):  # e.g. a read-only cache; the hit is still good
+        os.utime(entry)  # mark as recently used
+
+    STATS.add(hits=1)
+    logger.info(f"Using cached {model} response {key[:12]} ({STATS})")
+    return content
+
+
+def store(
+    model: str,
+    messages: list[dict[str, ty.Any]],
+    params: dict[str, ty.Any],
+    content: str,
+    valid: Valid = bool,
+) -> None:
+    """Cache the response to this request, if it is valid. Never raises."""
+    if not ENABLED() or not valid(content):
+        return
+
+    cache_dir = CACHE_DIR()
+    key = request_key(model, messages, params)
+    entry = _entry_path(cache_dir, key)
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        tmp.write_text(
+            json.dumps({"model": model, "content": content}, ensure_ascii=False), encoding="utf-8"
+        )
+        try:
+            replaced_bytes = entry.stat().st_size
+        except FileNotFoundError:
+            replaced_bytes = 0
+        added_bytes = tmp.stat().st_size - replaced_bytes
+        os.replace(tmp, entry)
+        _account(cache_dir, added_bytes)
+    except OSError as e:
+        logger.warning(f"Not caching {model} response {key[:12]}: {e}")
+        return
+    logger.info(f"Cached {model} response {key[:12]} ({STATS})")
+
+
+def get_or_compute(
+    model: str,
+    messages: list[dict[str, ty.Any]],
+    params: dict[str, ty.Any],
+    compute: ty.Callable[[], str],
+    valid: Valid = bool,
+) -> str:
+    """Return the cached response for this exact request, or compute and cache it."""
+    if (content := lookup(model, messages, params, valid)) is not None:
+        return content
+
+    content = compute()
+    store(model, messages, params, content, valid)
+    return content
@@ -1,12 +1,20 @@
+import itertools
 import logging
 import re
 import textwrap
 import typing as ty
+from functools import partial
 
-from litellm import completion
+from thds.core.concurrency import contextful_threadpool_executor
 
-from cc.config import DEFAULT_NOTE_PROMPT
-from cc.env import activate_api_keys
+from cc import stages
+from cc.config import (
+    DEFAULT_CONFIG,
+    DEFAULT_NOTE_PROMPT,
+    DEFAULT_NOTE_PROMPT_WITHOUT_TRANSCRIPT,
+    DEFAULT_TRANSCRIPT_HEADING,
+)
+from cc.llm.complete import cacheable_text, complete, stream_complete
 
 logger = logging.getLogger(__name__)
 
@@ -23,53 +31,235 @@ class SummaryNote(ty.NamedTuple):
     note: str
 
 
-def summarize_transcript(
+class StreamedNote(ty.NamedTuple):
+    """The title is known up front; the body is generated as it is iterated."""
+
+    title: str
+    body: ty.Iterator[str]
+
+
+_TITLE_INSTRUCTIONS = textwrap.dedent(
+    """
+    1. A short title (3-7 words, suitable for a filename) - put this as the very first
+       line, followed by a newline, regardless of any formatting instructions that follow.
+       This must never be missing, and it must always be at least 3 words and no more than 7,
+       and they must be as unique as possible using the content of the transcript, since this will
+       be part of a filename.
+    """
+)
+_TITLE_REMINDER = (
+    "\n\n" + "Remember - regardless of the rest of the format of your response,"
+    " the very first line must be a 3-7 word title on a line by itself."
+)
+
+
+def _messages(ll_model: str, instructions: str, material: str) -> list[dict[str, ty.Any]]:
+    """The instructions are the stable, cacheable prefix; the material is what varies per call.
+
+    The material (usually a transcript) is a breakpoint too: instructions alone rarely reach
+    the provider's minimum cacheable prefix, and instructions plus transcript usually do.
+    """
+    logger.debug(f"Instructions:\n{instructions}")
+    logger.debug(f"Material:\n{material}")
+    return [
+        {"role": "system", "content": cacheable_text(instructions, ll_model)},
+        {"role": "user", "content": cacheable_text(material, ll_model)},
+    ]
+
+
+def _complete(ll_model: str, instructions: str, material: str) -> str:
+    content = complete(ll_model, _messages(ll_model, instructions, material))
+    logger.debug(f"Response:\n{content}")
+    return content
+
+
+def _has_title(response: str) -> bool:
+    return bool(response.partition("\n")[0].strip())  # as _peel_title reads it
+
+
+def _stream(ll_model: str, instructions: str, material: str) -> ty.Iterator[str]:
+    """Stream a note; only one that starts with its title is worth caching."""
+    return stream_complete(ll_model, _messages(ll_model, instructions, material), valid=_has_title)
+
+
+def _peel_title(chunks: ty.Iterator[str]) -> tuple[str, ty.Iterator[str]]:
+    """Consume just enough of a streamed response to read its first line, which is the title."""
+    head = ""
+    for chunk in chunks:
+        head += chunk
+        if "\n" in head:
+            break
+    title, _, rest = head.partition("\n")
+    return title.strip(), itertools.chain([rest], chunks)
+
+
+def _with_transcript_attached(
+    body: ty.Iterator[str], transcript: str, heading: str, only_if_missing: bool
+) -> ty.Iterator[str]:
+    """Pass the body through, then attach the transcript under its own heading.
+
+    Trailing whitespace is held back until more text follows it, so the body never ends in it.
+    """
+    streamed: list[str] = []
+    pending = ""
+    for chunk in body:
+        streamed.append(chunk)
+        pending += chunk
+        if text := pending.rstrip():
+            yield text
+            pending = pending[len(text) :]
+
+    if only_if_missing and _test_transcript_equivalence(transcript, "".join(streamed)):
+        return
+    yield f"\n\n# {heading}\n\n{transcript}"
+
+
+def _approx_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) - good enough to pick a strategy."""
+    return len(text) // 4
+
+
+def _split_into_sections(transcript: str, max_tokens: int) -> list[str]:
+    """Split on paragraph breaks into sections of at most ~max_tokens each.
+
+    A single paragraph that is too long on its own is split between words.
+    """
+    max_chars = max_tokens * 4
+    pieces: list[str] = []
+    for paragraph in re.split(r"\n\s*\n", transcript.strip()):
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut:].strip()
+        if paragraph:
+            pieces.append(paragraph)
+
+    sections: list[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > max_chars:
+            sections.append(current)
+            current = ""
+        current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        sections.append(current)
+    return sections
+
+
+_SECTION_INSTRUCTIONS = textwrap.dedent(
+    """
+    You will be given one part of a long transcript. Write thorough notes on that part
+    as a markdown list: every topic discussed, every decision, idea, question and task,
+    and who was involved, in the order they come up. These notes will be combined with
+    the notes on the other parts, so do not write an introduction or a conclusion,
+    and do not add a title.
+    """
+)
+
+
+def _summarize_section(
+    ll_model: str, context_section: str, n_sections: int, i_section: tuple[int, str]
+) -> str:
+    i, section = i_section
+    return _complete(
+        ll_model,
+        context_section + _SECTION_INSTRUCTIONS,
+        f"Transcript part {i + 1} of {n_sections}:\n{section}",
+    )
+
+
+def _stream_long_transcript_note(
+    ll_model: str, transcript: str, prompt: str, context_section: str, section_tokens: int
+) -> StreamedNote:
+    """Map-reduce: notes on each section in parallel, then one call to write the final note.
+
+    The readable transcript is attached locally rather than being echoed by the LLM.
+    """
+    sections = _split_into_sections(transcript, section_tokens)
+    logger.info(f"Transcript is long; summarizing {len(sections)} sections separately with {ll_model}")
+    with contextful_threadpool_executor(max_workers=stages.workers(stages.LLM)) as ex:
+        summarize_section = partial(_summarize_section, ll_model, context_section, len(sections))
+        section_notes = list(ex.map(summarize_section, enumerate(sections)))
+
+    title, body = _peel_title(
+        _stream(
+            ll_model,
+            context_section
+            + "\nThe transcript was too long to analyze in one pass, so it was split into consecutive"
+            " parts, and notes were taken on each part. Please analyze the notes you will be given"
+            " and provide:\n"
+            + _TITLE_INSTRUCTIONS
+            + (DEFAULT_NOTE_PROMPT_WITHOUT_TRANSCRIPT if prompt in ("", DEFAULT_NOTE_PROMPT) else prompt)
+            + "\n\nIf the instructions above ask for a transcript, leave it out entirely"
+            " - the full transcript will be attached to your response separately." + _TITLE_REMINDER,
+            "\n\n".join(
+                f"Notes on part {i + 1} of {len(section_notes)}:\n{notes}"
+                for i, notes in enumerate(section_notes)
+            ),
+        )
+    )
+    return StreamedNote(
+        title,
+        _with_transcript_attached(body, transcript, DEFAULT_TRANSCRIPT_HEADING, only_if_missing=False),
+    )
+
+
+def stream_transcript_note(
     ll_model: str,
     transcript: str,
     prompt: str,
     context: str = "",
-) -> SummaryNote:
+    long_transcript_tokens: int = DEFAULT_CONFIG.long_transcript_tokens,
+) -> StreamedNote:
     """Get title and summary note from LLM; the summary note will be formatted as returned by the LLM.
 
+    The title is read off the front of the streamed response before this returns, so the
+    note's path can be decided while the body is still being generated.
+
     Your prompt MUST NOT redefine the first line of output from the LLM, which is
     specified to be a short title that can also be used as a filename.
 
-    The function also tacks on the raw transcript if your resulting note does not include
+    The body also tacks on the raw transcript if your resulting note does not include
     some whitespace-compressed version of the transcript.
 
     context is prepended as background info (e.g. transcription prompt with names/terms).
+
+    Transcripts longer than long_transcript_tokens are summarized section by section,
+    and the sections' notes are then combined into the final note.
     """
     logger.info(f"Getting note and title from {ll_model}")
 
     context_section = f"Background context:\n{context}\n\n" if context.strip() else ""
-    prompt = (
-        context_section
-        + textwrap.dedent(
-            """
-        Please analyze the raw transcript at the end and provide:
-
-        1. A short title (3-7 words, suitable for a filename) - put this as the very first
-           line, followed by a newline, regardless of any formatting instructions that follow.
-           This must never be missing, and it must always be at least 3 words and no more than 7,
-           and they must be as unique as possible using the content of the transcript, since this will
-           be part of a filename.
-        """
+    if _approx_tokens(transcript) > long_transcript_tokens:
+        return _stream_long_transcript_note(
+            ll_model, transcript, prompt, context_section, section_tokens=long_transcript_tokens // 2
         )
+
+    # everything but the transcript is stable across recordings that share a config, so it
+    # goes first, where the provider can cache it
+    instructions = (
+        context_section
+        + "\nPlease analyze the raw transcript you will be given and provide:\n"
+        + _TITLE_INSTRUCTIONS
         + (prompt or DEFAULT_NOTE_PROMPT)
-        + (
-            "\n\n" + "Remember - regardless of the rest of the format of your response,"
-            " the very first line must be a 3-7 word title on a line by itself."
-        )
-        + f"\n\nRaw transcript to be analyzed:\n{transcript}"
+        + _TITLE_REMINDER
+    )
+    title, body = _peel_title(
+        _stream(ll_model, instructions, f"Raw transcript to be analyzed:\n{transcript}")
+    )
+    return StreamedNote(
+        title, _with_transcript_attached(body, transcript, "Raw transcript", only_if_missing=True)
     )
 
-    activate_api_keys()
-    print(prompt)
-    response = completion(model=ll_model, messages=[{"role": "user", "content": prompt}])
-    content = response["choices"][0]["message"]["content"]
-    print(content)
 
-    first_line_is_title, rest_of_note = content.split("\n", 1)
-    if not _test_transcript_equivalence(transcript, rest_of_note):
-        rest_of_note = rest_of_note.rstrip() + f"\n\n# Raw transcript\n\n{transcript}"
-    return SummaryNote(first_line_is_title.strip(), rest_of_note)
+def summarize_transcript(
+    ll_model: str,
+    transcript: str,
+    prompt: str,
+    context: str = "",
+    long_transcript_tokens: int = DEFAULT_CONFIG.long_transcript_tokens,
+) -> SummaryNote:
+    """Like stream_transcript_note, but waits for the whole note."""
+    title, body = stream_transcript_note(ll_model, transcript, prompt, context, long_transcript_tokens)
+    return SummaryNote(title, "".join(body))
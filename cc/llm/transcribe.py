@@ -1,10 +1,8 @@
 import logging
 from pathlib import Path
 
-import openai
-
 from cc.config import DEFAULT_CONFIG
-from cc.env import activate_api_keys
+from cc.llm import providers
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +13,7 @@ def transcribe_audio(audio_path: Path, transcription_model: str, transcription_c
     logger.info(
         f"Transcribing audio: {audio_path} with {transcription_model}, using prompt: {transcription_context}"
     )
-    activate_api_keys()
-    client = openai.OpenAI()
+    client = providers.openai_client()
 
     with open(audio_path, "rb") as audio_file:
         transcript = client.audio.transcriptions.create(
@@ -4,7 +4,7 @@ import logging
 import tomllib
 from pathlib import Path
 
-from cc import llm
+from cc import daemon, llm, profiling
 from cc.config import (
     ConfidentConfidantConfig,
     collect_configs_root_to_file,
@@ -12,12 +12,13 @@ from cc.config import (
     read_config_from_directory_hierarchy,
     resolve_prompt,
 )
-from cc.files import copy_file, create_unique_file_path, generate_new_filename, hash_file
+from cc.files import archive_file, create_unique_file_path, generate_new_filename, hash_file
 from cc.output_note import create_transcript_note
-from cc.transcribe.diarize.core import transcribe_audio_diarized
+from cc.transcribe import diarize
 from cc.transcribe.diarize.label import apply_labels
 from cc.vault import (
     VaultIndex,
+    VaultIndexCache,
     build_vault_index,
     extract_prompt_tags,
     find_linking_notes,
@@ -70,7 +71,7 @@ def _phase1_transcribe(
     audio_path: Path, config: ConfidentConfidantConfig
 ) -> tuple[Path, Path]:
     """Returns (transcript_path, speakers_toml_path)."""
-    output = transcribe_audio_diarized(
+    output = diarize.transcribe_audio_diarized(
         audio_path,
         diarization_model=config.diarization_model,
         split_audio_approx_every_s=config.split_audio_approx_every_s,
@@ -92,11 +93,12 @@ def _phase2_label_and_summarize(
 ) -> Path:
     labeled_transcript = apply_labels(transcript, speakers_toml)
 
-    title, note = llm.summarize.summarize_transcript(
+    title, note = llm.summarize.stream_transcript_note(
         config.note_model,
         transcript=labeled_transcript.read_text(encoding="utf-8"),
         prompt=_enrich_prompt(prompt, meeting_context),
         context=config.transcription_context,
+        long_transcript_tokens=config.long_transcript_tokens,
     )
 
     original_audio_hash = hash_file(audio_path)
@@ -107,7 +109,6 @@ def _phase2_label_and_summarize(
         interpret_dir_config(vault_root, audio_path, config.audio_dir),
         filename_base,
     )
-    copy_file(audio_path, new_audio_path, dry_run=dry_run)
 
     transcript_note_path = (
         interpret_dir_config(vault_root, audio_path, config.notes_dir) / f"{filename_base}.md"
@@ -119,6 +120,7 @@ def _phase2_label_and_summarize(
         title,
         note,
         original_audio_hash,
+        audio_size_bytes=audio_path.stat().st_size,
     )
 
     if hash_file(audio_path) != original_audio_hash:
@@ -129,9 +131,7 @@ def _phase2_label_and_summarize(
         index, vault_root, linking_notes, audio_path, transcript_note_path, title, dry_run=dry_run
     )
 
-    if not dry_run:
-        logger.info(f"Removing original audio file: {audio_path}")
-        audio_path.unlink()
+    archive_file(audio_path, new_audio_path, original_audio_hash, dry_run=dry_run)
 
     logger.info(
         f"Successfully processed {audio_path} -> {transcript_note_path.relative_to(vault_root)}"
@@ -139,7 +139,9 @@ def _phase2_label_and_summarize(
     return transcript_note_path
 
 
-def process_meeting(audio_path: Path, dry_run: bool) -> Path | None:
+def process_meeting(
+    audio_path: Path, dry_run: bool, indexes: VaultIndexCache | None = None
+) -> Path | None:
     """Two-phase diarized meeting processing.
 
     Phase 1: Transcribe + diarize, write speakers.toml, print instructions, return None.
@@ -149,7 +151,7 @@ def process_meeting(audio_path: Path, dry_run: bool) -> Path | None:
     """
     audio_path = audio_path.resolve()
     vault_root = find_vault_root(audio_path)
-    index = build_vault_index(vault_root)
+    index = indexes.index(vault_root) if indexes else build_vault_index(vault_root)
     config = read_config_from_directory_hierarchy(audio_path)
 
     # extract prompt tags from linking notes
@@ -210,6 +212,24 @@ def main() -> None:
         action="store_true",
         help="Don't move files or modify vault notes.",
     )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Always call the LLM, rather than reusing a cached response to an identical request.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each stage with cProfile and tracemalloc (see cc.profiling), in this process.",
+    )
 
     args = parser.parse_args()
-    process_meeting(args.audio_file.resolve(), dry_run=args.no_mutate)
+    audio_file = args.audio_file.resolve()
+    if not args.profile and daemon.submit(
+        "meeting", audio=str(audio_file), dry_run=args.no_mutate, llm_cache=not args.no_llm_cache
+    ):
+        return
+    if args.no_llm_cache:
+        llm.response_cache.ENABLED.set_global(False)
+    with profiling.profiled(audio_file.stem, args.profile):
+        process_meeting(audio_file, dry_run=args.no_mutate)
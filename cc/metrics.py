@@ -0,0 +1,294 @@
+"""Prometheus metrics for a long-running coco (`coco --loop`, `coco daemon`).
+
+The metrics are kept by a span hook (see cc.spans): every recording, stage, chunk
+transcription, LLM call and vault scan finished while `observed()` counts as it goes, and
+`serve(port)` exposes the totals at http://127.0.0.1:<port>/metrics in the Prometheus text
+format. There is no dependency on prometheus_client; the handful of metric types coco needs
+are here.
+
+Gauges of recordings in each stage include those waiting for a slot in it; the stage
+duration histograms don't include the wait, which has its own histogram.
+"""
+
+import contextlib
+import http.server
+import logging
+import threading
+import typing as ty
+
+from thds.core import config
+
+from cc import spans, stages
+
+logger = logging.getLogger(__name__)
+
+PORT = config.item("port", 9465)  # 0: don't serve metrics
+HOST = config.item("host", "127.0.0.1")
+
+# seconds; recordings take minutes to hours, single calls well under a second to minutes
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: ty.Mapping[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_value(value: float) -> str:
+    """Whole numbers exactly, anything else with all its digits (`:g` keeps only six)."""
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _sample(name: str, labels: Labels, value: float) -> str:
+    label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+    sample = _format_value(value)
+    return f"{name}{{{label_text}}} {sample}" if label_text else f"{name} {sample}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str) -> None:
+        super().__init__(name, help)
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [_sample(self.name, key, value) for key, value in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: ty.Sequence[float] = BUCKETS) -> None:
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: the count in each bucket (not cumulative), then +Inf's, then the sum
+        self.values: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = _labels(labels)
+        slot = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            counts = self.values.setdefault(key, [0] * (len(self.buckets) + 2))
+            counts[slot] += 1
+            counts[-1] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, counts in sorted(self.values.items()):
+                cumulative = 0.0
+                for bound, count in zip((*self.buckets, float("inf")), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(_sample(f"{self.name}_bucket", (*key, ("le", le)), cumulative))
+                lines.append(_sample(f"{self.name}_sum", key, counts[-1]))
+                lines.append(_sample(f"{self.name}_count", key, cumulative))
+        return lines
+
+
+_STAGES = (stages.SPLIT, stages.TRANSCRIBE, stages.LLM, stages.VAULT)
+_TOKEN_KINDS = ("prompt_tokens", "cache_read_tokens", "completion_tokens")
+
+
+class Metrics:
+    """The metrics of one process, kept up to date by `hook` on the spans it sees."""
+
+    def __init__(self) -> None:
+        self.recordings_discovered = Counter(
+            "coco_recordings_discovered_total",
+            "Recordings found by vault scans; one that no note links to yet is found by every scan.",
+        )
+        self.recordings_finished = Counter(
+            "coco_recordings_finished_total",
+            "Recordings done with, by outcome: processed, skipped (not linked yet) or failed.",
+        )
+        self.recordings_in_progress = Gauge(
+            "coco_recordings_in_progress", "Recordings being processed right now."
+        )
+        self.recording_seconds = Histogram(
+            "coco_recording_duration_seconds", "Time to process a recording, end to end."
+        )
+        self.stage_recordings = Gauge(
+            "coco_stage_recordings",
+            "Recordings in each stage right now, including those waiting for it.",
+        )
+        self.stage_queued_seconds = Histogram(
+            "coco_stage_queued_seconds", "Time spent waiting for a free slot in each stage."
+        )
+        self.stage_seconds = Histogram(
+            "coco_stage_duration_seconds", "Time spent in each stage, after getting a slot in it."
+        )
+        self.chunk_seconds = Histogram(
+            "coco_chunk_transcription_duration_seconds", "Time to transcribe one chunk, by model."
+        )
+        self.chunk_bytes = Counter(
+            "coco_chunk_transcription_bytes_total",
+            "Bytes of audio uploaded for transcription, by model.",
+        )
+        self.llm_calls = Counter(
+            "coco_llm_calls_total", "LLM completions, by model and whether the response cache had them."
+        )
+        self.llm_seconds = Histogram(
+            "coco_llm_call_duration_seconds", "Time taken by uncached LLM completions, by model."
+        )
+        self.llm_tokens = Counter(
+            "coco_llm_tokens_total", "LLM tokens, by model and kind (prompt, cache_read, completion)."
+        )
+        self.vault_scan_seconds = Histogram(
+            "coco_vault_scan_duration_seconds", "Time to (re)index a vault; incremental or full."
+        )
+        self.errors = Counter("coco_errors_total", "Spans that ended in an error, by span name.")
+
+    @property
+    def all(self) -> list[_Metric]:
+        return [m for m in vars(self).values() if isinstance(m, _Metric)]
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self.all)
+
+    @contextlib.contextmanager
+    def hook(self, s: spans.Span) -> ty.Iterator[None]:
+        if s.name == spans.RECORDING:
+            self.recordings_discovered.inc()
+            self.recordings_in_progress.inc()
+        elif s.name in _STAGES:
+            self.stage_recordings.inc(stage=s.name)
+        try:
+            yield
+        finally:
+            if s.name == spans.RECORDING:
+                self.recordings_in_progress.dec()
+            elif s.name in _STAGES:
+                self.stage_recordings.dec(stage=s.name)
+            self._observe(s)
+
+    def _observe(self, s: spans.Span) -> None:
+        attributes = s.attributes
+        if s.error:
+            self.errors.inc(span=s.name)
+
+        if s.name == spans.RECORDING:
+            outcome = "failed" if s.error else "processed" if attributes.get("processed") else "skipped"
+            self.recordings_finished.inc(outcome=outcome)
+            self.recording_seconds.observe(s.duration_s)
+        elif s.name in _STAGES:
+            queued_s = float(attributes.get("queued_s", 0.0))
+            self.stage_queued_seconds.observe(queued_s, stage=s.name)
+            self.stage_seconds.observe(s.duration_s - queued_s, stage=s.name)
+        elif s.name == spans.TRANSCRIBE_CHUNK:
+            model = attributes.get("model", "")
+            self.chunk_seconds.observe(s.duration_s, model=model)
+            self.chunk_bytes.inc(int(attributes.get("bytes", 0)), model=model)
+        elif s.name == spans.COMPLETION:
+            model = attributes.get("model", "")
+            cached = bool(attributes.get("cached"))
+            self.llm_calls.inc(model=model, cached=str(cached).lower())
+            if not cached:
+                self.llm_seconds.observe(s.duration_s, model=model)
+            for kind in _TOKEN_KINDS:
+                if tokens := int(attributes.get(kind, 0)):
+                    self.llm_tokens.inc(tokens, model=model, kind=kind.removesuffix("_tokens"))
+        elif s.name == spans.VAULT_SCAN:
+            self.vault_scan_seconds.observe(
+                s.duration_s, scan="incremental" if attributes.get("incremental") else "full"
+            )
+
+
+METRICS = Metrics()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    metrics: Metrics = METRICS
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404, "Metrics are at /metrics")
+            return
+        body = self.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", _CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: ty.Any) -> None:
+        pass  # scraped every few seconds; not worth a log line each time
+
+
+_SERVER: http.server.ThreadingHTTPServer | None = None
+
+
+def serve(port: int, host: str | None = None) -> http.server.ThreadingHTTPServer | None:
+    """Serve METRICS from a background thread, unless already serving.
+
+    A port that can't be bound is logged and otherwise ignored: metrics aren't worth failing
+    a run for.
+    """
+    global _SERVER
+    if _SERVER is None:
+        host = host or HOST()
+        try:
+            _SERVER = http.server.ThreadingHTTPServer((host, port), _Handler)
+        except OSError as e:
+            logger.warning(f"Not serving metrics on {host}:{port}: {e}")
+            return None
+        _SERVER.daemon_threads = True
+        threading.Thread(target=_SERVER.serve_forever, name="coco-metrics", daemon=True).start()
+        logger.info(f"Serving metrics at http://{host}:{_SERVER.server_port}/metrics")
+    return _SERVER
+
+
+def shutdown() -> None:
+    global _SERVER
+    if _SERVER is not None:
+        _SERVER.shutdown()
+        _SERVER.server_close()
+        _SERVER = None
+
+
+@contextlib.contextmanager
+def observed() -> ty.Iterator[None]:
+    """Count the spans in this context towards METRICS, if they are being served."""
+    if _SERVER is None:
+        yield
+        return
+    with spans.hooked(METRICS.hook):
+        yield
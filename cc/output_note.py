@@ -1,35 +1,101 @@
 import logging
+import os
+import time
+import typing as ty
 from datetime import datetime
 from pathlib import Path
 
+from thds.core import config
+
+from cc import spans
+
 logger = logging.getLogger(__name__)
 
+PARTIAL_SUFFIX = ".partial"
+# chunks are flushed as they arrive, so a partial file this long untouched has been abandoned
+STALE_PARTIAL_S = config.item("stale_partial_s", 3600.0)
+
+
+def write_streamed_text(path: Path, chunks: ty.Iterable[str]) -> None:
+    """Write the chunks to a .partial file as they arrive, then move it into place.
+
+    The file at `path` therefore only ever appears complete; the partial file can be
+    watched while a long note is being generated. If the process is killed mid-write, the
+    partial file is left behind until remove_stale_partials finds it.
+    """
+    partial = path.with_name(path.name + PARTIAL_SUFFIX)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with partial.open("w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                f.flush()
+        os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+
+def remove_stale_partials(paths: ty.Iterable[Path], dry_run: bool = False) -> list[Path]:
+    """Remove the .partial files among paths that no one has written to for STALE_PARTIAL_S."""
+    stale_before = time.time() - STALE_PARTIAL_S()
+    removed = []
+    for path in paths:
+        if path.suffix != PARTIAL_SUFFIX:
+            continue
+        try:
+            if path.stat().st_mtime >= stale_before:
+                continue  # probably still being written, by another process
+            if not dry_run:
+                path.unlink()
+        except FileNotFoundError:
+            continue  # finished (or cleaned up) since it was listed
+        logger.info(f"{'DRY RUN: Would remove' if dry_run else 'Removed'} abandoned note {path}")
+        removed.append(path)
+    return removed
+
 
 def create_transcript_note(
     vault_root: Path,
     new_audio_path: Path,
     transcript_note_path: Path,
     title: str,
-    prompt_response: str,
+    prompt_response: str | ty.Iterable[str],
     file_hash: str,
+    audio_size_bytes: int | None = None,
 ) -> None:
-    """Create the transcript note with metadata."""
+    """Create the transcript note with metadata.
+
+    The prompt response may be streamed, in which case it is written as it arrives.
+    Pass audio_size_bytes if the audio has not been moved to new_audio_path yet.
+    """
     logger.info(f"Creating transcript note: {transcript_note_path}")
 
     # Get file stats for metadata
-    stat = new_audio_path.stat()
-    file_size_mb = stat.st_size / (1024 * 1024)
+    if audio_size_bytes is None:
+        audio_size_bytes = new_audio_path.stat().st_size
+    file_size_mb = audio_size_bytes / (1024 * 1024)
 
-    content = (
-        f"""
+    header = f"""
 # {title}
 
 ![[{new_audio_path.relative_to(vault_root)}]]
 size: {file_size_mb:.2f} MB | processed: {datetime.now().strftime("%Y-%m-%d %H:%M")} | sha256: `{file_hash}`
-{prompt_response}
-""".strip()
-        + "\n"
-    )
+""".lstrip()
+
+    if isinstance(prompt_response, str):
+        prompt_response = [prompt_response]
+
+    def _content() -> ty.Iterator[str]:
+        yield header
+        pending, wrote_body = "", False
+        for chunk in prompt_response:
+            pending += chunk
+            if text := pending.rstrip():
+                yield text
+                pending, wrote_body = pending[len(text) :], True
+        if wrote_body:
+            yield "\n"
 
-    transcript_note_path.parent.mkdir(parents=True, exist_ok=True)
-    transcript_note_path.write_text(content, encoding="utf-8")
+    with spans.span(spans.NOTE_WRITE):
+        write_streamed_text(transcript_note_path, _content())
@@ -0,0 +1,155 @@
+"""Profile each stage of a run with cProfile and tracemalloc (`--profile`).
+
+While `profiled(...)` is active, every stage (see cc.stages), vault scan and search for
+linking notes is profiled on its own: a cProfile dump and the top allocations still held at
+its end (compared with its start, by tracemalloc) are written to
+`.out/profile/<run>/<recording>/<n>-<stage>.pstats` and `.tracemalloc.txt`. A stage that
+encloses another (the llm stage encloses a vault stage) doesn't include it in its profile.
+
+cProfile can only run one profile at a time, so profiled work should run one recording at a
+time. Afterwards a summary of the functions that took the most time in each stage is
+printed; load the dumps with `python -m pstats` or snakeviz for the rest.
+"""
+
+import contextlib
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import typing as ty
+from pathlib import Path
+
+from thds.core import config
+from thds.core.stack_context import StackContext
+
+from cc import spans, stages
+from cc.transcribe.workdir import PROFILE_DIR, _workdir_root
+
+TOP_ALLOCATIONS = config.item("top_allocations", 25)
+
+PROFILED = frozenset(
+    {stages.SPLIT, stages.TRANSCRIBE, stages.LLM, stages.VAULT, spans.VAULT_SCAN, spans.FIND_LINKS}
+)
+
+_RECORDING: StackContext[str | None] = StackContext("profiled_recording", None)
+
+_IGNORED_ALLOCATIONS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class Profiler:
+    """A span hook that profiles the PROFILED spans into run_dir."""
+
+    def __init__(self, run_dir: Path, label: str) -> None:
+        self.run_dir = run_dir
+        self.label = label  # names the directory of profiles not made for a recording
+        self.written: list[tuple[str, Path]] = []  # span name, pstats dump
+        self._lock = threading.Lock()
+        self._active: list[cProfile.Profile] = []  # only the last is enabled
+        self._counts: dict[Path, int] = {}
+
+    @contextlib.contextmanager
+    def hook(self, s: spans.Span) -> ty.Iterator[None]:
+        if s.name == spans.RECORDING:
+            with _RECORDING.set(Path(str(s.attributes.get("audio", self.label))).stem):
+                yield
+            return
+        if s.name not in PROFILED:
+            yield
+            return
+
+        directory = self.run_dir / (_RECORDING() or self.label).replace(" ", "-")
+        profile = cProfile.Profile()
+        with self._lock:
+            n = self._counts[directory] = self._counts.get(directory, 0) + 1
+            before = tracemalloc.take_snapshot().filter_traces(_IGNORED_ALLOCATIONS)
+            if self._active:
+                self._active[-1].disable()
+            self._active.append(profile)
+            profile.enable()
+        try:
+            yield
+        finally:
+            with self._lock:
+                profile.disable()
+                self._active.remove(profile)
+                if self._active:
+                    self._active[-1].enable()
+                after = tracemalloc.take_snapshot().filter_traces(_IGNORED_ALLOCATIONS)
+            self._write(directory / f"{n:02d}-{s.name}", s.name, profile, before, after)
+
+    def _write(
+        self,
+        stem: Path,
+        name: str,
+        profile: cProfile.Profile,
+        before: tracemalloc.Snapshot,
+        after: tracemalloc.Snapshot,
+    ) -> None:
+        stem.parent.mkdir(parents=True, exist_ok=True)
+        pstats_path = stem.parent / f"{stem.name}.pstats"
+        profile.dump_stats(pstats_path)
+
+        differences = after.compare_to(before, "lineno")
+        held = sum(d.size_diff for d in differences)
+        lines = [f"{name}: {held / 2**20:+.2f} MiB held at the end; top allocations by line:"]
+        lines += [str(d) for d in differences[: TOP_ALLOCATIONS()]]
+        (stem.parent / f"{stem.name}.tracemalloc.txt").write_text("\n".join(lines) + "\n")
+        with self._lock:
+            self.written.append((name, pstats_path))
+
+    def summary(self, top: int = 5) -> str:
+        """The functions that took the most time (not counting their callees) in each stage."""
+        dumps: dict[str, list[Path]] = {}
+        for name, path in self.written:
+            dumps.setdefault(name, []).append(path)
+
+        lines = [f"Profiles written to {self.run_dir}"]
+        for name, paths in dumps.items():
+            stats = pstats.Stats(*map(str, paths))
+            lines.append(f"{name} ({len(paths)}x, {stats.total_tt:.2f}s profiled):")  # type: ignore[attr-defined]
+            hottest = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)  # type: ignore[attr-defined]
+            for (file, line, function), (_prim, calls, own_s, cumulative_s, _callers) in hottest[:top]:
+                lines.append(
+                    f"  {own_s:8.3f}s own {cumulative_s:8.3f}s cumulative {calls:>9} calls"
+                    f"  {_where(file, line, function)}"
+                )
+        return "\n".join(lines)
+
+
+def _where(file: str, line: int, function: str) -> str:
+    if file == "~":  # a builtin
+        return function
+    return f"{'/'.join(Path(file).parts[-2:])}:{line}({function})"
+
+
+@contextlib.contextmanager
+def profiled(label: str, enabled: bool = True) -> ty.Iterator[Profiler | None]:
+    """Profile the stages of the work done in this context, if enabled, and print a summary.
+
+    label names the run's directory for profiles that don't belong to a recording (or all of
+    them, for commands that only process one).
+    """
+    if not enabled:
+        yield None
+        return
+
+    run_dir = _workdir_root() / PROFILE_DIR / f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    profiler = Profiler(run_dir, label)
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        with spans.hooked(profiler.hook):
+            yield profiler
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+        if profiler.written:
+            print(profiler.summary(), file=sys.stderr)
@@ -0,0 +1,112 @@
+"""The order in which a backlog of recordings is processed: shortest first.
+
+Recordings are handed to the pipeline (see cc.stages) in order, so a two-hour lecture found
+first would otherwise hold up a dozen one-minute memos behind it. Durations come from
+ffprobe, which only reads the container's headers; where it can't say (browser-made webm
+often has no duration, and ffmpeg may not be installed), the file size stands in for it.
+
+So that long recordings aren't put off forever by a steady trickle of short ones, every hour
+a recording has waited (since it was last modified) counts as AGING_S_PER_HOUR less audio.
+A directory's `processing_priority` config comes before any of that: higher goes first.
+"""
+
+import logging
+import shutil
+import subprocess
+import threading
+import time
+import typing as ty
+from pathlib import Path
+
+from thds.core import config
+from thds.core.concurrency import contextful_threadpool_executor
+
+from cc.config import read_config_from_directory_hierarchy
+
+logger = logging.getLogger(__name__)
+
+AGING_S_PER_HOUR = config.item("aging_s_per_hour", 600.0)
+ESTIMATED_BYTES_PER_S = 8_000  # 64 kbps, about what phones and browsers record speech at
+
+_PROBE_WORKERS = 8
+_PROBE_TIMEOUT_S = 10
+
+_DURATIONS: dict[tuple[Path, int, int], float | None] = {}  # (path, size, mtime) -> seconds
+_DURATIONS_LOCK = threading.Lock()
+
+
+def probe_duration_s(audio_path: Path) -> float | None:
+    """The duration in the recording's headers, or None if there isn't one (or no ffprobe)."""
+    st = audio_path.stat()
+    key = (audio_path, st.st_size, st.st_mtime_ns)
+    with _DURATIONS_LOCK:
+        if key in _DURATIONS:
+            return _DURATIONS[key]
+
+    duration: float | None = None
+    if ffprobe := shutil.which("ffprobe"):
+        try:
+            result = subprocess.run(
+                [
+                    ffprobe,
+                    *"-v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1".split(),
+                    str(audio_path),
+                ],
+                capture_output=True,
+                text=True,
+                timeout=_PROBE_TIMEOUT_S,
+                check=False,
+            )
+            duration = float(result.stdout.strip())
+        except (subprocess.TimeoutExpired, ValueError):
+            pass  # e.g. "N/A"
+
+    with _DURATIONS_LOCK:
+        _DURATIONS[key] = duration
+    return duration
+
+
+class Scheduled(ty.NamedTuple):
+    audio_path: Path
+    priority: int
+    duration_s: float
+    estimated: bool  # from the file size, rather than probed
+    waited_s: float
+
+    @property
+    def key(self) -> tuple[int, float]:
+        aged_s = self.duration_s - AGING_S_PER_HOUR() * self.waited_s / 3600
+        return -self.priority, aged_s
+
+
+def _scheduled(audio_path: Path, now: float) -> Scheduled | None:
+    """None if the recording is gone (e.g. processed by another run since it was listed)."""
+    try:
+        st = audio_path.stat()
+        duration_s = probe_duration_s(audio_path)
+    except FileNotFoundError:
+        logger.info(f"Not scheduling {audio_path.name}: it no longer exists")
+        return None
+    return Scheduled(
+        audio_path,
+        # the directory's, so that configs are read once per directory rather than per file
+        read_config_from_directory_hierarchy(audio_path.parent).processing_priority,
+        duration_s if duration_s is not None else st.st_size / ESTIMATED_BYTES_PER_S,
+        duration_s is None,
+        max(0.0, now - st.st_mtime),
+    )
+
+
+def shortest_first(audio_paths: ty.Iterable[Path]) -> list[Path]:
+    """The recordings in the order to process them."""
+    now = time.time()
+    with contextful_threadpool_executor(max_workers=_PROBE_WORKERS) as executor:
+        scheduled = sorted(
+            filter(None, executor.map(lambda p: _scheduled(p, now), audio_paths)), key=lambda s: s.key
+        )
+    for s in scheduled:
+        logger.debug(
+            f"Scheduled {s.audio_path.name}: priority {s.priority},"
+            f" {s.duration_s:.0f}s{' (estimated)' if s.estimated else ''}, waited {s.waited_s:.0f}s"
+        )
+    return [s.audio_path for s in scheduled]
@@ -0,0 +1,303 @@
+"""Timing spans around the steps of processing a recording, and a report of them per run.
+
+Work is wrapped in `with span("extract", bytes=n) as s:`, and more attributes can be set
+with `s.set(...)` as they are learned; work that can't be wrapped, like a generator's, is
+recorded afterwards with `record(...)`. Spans nest: a span opened inside another (in the same
+thread, or in a thread started by a contextful executor) is its child. A recording's spans
+form one trace.
+
+Outside of `hooked(...)` a span records nothing. Inside it, each hook is entered around
+every span, and sees it finished (with its duration, attributes and any error) on the way
+out; `tracing()` is the hook that collects a run's spans, for a JSON report with latency
+percentiles per span name and, optionally, an OTLP/JSON export that OpenTelemetry
+collectors can ingest.
+"""
+
+import contextlib
+import json
+import logging
+import math
+import os
+import platform
+import secrets
+import threading
+import time
+import typing as ty
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from thds.core.stack_context import StackContext
+
+logger = logging.getLogger(__name__)
+
+# the steps of processing a recording; cc.stages' stages are spans too
+VAULT_SCAN = "vault_scan"
+FIND_LINKS = "find_links"
+CONFIG = "config"
+HASH = "hash"
+EXTRACT = "extract"
+DETECT_SILENCE = "detect_silence"
+SPLIT = "split_chunks"
+TRANSCRIBE_CHUNK = "transcribe_chunk"
+STITCH = "stitch"
+COMPLETION = "completion"  # one LLM call
+SUMMARIZE = "summarize"
+NOTE_WRITE = "note_write"
+LINK_REWRITE = "link_rewrite"
+ARCHIVE = "archive"  # moving (or copying) the audio into place
+RECORDING = "recording"  # everything done for one recording
+
+Attribute = str | int | float | bool
+
+
+@dataclass
+class Span:
+    name: str
+    attributes: dict[str, Attribute] = field(default_factory=dict)
+    trace_id: str = ""
+    span_id: str = ""
+    parent_id: str | None = None
+    start_ns: int = 0  # since the epoch
+    end_ns: int = 0
+    error: str | None = None
+
+    def set(self, **attributes: Attribute) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_s(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+
+Hook = ty.Callable[[Span], ty.ContextManager[None]]
+
+_HOOKS: StackContext[tuple[Hook, ...]] = StackContext("span_hooks", ())
+_CURRENT: StackContext[Span | None] = StackContext("current_span", None)
+
+
+@contextlib.contextmanager
+def hooked(*hooks: Hook) -> ty.Iterator[None]:
+    """Enter the hooks around every span opened in this context (and copies of it)."""
+    with _HOOKS.set((*_HOOKS(), *hooks)):
+        yield
+
+
+def _child_of_current(
+    name: str, attributes: dict[str, Attribute], start_ns: int, end_ns: int = 0
+) -> Span:
+    parent = _CURRENT()
+    return Span(
+        name,
+        attributes,
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start_ns=start_ns,
+        end_ns=end_ns,
+    )
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Attribute) -> ty.Iterator[Span]:
+    """Time the enclosed work as the named span.
+
+    Don't open a span around a `yield`: the span would be current for the consumer too.
+    """
+    hooks = _HOOKS()
+    if not hooks:
+        yield Span(name, attributes)
+        return
+
+    s = _child_of_current(name, attributes, start_ns=time.time_ns())
+    with contextlib.ExitStack() as stack:
+        for hook in hooks:
+            stack.enter_context(hook(s))
+        start = time.perf_counter_ns()
+        try:
+            with _CURRENT.set(s):
+                yield s
+        except BaseException as e:
+            s.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            s.end_ns = s.start_ns + time.perf_counter_ns() - start
+
+
+def record(name: str, start_ns: int, **attributes: Attribute) -> None:
+    """Record a span from start_ns (a time.time_ns()) until now, for work that can't be
+    wrapped in a `with`, like a generator's. Hooks are entered and exited at once."""
+    hooks = _HOOKS()
+    if not hooks:
+        return
+    s = _child_of_current(name, attributes, start_ns=start_ns, end_ns=time.time_ns())
+    for hook in hooks:
+        with hook(s):
+            pass
+
+
+# collecting a run's spans
+
+
+def _percentile(ordered: ty.Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    return ordered[min(len(ordered), max(1, math.ceil(q / 100 * len(ordered)))) - 1]
+
+
+def summarize(spans: ty.Iterable[Span]) -> dict[str, dict[str, float]]:
+    """Count, total and latency percentiles for each span name."""
+    durations: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for s in spans:
+        durations.setdefault(s.name, []).append(s.duration_s)
+        errors[s.name] = errors.get(s.name, 0) + (s.error is not None)
+    summary = {}
+    for name, values in sorted(durations.items()):
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "errors": errors[name],
+            "total_s": round(sum(values), 6),
+            "p50_s": round(_percentile(values, 50), 6),
+            "p90_s": round(_percentile(values, 90), 6),
+            "p99_s": round(_percentile(values, 99), 6),
+            "max_s": round(values[-1], 6),
+        }
+    return summary
+
+
+class Trace:
+    """The spans finished during a run."""
+
+    def __init__(self) -> None:
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def hook(self, s: Span) -> ty.Iterator[None]:
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.spans.append(s)
+
+    def report(self) -> dict[str, ty.Any]:
+        end_ns = self.end_ns or time.time_ns()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        return {
+            "started": _iso(self.start_ns),
+            "duration_s": round((end_ns - self.start_ns) / 1e9, 6),
+            "host": platform.node(),
+            "pid": os.getpid(),
+            "summary": summarize(spans),
+            "spans": [
+                {
+                    "name": s.name,
+                    "trace_id": s.trace_id,
+                    "span_id": s.span_id,
+                    "parent_id": s.parent_id,
+                    "start_offset_s": round((s.start_ns - self.start_ns) / 1e9, 6),
+                    "duration_s": round(s.duration_s, 6),
+                    "attributes": s.attributes,
+                    **({"error": s.error} if s.error else {}),
+                }
+                for s in spans
+            ],
+        }
+
+    def otlp(self) -> dict[str, ty.Any]:
+        """The spans as an OTLP/JSON ExportTraceServiceRequest."""
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes(
+                            {"service.name": "coco", "host.name": platform.node()}
+                        )
+                    },
+                    "scopeSpans": [{"scope": {"name": "cc"}, "spans": [_otlp_span(s) for s in spans]}],
+                }
+            ]
+        }
+
+    def write(self, report_dir: Path, otlp: bool = False) -> Path:
+        """Write the report (and the OTLP export, beside it) into report_dir."""
+        report_dir.mkdir(parents=True, exist_ok=True)
+        started = time.strftime("%Y%m%dT%H%M%S", time.localtime(self.start_ns / 1e9))
+        stem = f"coco-run-{started}.{self.start_ns // 10**6 % 1000:03d}-{os.getpid()}"
+        path = report_dir / f"{stem}.json"
+        path.write_text(json.dumps(self.report(), indent=2) + "\n", encoding="utf-8")
+        if otlp:
+            (report_dir / f"{stem}.otlp.json").write_text(
+                json.dumps(self.otlp()) + "\n", encoding="utf-8"
+            )
+        return path
+
+
+def _iso(ns: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(ns / 1e9))
+
+
+def _otlp_value(value: Attribute) -> dict[str, ty.Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # int64s are strings in OTLP/JSON
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: ty.Mapping[str, Attribute]) -> list[dict[str, ty.Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+_OTLP_INTERNAL = 1
+_OTLP_STATUS_UNSET, _OTLP_STATUS_ERROR = 0, 2
+
+
+def _otlp_span(s: Span) -> dict[str, ty.Any]:
+    otlp: dict[str, ty.Any] = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": _OTLP_INTERNAL,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": _otlp_attributes(s.attributes),
+        "status": (
+            {"code": _OTLP_STATUS_ERROR, "message": s.error} if s.error else {"code": _OTLP_STATUS_UNSET}
+        ),
+    }
+    if s.parent_id:
+        otlp["parentSpanId"] = s.parent_id
+    return otlp
+
+
+@contextlib.contextmanager
+def tracing() -> ty.Iterator[Trace]:
+    """Collect the spans finished in this context."""
+    trace = Trace()
+    with hooked(trace.hook):
+        try:
+            yield trace
+        finally:
+            trace.end_ns = time.time_ns()
+
+
+@contextlib.contextmanager
+def run_report(report_dir: Path | None, otlp: bool = False) -> ty.Iterator[None]:
+    """Write a report of the spans in this context into report_dir, if there is one."""
+    if report_dir is None:
+        yield
+        return
+    with tracing() as trace:
+        try:
+            yield
+        finally:
+            trace.end_ns = time.time_ns()
+            logger.info(f"Run report: {trace.write(report_dir, otlp)}")
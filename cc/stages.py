@@ -0,0 +1,79 @@
+"""Named stages of processing a recording, with per-stage concurrency limits.
+
+Work is wrapped in `with stage("transcribe"):` and so on. Outside of `limited(...)` a stage
+is just a label; inside it, at most the configured number of threads are in each stage at
+once, so several recordings can move through the pipeline concurrently without, say,
+twenty ffmpeg processes fighting over the disk.
+
+Each stage is also a span (see cc.spans), whose `queued_s` is how long it waited for a slot.
+"""
+
+import contextlib
+import threading
+import time
+import typing as ty
+from dataclasses import dataclass
+
+from thds.core.stack_context import StackContext
+
+from cc import spans
+
+SPLIT = "split"  # ffmpeg: extracting audio, detecting silences, cutting chunks
+TRANSCRIBE = "transcribe"  # uploading chunks to the transcription API
+LLM = "llm"  # stitching and summarizing with an LLM
+VAULT = "vault"  # copying audio, writing notes, rewriting links - always one at a time
+
+
+@dataclass(frozen=True)
+class StageLimits:
+    split: int = 2
+    transcribe: int = 4
+    llm: int = 4
+
+    @property
+    def max_in_flight(self) -> int:
+        """Enough recordings in flight to keep every stage busy."""
+        return self.split + self.transcribe + self.llm + 1
+
+
+DEFAULT_LIMITS = StageLimits()
+
+_SEMAPHORES: StackContext[ty.Mapping[str, threading.Semaphore]] = StackContext("stage_semaphores", {})
+_LIMITS: StackContext[StageLimits] = StackContext("stage_limits", DEFAULT_LIMITS)
+
+
+@contextlib.contextmanager
+def limited(limits: StageLimits) -> ty.Iterator[None]:
+    """Enforce the limits for every stage entered in this context (and copies of it)."""
+    semaphores = {
+        SPLIT: threading.Semaphore(limits.split),
+        TRANSCRIBE: threading.Semaphore(limits.transcribe),
+        LLM: threading.Semaphore(limits.llm),
+        VAULT: threading.Semaphore(1),
+    }
+    with _SEMAPHORES.set(semaphores), _LIMITS.set(limits):
+        yield
+
+
+def workers(name: str) -> int:
+    """The configured limit on the stage, for sizing a pool that fans its work out."""
+    limits = _LIMITS()
+    return {SPLIT: limits.split, TRANSCRIBE: limits.transcribe, LLM: limits.llm, VAULT: 1}[name]
+
+
+@contextlib.contextmanager
+def stage(name: str) -> ty.Iterator[None]:
+    """Run the enclosed work as part of the named stage, waiting for a free slot if it is full.
+
+    Stages that nest must always nest in the same order (e.g. llm, then vault), or two
+    recordings could each wait on a slot the other holds.
+    """
+    with spans.span(name) as s:
+        semaphore = _SEMAPHORES().get(name)
+        if semaphore is None:
+            yield
+            return
+        queued = time.monotonic()
+        with semaphore:
+            s.set(queued_s=round(time.monotonic() - queued, 6))
+            yield
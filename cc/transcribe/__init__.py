@@ -1,7 +1,16 @@
-from thds.mops import pure
+import typing as ty
 
-from .core import transcribe_audio_file
+if ty.TYPE_CHECKING:
+    from .core import transcribe_audio_file
+
+
+def __getattr__(name: str) -> ty.Any:
+    # imported on first use - the pipeline pulls in mops and openai, which are slow to import
+    if name == "transcribe_audio_file":
+        from .core import transcribe_audio_file
+
+        return transcribe_audio_file
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-pure.magic.pipeline_id("transcribe")
 
 __all__ = ["transcribe_audio_file"]
@@ -3,8 +3,25 @@
 from pathlib import Path
 import shutil
 import argparse
+import sys
+import typing as ty
 from cc.config import read_config_from_directory_hierarchy
-from cc.transcribe.core import transcribe_audio_file
+from cc.llm import response_cache
+from cc import batch, profiling, transcribe
+
+
+def _settings(input_file: Path) -> dict[str, ty.Any]:
+    """How the input is transcribed, from the configs (read once per directory)."""
+    config = read_config_from_directory_hierarchy(input_file.resolve().parent)
+    return {
+        "transcription_model": config.transcription_model,
+        "transcription_context": config.transcription_context,
+        "reformat_model": config.reformat_model,
+        "split_audio_approx_every_s": config.split_audio_approx_every_s,
+        "silence_threshold_db": config.silence_threshold_db,
+        "pipelined": config.pipelined_transcription,
+        "stitch_mode": config.stitch_mode,
+    }
 
 
 def cli() -> None:
@@ -12,22 +29,83 @@ def cli() -> None:
         prog="transcribe",
         description="Transcribe large audio files by splitting, transcribing chunks, and stitching.",
     )
-    parser.add_argument("input", help="Input audio/video file", type=Path)
-    parser.add_argument("-o", "--out", help="Where does the transcript go?", type=Path)
+    parser.add_argument(
+        "inputs", nargs="+", help="Input audio/video files, or glob patterns (see cc.batch)"
+    )
+    parser.add_argument(
+        "-o",
+        "--out",
+        help="Where does the transcript go? Must be a directory if there are several inputs.",
+        type=Path,
+    )
+    parser.add_argument(
+        "--workers", type=int, default=batch.WORKERS(), help="How many inputs to transcribe at a time."
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help="Record finished inputs here, and skip those it already lists.",
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Always call the reformat LLM, rather than reusing a cached response.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each stage with cProfile and tracemalloc (see cc.profiling).",
+    )
     args = parser.parse_args()
+    inputs = batch.expand(args.inputs)
+    if not inputs:
+        parser.error("no inputs to transcribe")
+    single = len(inputs) == 1 and not args.manifest
+    if not single and args.out and not args.out.is_dir():
+        parser.error("--out must be a directory when transcribing several inputs")
+    if args.no_llm_cache:
+        response_cache.ENABLED.set_global(False)
 
-    config = read_config_from_directory_hierarchy(args.input)
-    output = transcribe_audio_file(
-        input_file=args.input,
-        transcription_model=config.transcription_model,
-        transcription_context=config.transcription_context,
-        reformat_model=config.reformat_model,
-        split_audio_approx_every_s=config.split_audio_approx_every_s,
-        silence_threshold_db=config.silence_threshold_db,
-    )
+    if args.out and args.out.is_dir():
+        by_name: dict[str, list[Path]] = {}
+        for input_file in inputs:
+            by_name.setdefault(f"{input_file.stem}.txt", []).append(input_file)
+        if collisions := {name: paths for name, paths in by_name.items() if len(paths) > 1}:
+            parser.error(
+                "several inputs would be transcribed to the same file in --out: "
+                + "; ".join(
+                    f"{name} from {', '.join(map(str, paths))}" for name, paths in collisions.items()
+                )
+            )
+
+    def _transcribe(input_file: Path) -> Path:
+        output = transcribe.transcribe_audio_file(input_file=input_file, **_settings(input_file))
+        if args.out:
+            out = args.out / f"{input_file.stem}.txt" if args.out.is_dir() else args.out
+            shutil.copy2(output, out)
+            return out
+        return output
+
+    label = inputs[0].stem if single else "transcribe"
+    with profiling.profiled(label, args.profile):
+        if single:
+            _transcribe(inputs[0])
+            return
+        # cProfile can only profile one input at a time
+        workers = 1 if args.profile else args.workers
+        summary = batch.run(
+            inputs,
+            _transcribe,
+            "Transcribed",
+            "inputs",
+            workers=workers,
+            manifest=args.manifest,
+            settings=_settings,
+        )
 
-    if args.out:
-        shutil.copy2(output, args.out)
+    print(summary.format(), file=sys.stderr)
+    if summary.failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
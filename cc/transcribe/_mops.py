@@ -0,0 +1,19 @@
+"""mops pipeline ids for everything under cc.transcribe.
+
+Modules that define memoized functions import `pure` from here, so the ids are always set
+before anything is memoized, without the package __init__s having to import mops eagerly.
+
+Results from a non-live provider backend (see cc.llm.providers) are memoized under their
+own pipeline ids, so they are never mistaken for real ones.
+"""
+
+from thds.mops import pure
+
+from cc.llm import providers
+
+_backend = f"-{namespace}" if (namespace := providers.cache_namespace()) else ""
+
+pure.magic.pipeline_id(f"transcribe{_backend}", "cc.transcribe")
+pure.magic.pipeline_id(f"transcribe-diarize{_backend}", "cc.transcribe.diarize")
+
+__all__ = ["pure"]
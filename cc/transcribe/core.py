@@ -3,11 +3,13 @@ from pathlib import Path
 
 from thds.core import source
 
+from cc import spans, stages
 from cc.config import DEFAULT_CONFIG
+from cc.files import sha256_of
 from cc.transcribe import llm
 from cc.transcribe.split import split_audio_on_silences
-from cc.transcribe.stitch import stitch_transcripts
-from cc.transcribe.workdir import derive_workdir, workdir
+from cc.transcribe.stitch import STITCH_MODES, stitch_transcripts, stitch_transcripts_at_boundaries
+from cc.transcribe.workdir import bound_workdir, workdir
 
 logger = logging.getLogger(__name__)
 
@@ -20,31 +22,77 @@ def transcribe_audio_file(
     reformat_model: str = DEFAULT_CONFIG.reformat_model,
     split_audio_approx_every_s: float = DEFAULT_CONFIG.split_audio_approx_every_s,
     silence_threshold_db: float = DEFAULT_CONFIG.silence_threshold_db,
+    pipelined: bool = DEFAULT_CONFIG.pipelined_transcription,
+    stitch_mode: str = DEFAULT_CONFIG.stitch_mode,
 ) -> Path:
     """Transcribe an audio file, returning the path to the final transcript.
 
     Args:
         input_file: Path to the audio file to transcribe
+        pipelined: Start transcribing chunks while the rest of the file is still being split
+        stitch_mode: "reformat" (whole transcript through the LLM) or "boundaries" (seams only)
 
     Returns:
         Path to the generated transcript file
     """
     if not input_file.exists():
         raise FileNotFoundError(f"Input file not found: {input_file}")
+    # checked up front, rather than after transcription has been paid for
+    if stitch_mode not in STITCH_MODES:
+        raise ValueError(f"Invalid stitch_mode: {stitch_mode}. Must be one of {STITCH_MODES}.")
 
-    workdir.set_global(derive_workdir(input_file, "transcribe"))
-    workdir().mkdir(parents=True, exist_ok=True)
+    with bound_workdir(input_file, "transcribe"):
+        return _transcribe_in_workdir(
+            input_file,
+            transcription_model=transcription_model,
+            transcription_context=transcription_context,
+            reformat_model=reformat_model,
+            split_audio_approx_every_s=split_audio_approx_every_s,
+            silence_threshold_db=silence_threshold_db,
+            pipelined=pipelined,
+            stitch_mode=stitch_mode,
+        )
 
+
+def _transcribe_in_workdir(
+    input_file: Path,
+    *,
+    transcription_model: str,
+    transcription_context: str,
+    reformat_model: str,
+    split_audio_approx_every_s: float,
+    silence_threshold_db: float,
+    pipelined: bool,
+    stitch_mode: str,
+) -> Path:
     # Run pipeline steps (decorator handles caching)
-    chunks = split_audio_on_silences(
-        source.from_file(input_file),
-        every=split_audio_approx_every_s,
-        silence_threshold_db=silence_threshold_db,
-    )
-    chunk_transcripts = llm.transcribe_chunks(
-        chunks, model=transcription_model, prompt=transcription_context
-    )
-    final = stitch_transcripts(chunk_transcripts, model=reformat_model)
+    if pipelined:
+        # splitting and transcribing overlap, so this holds a slot in both stages
+        with stages.stage(stages.SPLIT), stages.stage(stages.TRANSCRIBE):
+            chunk_transcripts = llm.split_and_transcribe_chunks(
+                source.from_file(input_file, hash=sha256_of(input_file)),
+                every=split_audio_approx_every_s,
+                silence_threshold_db=silence_threshold_db,
+                model=transcription_model,
+                prompt=transcription_context,
+            )
+    else:
+        with stages.stage(stages.SPLIT):
+            chunks = split_audio_on_silences(
+                source.from_file(input_file, hash=sha256_of(input_file)),
+                every=split_audio_approx_every_s,
+                silence_threshold_db=silence_threshold_db,
+            )
+        with stages.stage(stages.TRANSCRIBE):
+            chunk_transcripts = llm.transcribe_chunks(
+                chunks, model=transcription_model, prompt=transcription_context
+            )
+
+    with stages.stage(stages.LLM), spans.span(spans.STITCH, model=reformat_model, mode=stitch_mode):
+        if stitch_mode == "boundaries":
+            final = stitch_transcripts_at_boundaries(chunk_transcripts, model=reformat_model)
+        else:
+            final = stitch_transcripts(chunk_transcripts, model=reformat_model)
 
     logger.info(f"Done. Output in: {workdir()}")
     logger.info(f"  transcript.txt: {final.path()}")
@@ -1,5 +1,18 @@
 """GPT-4o based transcription with per-chunk speaker diarization."""
 
-from thds.mops import pure
+import typing as ty
 
-pure.magic.pipeline_id("transcribe-diarize")
+if ty.TYPE_CHECKING:
+    from .core import transcribe_audio_diarized
+
+
+def __getattr__(name: str) -> ty.Any:
+    # imported on first use, so that e.g. transcribe-label doesn't pay for mops and openai
+    if name == "transcribe_audio_diarized":
+        from .core import transcribe_audio_diarized
+
+        return transcribe_audio_diarized
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["transcribe_audio_diarized"]
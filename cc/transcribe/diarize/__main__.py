@@ -5,7 +5,8 @@ import shutil
 import logging
 from pathlib import Path
 from cc.config import read_config_from_directory_hierarchy
-from cc.transcribe.diarize.core import transcribe_audio_diarized
+from cc import profiling
+from cc.transcribe import diarize
 
 logger = logging.getLogger(__name__)
 
@@ -17,15 +18,21 @@ def cli() -> None:
     )
     parser.add_argument("input", help="Input audio/video file", type=Path)
     parser.add_argument("-o", "--out", help="Where does the output go? (provide a directory)", type=Path)
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each stage with cProfile and tracemalloc (see cc.profiling).",
+    )
     args = parser.parse_args()
 
     config = read_config_from_directory_hierarchy(args.input)
-    output = transcribe_audio_diarized(
-        input_file=args.input,
-        diarization_model=config.diarization_model,
-        split_audio_approx_every_s=config.split_audio_approx_every_s,
-        silence_threshold_db=config.silence_threshold_db,
-    )
+    with profiling.profiled(args.input.stem, args.profile):
+        output = diarize.transcribe_audio_diarized(
+            input_file=args.input,
+            diarization_model=config.diarization_model,
+            split_audio_approx_every_s=config.split_audio_approx_every_s,
+            silence_threshold_db=config.silence_threshold_db,
+        )
 
     dest: Path | None = args.out
     if dest:
@@ -3,8 +3,8 @@
 import logging
 
 from thds.core.source import Source
-from thds.mops import pure
 
+from cc.transcribe._mops import pure
 from cc.transcribe.diarize.llm.transcribe_chunks import DiarizedChunkTranscript
 from cc.transcribe.workdir import workdir
 
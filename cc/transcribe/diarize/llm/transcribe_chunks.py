@@ -2,14 +2,15 @@
 
 import json
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 from dataclasses import asdict, dataclass
 from pathlib import Path
 
-from openai import OpenAI
-from thds.mops import pure
+from thds.core.concurrency import contextful_threadpool_executor
 
-from cc.env import activate_api_keys
+from cc import spans
+from cc.llm import providers
+from cc.transcribe._mops import pure
 from cc.transcribe.split import Chunk
 from cc.transcribe.workdir import workdir
 
@@ -42,12 +43,19 @@ def _rename_speaker(original: str, chunk_index: int) -> str:
 
 def _transcribe_chunk_diarized(chunk: Chunk, model: str, out_dir: Path) -> DiarizedChunkTranscript:
     """Transcribe a single chunk with GPT-4o diarization."""
-    activate_api_keys()
-
-    client = OpenAI()
+    client = providers.openai_client()
 
     chunk_path = chunk.audio_src.path()
-    with open(chunk_path, "rb") as f:
+    with (
+        spans.span(
+            spans.TRANSCRIBE_CHUNK,
+            model=model,
+            chunk=chunk.index,
+            bytes=chunk_path.stat().st_size,
+            diarized=True,
+        ),
+        open(chunk_path, "rb") as f,
+    ):
         # Using OpenAI client directly instead of litellm because of
         # https://github.com/BerriAI/litellm/issues/18125
         # litellm doesn't properly pass chunking_strategy which is required for diarization
@@ -111,7 +119,7 @@ def transcribe_chunks_diarized(chunks: list[Chunk], model: str) -> list[Diarized
     successes: list[DiarizedChunkTranscript] = []
     failures: list[_TranscriptionError] = []
 
-    with ThreadPoolExecutor(max_workers=2) as ex:
+    with contextful_threadpool_executor(max_workers=2) as ex:
         futures = {
             ex.submit(_transcribe_chunk_diarized, chunk, model, out_dir): chunk for chunk in chunks
         }
@@ -0,0 +1,193 @@
+"""Keep the `.out` workdir tree within a size budget.
+
+Each workdir (`.out/<kind>/<stem>/<hash>/`) holds per-chunk JSON and the like next to the
+final transcript, plus hardlinks to its chunks in the shared split store
+(`.out/split-store/<stem>/<key>/`), which holds the full-length transcode, silence logs and
+the chunks themselves. Only the final outputs are worth keeping: mops stores its own copies of
+memoized results, so dropping intermediates never turns a cache hit for a final result into a
+miss, and a split whose store entry was collected is just split again.
+
+Profiles (`.out/profile/<run>/<recording>/`, see cc.profiling) are collected like workdirs.
+
+Workdirs and store entries are evicted least recently used first; binding a workdir or using
+a store entry marks it as used, and one used within the last GRACE_S is never touched, since
+it may still be in use. A store entry that is locked (being split or linked) is skipped.
+Hardlinked files are counted once, and only count as freed when their last link is removed.
+"""
+
+import contextlib
+import logging
+import os
+import time
+import typing as ty
+from dataclasses import dataclass
+from pathlib import Path
+
+from thds.core import config
+
+from cc.transcribe.split import store
+from cc.transcribe.workdir import KINDS, PROFILE_DIR, _workdir_root
+
+logger = logging.getLogger(__name__)
+
+PINNED_NAMES = frozenset({"transcript.txt", "speakers.toml"})
+_STORE_PINNED_NAMES = frozenset({store.LOCK_FILE})  # others may be waiting on it
+BUDGET_BYTES = config.item("budget_bytes", 20 * 2**30)
+AUTO = config.item("auto", True)  # collect after each `coco` run
+GRACE_S = config.item("grace_s", 3600.0)
+
+
+@dataclass
+class GcResult:
+    files_removed: int = 0
+    bytes_freed: int = 0
+    bytes_kept: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"removed {self.files_removed} files ({self.bytes_freed / 2**20:.1f} MiB);"
+            f" {self.bytes_kept / 2**20:.1f} MiB remain"
+        )
+
+
+_Inode = tuple[int, int]  # (st_dev, st_ino)
+
+
+@dataclass
+class _Collectable:
+    """A workdir, or an entry in the split store."""
+
+    path: Path
+    in_store: bool
+    last_used_ns: int
+    files: list[tuple[Path, _Inode, int]]  # evictable files, their inodes and sizes
+
+
+def _collectable_paths(root: Path) -> ty.Iterator[tuple[Path, bool]]:
+    """The workdirs, profiles and store entries (`<kind>/<stem>/<key>/`) that are inside root,
+    or that root is inside, and whether each is a store entry."""
+    for kind in (*KINDS, PROFILE_DIR, store.STORE_DIR):
+        for path in (_workdir_root().resolve() / kind).glob("*/*"):
+            if path.is_dir() and (path.is_relative_to(root) or root.is_relative_to(path)):
+                yield path, kind == store.STORE_DIR
+
+
+def _scan(root: Path) -> tuple[list[_Collectable], dict[_Inode, int], int]:
+    """What can be collected under root, the link count of every file in it, and their total
+    size (pinned or not; a file with several links is counted once)."""
+    collectables: list[_Collectable] = []
+    links: dict[_Inode, int] = {}
+    sizes: dict[_Inode, int] = {}
+    for path, in_store in _collectable_paths(root):
+        try:
+            c = _Collectable(path, in_store, path.stat().st_mtime_ns, [])
+        except FileNotFoundError:
+            continue
+        pinned = _STORE_PINNED_NAMES if in_store else PINNED_NAMES
+        for dirpath, _dirnames, filenames in os.walk(path):
+            here = Path(dirpath)
+            for name in filenames:
+                try:
+                    st = (here / name).stat()
+                except FileNotFoundError:
+                    continue  # removed by whoever is using the workdir
+                inode = (st.st_dev, st.st_ino)
+                links[inode] = st.st_nlink
+                sizes[inode] = st.st_size
+                c.last_used_ns = max(c.last_used_ns, st.st_atime_ns, st.st_mtime_ns)
+                if name not in pinned:
+                    c.files.append((here / name, inode, st.st_size))
+        collectables.append(c)
+    return collectables, links, sum(sizes.values())
+
+
+def _remove_empty_dirs(top: Path) -> None:
+    for dirpath, _dirnames, _filenames in os.walk(top, topdown=False):
+        if dirpath != str(top):
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass  # not empty
+
+
+def collect_garbage(root: Path, budget_bytes: int, dry_run: bool = False) -> GcResult:
+    """Delete intermediate files, a workdir or store entry at a time, until root fits in the budget.
+
+    The final transcript.txt and speakers.toml of every workdir are always kept, as is
+    anything in a workdir or store entry used within the last GRACE_S, and any store entry
+    that is locked. Root must be the workdir root or inside it.
+    """
+    root = root.resolve()
+    if not root.is_relative_to(_workdir_root().resolve()):
+        raise ValueError(f"{root} is not inside the workdir root {_workdir_root()}")
+    result = GcResult()
+    if not root.is_dir():
+        return result
+
+    collectables, links, total = _scan(root)
+    in_use_after_ns = time.time_ns() - int(GRACE_S() * 1e9)
+    for c in sorted(collectables, key=lambda c: c.last_used_ns):
+        if total <= budget_bytes or c.last_used_ns > in_use_after_ns:
+            break  # in LRU order, so everything after this one is recent too
+        with store.locked_if_idle(c.path) if c.in_store else contextlib.nullcontext(True) as idle:
+            if not idle:
+                logger.info(f"Not collecting {c.path}, which is in use")
+                continue
+            for path, inode, size in c.files:
+                if not dry_run:
+                    path.unlink(missing_ok=True)
+                result.files_removed += 1
+                links[inode] -= 1
+                if links[inode] == 0:  # only removing its last link frees anything
+                    result.bytes_freed += size
+                    total -= size
+            if not dry_run:
+                _remove_empty_dirs(c.path)
+        logger.debug(f"Evicted intermediates from {c.path}")
+
+    result.bytes_kept = total
+    logger.info(f"{'DRY RUN: ' if dry_run else ''}Workdir GC of {root}: {result}")
+    return result
+
+
+def collect_workdir_garbage() -> GcResult:
+    """The automatic policy: keep the default `.out` tree within BUDGET_BYTES."""
+    return collect_garbage(_workdir_root(), BUDGET_BYTES())
+
+
+_SIZE_SUFFIXES = {"": 1, "K": 2**10, "M": 2**20, "G": 2**30, "T": 2**40}
+
+
+def parse_size(size: str) -> int:
+    """'500M', '20G', or a plain number of bytes."""
+    size = size.strip().upper().removesuffix("B").removesuffix("I")
+    suffix = size[-1:] if size[-1:] in _SIZE_SUFFIXES else ""
+    return int(float(size.removesuffix(suffix)) * _SIZE_SUFFIXES[suffix])
+
+
+def main(argv: ty.Sequence[str] | None = None) -> None:
+    """Entry point for `coco gc`."""
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(
+        prog="coco gc",
+        description="Delete intermediate transcription files, least recently used first.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--budget",
+        type=parse_size,
+        default=BUDGET_BYTES(),
+        help="Shrink the workdir tree to at most this size (e.g. 500M, 20G).",
+    )
+    parser.add_argument(
+        "--root", type=Path, default=_workdir_root(), help="The part of the workdir tree to collect."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be deleted.")
+    args = parser.parse_args(argv)
+    try:
+        collect_garbage(args.root, args.budget, dry_run=args.dry_run)
+    except ValueError as e:
+        parser.error(str(e))
@@ -1,4 +1,11 @@
 from .reformat_stitched_transcript import reformat_stitched_transcript
-from .transcribe_chunks import transcribe_chunks, ChunkTranscript
+from .repair_stitch_boundary import repair_stitch_boundary
+from .transcribe_chunks import transcribe_chunks, split_and_transcribe_chunks, ChunkTranscript
 
-__all__ = ["reformat_stitched_transcript", "transcribe_chunks", "ChunkTranscript"]
+__all__ = [
+    "reformat_stitched_transcript",
+    "repair_stitch_boundary",
+    "transcribe_chunks",
+    "split_and_transcribe_chunks",
+    "ChunkTranscript",
+]
@@ -1,8 +1,6 @@
 import logging
 
-from litellm import completion
-
-from cc.env import activate_api_keys
+from cc.llm.complete import cacheable_text, complete
 
 logger = logging.getLogger(__name__)
 
@@ -30,14 +28,11 @@ def reformat_stitched_transcript(text: str, model: str) -> str:
     Send the stitched transcript to an LLM to fix capitalization/punctuation
     and add paragraph breaks.
     """
-    activate_api_keys()
-
-    response = completion(
-        model=model,
-        messages=[
-            {"role": "system", "content": REFORMAT_SYSTEM_PROMPT},
+    content = complete(
+        model,
+        [
+            {"role": "system", "content": cacheable_text(REFORMAT_SYSTEM_PROMPT, model)},
             {"role": "user", "content": text},
         ],
     )
-    content = response.choices[0].message.content
     return content.strip() if content else text
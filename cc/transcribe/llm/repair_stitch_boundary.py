@@ -0,0 +1,49 @@
+import logging
+import re
+from functools import partial
+
+from cc.llm.complete import cacheable_text, complete
+
+logger = logging.getLogger(__name__)
+
+BOUNDARY_SYSTEM_PROMPT = """\
+You are a transcript editor. The user will provide a short excerpt of a transcript. \
+Somewhere near the middle of the excerpt, two separately-transcribed audio fragments \
+were joined, so the sentence at that seam may have incorrect capitalization or punctuation \
+(e.g. a period in the middle of a sentence, or a missing period and a lowercase letter \
+where a new sentence starts).
+
+Your task:
+1. Correct capitalization and punctuation errors at the seam
+2. Leave everything else exactly as it is
+
+CRITICAL RULES:
+- You may ONLY change whitespace, capitalization and punctuation
+- Do NOT change any words, add words, remove words, or rephrase anything
+- Do NOT add paragraph breaks, commentary, headers, or formatting
+- Return ONLY the corrected excerpt, nothing else
+"""
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def only_whitespace_case_punctuation_changed(original: str, modified: str) -> bool:
+    return _WORD_RE.findall(original.lower()) == _WORD_RE.findall(modified.lower())
+
+
+def repair_stitch_boundary(text: str, model: str) -> str:
+    """
+    Send the text around a single chunk boundary to an LLM to fix the
+    capitalization/punctuation where the chunks were joined.
+    """
+    content = complete(
+        model,
+        [
+            {"role": "system", "content": cacheable_text(BOUNDARY_SYSTEM_PROMPT, model)},
+            {"role": "user", "content": text},
+        ],
+        # a repair that changed the words is discarded, so it's not worth caching either
+        valid=partial(only_whitespace_case_punctuation_changed, text),
+    )
+    return content.strip() if content else text
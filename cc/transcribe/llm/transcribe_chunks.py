@@ -1,16 +1,18 @@
 import json
 import logging
 import typing as ty
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 from dataclasses import asdict, dataclass
 from pathlib import Path
 
-from openai import OpenAI, omit
+from openai import omit
+from thds.core.concurrency import contextful_threadpool_executor
 from thds.core.source import Source
-from thds.mops import pure
 
-from cc.env import activate_api_keys
-from cc.transcribe.split import Chunk
+from cc import spans
+from cc.llm import providers
+from cc.transcribe._mops import pure
+from cc.transcribe.split import Chunk, iter_split_audio_on_silences
 from cc.transcribe.workdir import workdir
 
 logger = logging.getLogger(__name__)
@@ -31,11 +33,18 @@ class _TranscriptionError(Exception):
 
 
 def _transcribe_one(chunk: Chunk, model: str, prompt: str, out_dir: Path) -> ChunkTranscript:
-    activate_api_keys()
-
-    client = OpenAI()
-    with chunk.audio_src.path().open("rb") as f:
+    client = providers.openai_client()
+    with (
+        spans.span(
+            spans.TRANSCRIBE_CHUNK,
+            model=model,
+            chunk=chunk.index,
+            bytes=chunk.audio_src.path().stat().st_size,
+        ) as s,
+        chunk.audio_src.path().open("rb") as f,
+    ):
         resp = client.audio.transcriptions.create(model=model, prompt=prompt.strip() or omit, file=f)
+        s.set(chars=len(resp.text))
 
     transcript = ChunkTranscript(index=chunk.index, text=resp.text, audio_src=chunk.audio_src)
 
@@ -48,15 +57,14 @@ def _transcribe_one(chunk: Chunk, model: str, prompt: str, out_dir: Path) -> Chu
     return transcript
 
 
-@pure.magic()
-def transcribe_chunks(chunks: ty.Sequence[Chunk], model: str, prompt: str) -> list[ChunkTranscript]:
+def _transcribe_all(chunks: ty.Iterable[Chunk], model: str, prompt: str) -> list[ChunkTranscript]:
+    """Transcribe chunks in parallel, submitting each one as soon as the iterable yields it."""
     out_dir = workdir() / "chunk-transcripts"
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    logger.info(f"Transcribing {len(chunks)} chunks, using model {model}, with prompt '{prompt}'...")
     successes: list[ChunkTranscript] = []
     failures: list[_TranscriptionError] = []
-    with ThreadPoolExecutor(max_workers=2) as ex:
+    with contextful_threadpool_executor(max_workers=2) as ex:
         futures = {ex.submit(_transcribe_one, chunk, model, prompt, out_dir): chunk for chunk in chunks}
         for future in as_completed(futures):
             chunk = futures[future]
@@ -71,3 +79,31 @@ def transcribe_chunks(chunks: ty.Sequence[Chunk], model: str, prompt: str) -> li
         raise ExceptionGroup("Transcribing some chunks failed", failures)
 
     return successes
+
+
+@pure.magic()
+def transcribe_chunks(chunks: ty.Sequence[Chunk], model: str, prompt: str) -> list[ChunkTranscript]:
+    logger.info(f"Transcribing {len(chunks)} chunks, using model {model}, with prompt '{prompt}'...")
+    return _transcribe_all(chunks, model, prompt)
+
+
+@pure.magic()
+def split_and_transcribe_chunks(
+    input_file: Source,
+    *,
+    every: float,
+    silence_threshold_db: float,
+    model: str,
+    prompt: str,
+) -> list[ChunkTranscript]:
+    """Pipelined split_audio_on_silences + transcribe_chunks.
+
+    Each chunk is uploaded as soon as ffmpeg has written it, rather than after the whole
+    file has been split. Memoized as a single step, so re-runs are just as free as they are
+    for the two-step version.
+    """
+    logger.info(f"Splitting and transcribing chunks as they appear, using model {model}...")
+    chunks = iter_split_audio_on_silences(
+        input_file, every=every, silence_threshold_db=silence_threshold_db
+    )
+    return sorted(_transcribe_all(chunks, model, prompt), key=lambda t: t.index)
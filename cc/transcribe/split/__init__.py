@@ -1,3 +1,20 @@
-from .core import Chunk, extract_audio, split_audio_on_silences
+import typing as ty
 
-__all__ = ["Chunk", "extract_audio", "split_audio_on_silences"]
+if ty.TYPE_CHECKING:
+    from .core import Chunk, extract_audio, iter_split_audio_on_silences, split_audio_on_silences
+
+_CORE_NAMES = frozenset(
+    {"Chunk", "extract_audio", "iter_split_audio_on_silences", "split_audio_on_silences"}
+)
+
+
+def __getattr__(name: str) -> ty.Any:
+    # imported on first use, so that e.g. `coco gc` can use the store without paying for mops
+    if name in _CORE_NAMES:
+        from . import core
+
+        return getattr(core, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["Chunk", "extract_audio", "iter_split_audio_on_silences", "split_audio_on_silences"]
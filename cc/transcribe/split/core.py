@@ -6,14 +6,18 @@ of the audio file_ so that all spoken words in the audio remain intact."""
 import logging
 import re
 import subprocess
+import time
 import typing as ty
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
 
 from thds.core.source import Source
-from thds.mops import pure
 
+from cc import spans
+from cc.files import sha256_of
+from cc.transcribe._mops import pure
+from cc.transcribe.split import store
 from cc.transcribe.split.choose_silence_cuts import Cut, choose_cuts
 from cc.transcribe.split.env import which_ffmpeg_or_raise
 from cc.transcribe.workdir import workdir
@@ -64,7 +68,7 @@ def _build_extract_audio_cmd(input_path: Path, output_path: Path, n_audio_stream
         else ["-map", "0:a:0"]
     )
     return [
-        *"ffmpeg -hide_banner -loglevel error -i".split(),
+        *"ffmpeg -hide_banner -loglevel error -y -i".split(),
         str(input_path),  # paths can have spaces in them
         "-vn",
         *stream_args,
@@ -73,44 +77,51 @@ def _build_extract_audio_cmd(input_path: Path, output_path: Path, n_audio_stream
     ]
 
 
-def extract_audio(input_file: Source) -> Source:
-    """Extract audio track from input file to m4a format, mixing multi-track inputs to mono."""
+def extract_audio(input_file: Source, out_dir: Path) -> Source:
+    """Extract audio track from input file to m4a format, mixing multi-track inputs to mono.
+
+    Any audio.m4a already in out_dir (e.g. from a split that was interrupted) is overwritten.
+    """
     which_ffmpeg_or_raise()
 
-    output_audio_file = workdir() / "audio.m4a"
-    workdir().mkdir(parents=True, exist_ok=True)
+    output_audio_file = out_dir / "audio.m4a"
+    out_dir.mkdir(parents=True, exist_ok=True)
 
-    n_audio_streams = _count_audio_streams(input_file)
-    if n_audio_streams > 1:
-        logger.info(f"Input has {n_audio_streams} audio streams; mixing down to a single mono track")
+    with spans.span(spans.EXTRACT, bytes=input_file.path().stat().st_size) as s:
+        n_audio_streams = _count_audio_streams(input_file)
+        if n_audio_streams > 1:
+            logger.info(f"Input has {n_audio_streams} audio streams; mixing down to a single mono track")
 
-    subprocess.run(
-        _build_extract_audio_cmd(input_file.path(), output_audio_file, n_audio_streams),
-        check=True,
-    )
+        subprocess.run(
+            _build_extract_audio_cmd(input_file.path(), output_audio_file, n_audio_streams),
+            check=True,
+        )
+        s.set(streams=n_audio_streams, output_bytes=output_audio_file.stat().st_size)
     return Source.from_file(output_audio_file)
 
 
-def _detect_silence(audio_file: Source, threshold_db: float) -> Source:
+def _detect_silence(audio_file: Source, threshold_db: float, out_dir: Path) -> Source:
     """Run ffmpeg silencedetect and write log file."""
     which_ffmpeg_or_raise()
 
-    log_file = workdir() / "silence.log"
-    workdir().mkdir(parents=True, exist_ok=True)
+    log_file = out_dir / "silence.log"
+    out_dir.mkdir(parents=True, exist_ok=True)
 
     # ffmpeg writes silencedetect output to stderr
-    result = subprocess.run(
-        [
-            *"ffmpeg -hide_banner -i".split(),
-            str(audio_file.path()),  # paths can have spaces in them
-            "-vn",
-            "-af",
-            f"silencedetect=noise={threshold_db}dB:d=0.4",
-            *"-f null -".split(),
-        ],
-        capture_output=True,
-        text=True,
-    )
+    with spans.span(spans.DETECT_SILENCE, threshold_db=threshold_db) as s:
+        result = subprocess.run(
+            [
+                *"ffmpeg -hide_banner -i".split(),
+                str(audio_file.path()),  # paths can have spaces in them
+                "-vn",
+                "-af",
+                f"silencedetect=noise={threshold_db}dB:d=0.4",
+                *"-f null -".split(),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        s.set(silences=result.stderr.count("silence_end:"))
 
     log_file.write_text(result.stderr, encoding="utf-8")
     logger.info(f"Wrote: {log_file}")
@@ -174,62 +185,96 @@ def _fmt_cuts_for_ffmpeg(cuts: ty.Iterable[Cut]) -> str:
     return ",".join(_fmt_float(cut.chosen, digits=6) for cut in cuts)
 
 
-def _split_on_silence(audio_file: Source, cuts: list[Cut]) -> list[Chunk]:
-    """Split audio file at the specified cut points."""
-    which_ffmpeg_or_raise()
+def _build_segment_cmd(audio_path: Path, cuts: ty.Iterable[Cut], chunks_dir: Path) -> list[str]:
+    """ffmpeg invocation to split at the cut points.
 
-    chunks_dir = workdir() / "chunks"
-    chunks_dir.mkdir(parents=True, exist_ok=True)
+    `-segment_list pipe:1` makes ffmpeg print each chunk's filename to stdout as soon as that
+    chunk has been completely written, which is what lets us hand chunks off while the rest of
+    the file is still being split.
+    """
+    return [
+        *"ffmpeg -hide_banner -loglevel error -y -i".split(),
+        str(audio_path),  # paths can have spaces in them
+        *f"-f segment -segment_times {_fmt_cuts_for_ffmpeg(cuts)} -reset_timestamps 1 -c copy".split(),
+        *"-segment_list pipe:1 -segment_list_type flat".split(),
+        f"{chunks_dir}/chunk_%03d.m4a",
+    ]
 
-    if cuts:
-        cuts_str = _fmt_cuts_for_ffmpeg(cuts)
-        subprocess.run(
-            [
-                *"ffmpeg -hide_banner -loglevel error -i".split(),
-                str(audio_file.path()),  # paths can have spaces in them
-                *f"-f segment -segment_times {cuts_str} -reset_timestamps 1 -c copy".split(),
-                f"{chunks_dir}/chunk_%03d.m4a",
-            ],
-            check=True,
-        )
-    else:
+
+def _chunk_files_in_segment_list(lines: ty.Iterable[str], chunks_dir: Path) -> ty.Iterator[Path]:
+    """The chunk files named by ffmpeg's flat segment list, in the order it finished them."""
+    for line in lines:
+        if name := line.strip():
+            yield chunks_dir / Path(name).name
+
+
+def _iter_chunk_files(audio_file: Source, cuts: list[Cut], chunks_dir: Path) -> ty.Iterator[Path]:
+    """Yield each chunk file as soon as ffmpeg has finished writing it."""
+    if not cuts:
         # No cuts - just copy the whole file as chunk_000
+        chunk_file = chunks_dir / "chunk_000.m4a"
         subprocess.run(
             [
-                *"ffmpeg -hide_banner -loglevel error -i".split(),
+                *"ffmpeg -hide_banner -loglevel error -y -i".split(),
                 str(audio_file.path()),
-                "-c copy",
-                f"{chunks_dir}/chunk_000.m4a",
+                *"-c copy".split(),
+                str(chunk_file),
             ],
             check=True,
         )
+        yield chunk_file
+        return
+
+    with subprocess.Popen(
+        _build_segment_cmd(audio_file.path(), cuts, chunks_dir), stdout=subprocess.PIPE, text=True
+    ) as proc:
+        assert proc.stdout is not None
+        yield from _chunk_files_in_segment_list(proc.stdout, chunks_dir)
+
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
 
-    # Compute chunk boundaries from cuts
-    duration = _get_audio_duration(audio_file)
-    cut_times = [c.chosen for c in cuts]
-    boundaries = [0.0] + cut_times + [duration]
 
+def _iter_split_on_silence(audio_file: Source, cuts: list[Cut], chunks_dir: Path) -> ty.Iterator[Chunk]:
+    """Split audio file at the specified cut points, yielding each non-silent chunk as soon
+    as it has been written and volume-checked."""
+    which_ffmpeg_or_raise()
+
+    chunks_dir.mkdir(parents=True, exist_ok=True)
     logger.info(f"Chunks in: {chunks_dir}")
-    chunk_files = sorted(chunks_dir.glob("*.m4a"), key=lambda f: f.name)
-    chunks = [
-        Chunk(
-            index=_extract_index_from_filename(f.name),
-            audio_src=Source.from_file(f),
-            start_time=boundaries[i],
-            end_time=boundaries[i + 1],
+
+    # Compute chunk boundaries from cuts
+    duration = _get_audio_duration(audio_file)
+    boundaries = [0.0] + [c.chosen for c in cuts] + [duration]
+
+    n_yielded = 0
+    n_skipped = 0
+    start_ns = time.time_ns()
+    for chunk_file in _iter_chunk_files(audio_file, cuts, chunks_dir):
+        index = _extract_index_from_filename(chunk_file.name)
+        assert index + 1 < len(boundaries), (
+            f"ffmpeg wrote {chunk_file.name}, but {len(cuts)} cuts make only {len(boundaries) - 1} chunks"
+        )
+        if _is_silent(chunk_file):
+            n_skipped += 1
+            continue
+
+        n_yielded += 1
+        yield Chunk(
+            index=index,
+            audio_src=Source.from_file(chunk_file, hash=sha256_of(chunk_file)),
+            start_time=boundaries[index],
+            end_time=boundaries[index + 1],
         )
-        for i, f in enumerate(chunk_files)
-    ]
 
-    # Filter out silent chunks
-    non_silent = [c for c in chunks if not _is_silent(c.audio_src.path())]
-    if skipped := len(chunks) - len(non_silent):
-        logger.info(f"Skipped {skipped} silent chunk(s)")
+    if n_skipped:
+        logger.info(f"Skipped {n_skipped} silent chunk(s)")
+    # includes the consumer's time between chunks, which overlaps the split when pipelined
+    spans.record(spans.SPLIT, start_ns, chunks=n_yielded, silent_chunks=n_skipped)
 
-    assert non_silent, (
+    assert n_yielded, (
         f"Apparently the volume never exceeded {_DEFAULT_SILENCE_THRESHOLD}dB for this audio file"
     )
-    return non_silent
 
 
 def _is_audio_file_chunk_sized(
@@ -239,15 +284,11 @@ def _is_audio_file_chunk_sized(
     return audio_file_duration <= max_chunk_size
 
 
-@pure.magic()
-def split_audio_on_silences(
-    input_file: Source,
-    every: float = 1200.0,
-    window: float = 90.0,
-    silence_threshold_db: float = _DEFAULT_SILENCE_THRESHOLD,
-) -> list[Chunk]:
-    """Run the full split pipeline: extract audio, detect silence, choose cuts, split."""
-    audio_file = extract_audio(input_file)
+def _extract_and_choose_cuts(
+    input_file: Source, every: float, window: float, silence_threshold_db: float, out_dir: Path
+) -> tuple[Source, list[Cut] | None]:
+    """Extract audio and choose where to cut it; cuts are None if the file needs no splitting."""
+    audio_file = extract_audio(input_file, out_dir)
 
     audio_duration = _get_audio_duration(audio_file)
     if _is_audio_file_chunk_sized(audio_duration, every, window):
@@ -257,22 +298,103 @@ def split_audio_on_silences(
                 f"Audio file has no speech in it (at least not >={_DEFAULT_SILENCE_THRESHOLD:.1f}dB); "
                 " we will not transcribe"
             )
+        return audio_file, None
 
-        return [
-            Chunk(
-                index=0,
-                audio_src=Source.from_file(audio_file),
-                start_time=0,
-                end_time=audio_duration,
-            )
-        ]
-
-    log_file = _detect_silence(audio_file, threshold_db=silence_threshold_db)
+    log_file = _detect_silence(audio_file, threshold_db=silence_threshold_db, out_dir=out_dir)
     cuts = choose_cuts(
         silence_log_path=log_file,
         every=every,
         duration=audio_duration,
         window=window,
     )
-    chunks = _split_on_silence(audio_file, cuts)
-    return chunks
+    return audio_file, cuts
+
+
+def _whole_file_chunk(audio_file: Source) -> Chunk:
+    return Chunk(
+        index=0,
+        audio_src=Source.from_file(audio_file),
+        start_time=0,
+        end_time=_get_audio_duration(audio_file),
+    )
+
+
+def _iter_split_into(
+    entry: Path, input_file: Source, every: float, window: float, silence_threshold_db: float
+) -> ty.Iterator[Chunk]:
+    # we hold the entry's lock, so anything already in it was left by a split that never
+    # finished, and ffmpeg may overwrite it
+    audio_file, cuts = _extract_and_choose_cuts(
+        input_file, every, window, silence_threshold_db, out_dir=entry
+    )
+    if cuts is None:
+        yield _whole_file_chunk(audio_file)
+        return
+
+    yield from _iter_split_on_silence(audio_file, cuts, entry / "chunks")
+
+
+def _record(chunk: Chunk, entry: Path) -> store.ChunkRecord:
+    return store.ChunkRecord(
+        index=chunk.index,
+        file=chunk.audio_src.path().relative_to(entry).as_posix(),
+        start_time=chunk.start_time,
+        end_time=chunk.end_time,
+    )
+
+
+def _linked_chunk(record: store.ChunkRecord, entry: Path, out_dir: Path) -> Chunk:
+    stored = entry / record["file"]
+    linked = out_dir / record["file"]
+    store.link(stored, linked)
+    return Chunk(
+        index=record["index"],
+        audio_src=Source.from_file(linked, hash=sha256_of(stored)),
+        start_time=record["start_time"],
+        end_time=record["end_time"],
+    )
+
+
+@pure.magic()
+def split_audio_on_silences(
+    input_file: Source,
+    every: float = 1200.0,
+    window: float = 90.0,
+    silence_threshold_db: float = _DEFAULT_SILENCE_THRESHOLD,
+) -> list[Chunk]:
+    """Run the full split pipeline: extract audio, detect silence, choose cuts, split."""
+    chunks = iter_split_audio_on_silences(input_file, every, window, silence_threshold_db)
+    return sorted(chunks, key=lambda c: c.index)
+
+
+def iter_split_audio_on_silences(
+    input_file: Source,
+    every: float = 1200.0,
+    window: float = 90.0,
+    silence_threshold_db: float = _DEFAULT_SILENCE_THRESHOLD,
+) -> ty.Iterator[Chunk]:
+    """Streaming version of split_audio_on_silences.
+
+    Yields each Chunk as soon as ffmpeg has finished writing it and it has passed the
+    silence check, in index order. Not memoized on its own - wrap the consumer instead.
+
+    The outputs are kept in the shared split store and hardlinked into the workdir, so a
+    recording that has already been split with these parameters - by any pipeline - is not
+    decoded again.
+    """
+    out_dir = workdir()
+    entry = store.entry_dir(
+        input_file, every=every, window=window, silence_threshold_db=silence_threshold_db
+    )
+    with store.locked(entry):
+        if (records := store.load_manifest(entry)) is not None:
+            logger.info(f"Reusing {len(records)} chunks already split into {entry}")
+            for record in records:
+                yield _linked_chunk(record, entry, out_dir)
+            return
+
+        records = []
+        for chunk in _iter_split_into(entry, input_file, every, window, silence_threshold_db):
+            records.append(_record(chunk, entry))
+            yield _linked_chunk(records[-1], entry, out_dir)
+        store.save_manifest(entry, records)
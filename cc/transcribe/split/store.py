@@ -0,0 +1,119 @@
+"""Content-addressed store of split outputs.
+
+Splitting the same recording with the same parameters produces the same chunks no matter
+which pipeline asks, so the outputs (the transcode, the silence log and the chunks) are kept
+once, under `.out/split-store/<stem>/<key>/`, keyed by the input's hash and the split
+parameters. Each workdir gets hardlinks to the chunks it uses.
+
+Entries are kept until `coco gc` collects them (see cc.transcribe.gc): least recently used
+first, never while someone holds the entry's lock, and always with the manifest, so a
+collected split is simply split again.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import typing as ty
+from pathlib import Path
+
+from thds import humenc
+from thds.core.source import Source
+
+from cc.files import sha256_of
+from cc.transcribe.workdir import _workdir_root
+
+STORE_DIR = "split-store"  # under the workdir root
+LOCK_FILE = ".lock"
+_MANIFEST = "split.json"
+
+
+class ChunkRecord(ty.TypedDict):
+    index: int
+    file: str  # relative to the store entry
+    start_time: float
+    end_time: float | None
+
+
+def entry_dir(input_file: Source, *, every: float, window: float, silence_threshold_db: float) -> Path:
+    input_hash = input_file.hash or sha256_of(input_file.path())
+    key = json.dumps(
+        {
+            "input": f"{input_hash.algo}:{input_hash.bytes.hex()}",
+            "every": every,
+            "window": window,
+            "silence_threshold_db": silence_threshold_db,
+        },
+        sort_keys=True,
+    )
+    stem = input_file.path().stem.replace(" ", "-")
+    return _workdir_root() / STORE_DIR / stem / humenc.encode(hashlib.sha256(key.encode()).digest())
+
+
+@contextlib.contextmanager
+def locked(entry: Path) -> ty.Iterator[Path]:
+    """Hold the entry exclusively, so two pipelines never split the same input at once.
+
+    Whoever comes second waits, then finds the finished split in the store.
+    """
+    entry.mkdir(parents=True, exist_ok=True)
+    with open(entry / LOCK_FILE, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            os.utime(entry)  # marks it as recently used, for garbage collection
+            yield entry
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def locked_if_idle(entry: Path) -> ty.Iterator[bool]:
+    """Hold an existing entry exclusively if nobody else does; yields whether it is held.
+
+    For garbage collection, which must neither wait for a split nor pull its chunks out from
+    under whoever is linking them.
+    """
+    with contextlib.ExitStack() as stack:
+        try:
+            lock_file = stack.enter_context(open(entry / LOCK_FILE, "a"))  # "w" would mark it used
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (FileNotFoundError, BlockingIOError):  # the entry is gone, or in use
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_manifest(entry: Path) -> list[ChunkRecord] | None:
+    """The chunks of a finished split, or None if there is none (or some were collected)."""
+    try:
+        records: list[ChunkRecord] = json.loads((entry / _MANIFEST).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not all((entry / record["file"]).exists() for record in records):
+        return None
+    return records
+
+
+def save_manifest(entry: Path, records: list[ChunkRecord]) -> None:
+    """Mark the split as finished; written last, so a crash mid-split is never reused."""
+    tmp = entry / f"{_MANIFEST}.tmp"
+    tmp.write_text(json.dumps(records, indent=2), encoding="utf-8")
+    os.replace(tmp, entry / _MANIFEST)
+
+
+def link(stored: Path, dest: Path) -> None:
+    """Hardlink a stored file into a workdir, copying if the filesystem can't link."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists():
+        if dest.samefile(stored):
+            return
+        dest.unlink()
+    try:
+        os.link(stored, dest)
+    except OSError:
+        shutil.copy2(stored, dest)
@@ -1,8 +1,15 @@
 import logging
+import re
+import typing as ty
+from functools import partial
+from pathlib import Path
 
+from thds.core.concurrency import contextful_threadpool_executor
 from thds.core.source import Source
-from thds.mops import pure
 
+from cc import stages
+from cc.transcribe._mops import pure
+from cc.transcribe.llm.repair_stitch_boundary import only_whitespace_case_punctuation_changed
 from cc.transcribe.llm.transcribe_chunks import ChunkTranscript
 from cc.transcribe.workdir import workdir
 from cc.transcribe import llm
@@ -10,23 +17,36 @@ from cc.transcribe import llm
 logger = logging.getLogger(__name__)
 
 
-@pure.magic()
-def stitch_transcripts(chunk_transcripts: list[ChunkTranscript], model: str) -> Source:
-    chunk_transcripts = sorted(chunk_transcripts, key=lambda t: t.index)
+def _join_chunk_texts(chunk_transcripts: list[ChunkTranscript]) -> list[str]:
+    txt_parts = [txt for ct in chunk_transcripts if (txt := ct.text.strip())]
+    if not txt_parts:
+        raise ValueError("No text found in transcripts.")
+    return txt_parts
 
-    out_raw = workdir() / "transcript.raw.txt"
-    out_txt = workdir() / "transcript.txt"
 
+STITCH_MODES = ("reformat", "boundaries")
+
+
+def _single_chunk(chunk_transcripts: list[ChunkTranscript], out_txt: Path) -> Source | None:
+    """A lone chunk needs no stitching: its text is the transcript, as is, in either mode."""
     if len(chunk_transcripts) == 1 and (txt := chunk_transcripts[0].text.strip()):
         out_txt.write_text(txt + "\n", encoding="utf-8")
         logger.info(f"Received 1 chunk to stitch; wrote: {out_txt}")
         return Source.from_file(out_txt)
+    return None
 
-    txt_parts = [txt for ct in chunk_transcripts if (txt := ct.text.strip())]
-    if not txt_parts:
-        raise ValueError("No text found in transcripts.")
 
-    raw_text = "\n\n".join(txt_parts)
+@pure.magic()
+def stitch_transcripts(chunk_transcripts: list[ChunkTranscript], model: str) -> Source:
+    chunk_transcripts = sorted(chunk_transcripts, key=lambda t: t.index)
+
+    out_raw = workdir() / "transcript.raw.txt"
+    out_txt = workdir() / "transcript.txt"
+
+    if single := _single_chunk(chunk_transcripts, out_txt):
+        return single
+
+    raw_text = "\n\n".join(_join_chunk_texts(chunk_transcripts))
     out_raw.write_text(raw_text + "\n", encoding="utf-8")  # for troubleshooting
     logger.info(f"Wrote raw joined-transcript: {out_raw}")
 
@@ -36,3 +56,84 @@ def stitch_transcripts(chunk_transcripts: list[ChunkTranscript], model: str) ->
     logger.info(f"Wrote reformatted transcript: {out_txt}")
 
     return Source.from_file(out_txt)
+
+
+def _stitch_at_boundaries(
+    parts: list[str], repair: ty.Callable[[str], str], window_words: int = 30
+) -> str:
+    """Join the parts, sending only the words on either side of each seam to `repair`.
+
+    Each part donates at most half of its words to each neighboring seam, so the windows
+    never overlap and can be repaired in parallel and spliced back in place. A repair that
+    changed anything other than whitespace, case or punctuation is discarded.
+    """
+    words = [part.split() for part in parts]
+    heads = [0] + [min(window_words, len(w) // 2) for w in words[1:]]
+    tails = [min(window_words, len(w) // 2) for w in words[:-1]] + [0]
+
+    seams = [
+        " ".join(words[i][len(words[i]) - tails[i] :] + words[i + 1][: heads[i + 1]])
+        for i in range(len(parts) - 1)
+    ]
+
+    def repair_seam(seam: str) -> str:
+        return repair(seam) if seam else seam  # parts too short to lend the seam any words
+
+    with contextful_threadpool_executor(max_workers=stages.workers(stages.LLM)) as ex:
+        repaired = list(ex.map(repair_seam, seams))
+
+    pieces: list[str] = []
+    for i, part_words in enumerate(words):
+        pieces.append(" ".join(part_words[heads[i] : len(part_words) - tails[i]]))
+        if i < len(seams):
+            if only_whitespace_case_punctuation_changed(seams[i], repaired[i]):
+                pieces.append(repaired[i])
+            else:
+                logger.warning(f"Discarding repair of seam {i}, which changed more than punctuation")
+                pieces.append(seams[i])
+
+    return " ".join(" ".join(pieces).split())
+
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _paragraphize(text: str, max_chars: int = 600) -> str:
+    """Break text into paragraphs at sentence ends, roughly every max_chars characters."""
+    paragraphs: list[str] = []
+    current: list[str] = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        current.append(sentence)
+        if sum(len(s) + 1 for s in current) >= max_chars:
+            paragraphs.append(" ".join(current))
+            current = []
+    if current:
+        paragraphs.append(" ".join(current))
+    return "\n\n".join(paragraphs)
+
+
+@pure.magic()
+def stitch_transcripts_at_boundaries(chunk_transcripts: list[ChunkTranscript], model: str) -> Source:
+    """Like stitch_transcripts, but only the text around each chunk seam goes to the LLM.
+
+    Paragraph breaks are added locally, so the model never has to re-emit the whole
+    transcript - much faster and cheaper for long recordings.
+    """
+    chunk_transcripts = sorted(chunk_transcripts, key=lambda t: t.index)
+
+    out_raw = workdir() / "transcript.raw.txt"
+    out_txt = workdir() / "transcript.txt"
+
+    if single := _single_chunk(chunk_transcripts, out_txt):
+        return single
+
+    parts = _join_chunk_texts(chunk_transcripts)
+    out_raw.write_text("\n\n".join(parts) + "\n", encoding="utf-8")  # for troubleshooting
+    logger.info(f"Wrote raw joined-transcript: {out_raw}")
+
+    logger.info(f"Repairing {len(parts) - 1} chunk boundaries with {model}...")
+    stitched = _stitch_at_boundaries(parts, partial(llm.repair_stitch_boundary, model=model))
+    out_txt.write_text(_paragraphize(stitched) + "\n", encoding="utf-8")
+    logger.info(f"Wrote stitched transcript: {out_txt}")
+
+    return Source.from_file(out_txt)
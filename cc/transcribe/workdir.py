@@ -1,9 +1,14 @@
+import contextlib
+import os
+import typing as ty
 from pathlib import Path
 
 from thds import humenc
-from thds.core import config, hashing, project_root
+from thds.core import config, project_root
 from thds.core.lazy import lazy
 
+from cc.files import sha256_of
+
 
 @lazy
 def _workdir_root() -> Path:
@@ -13,11 +18,32 @@ def _workdir_root() -> Path:
     return _project_root / ".out"
 
 
+# the kinds of workdir under the root; anything else there (e.g. the split store) isn't a workdir
+KINDS = ("transcribe", "transcribe-gpt-diarize")
+PROFILE_DIR = "profile"  # --profile dumps, as `<run>/<recording>/`
+
+
 def derive_workdir(input_file: Path, kind: str = "transcribe") -> Path:
+    assert kind in KINDS, f"Unknown kind of workdir: {kind}"
     dirname = input_file.stem.replace(" ", "-")
-    sha256_wordybin = humenc.encode(hashing.file("sha256", input_file))
+    sha256_wordybin = humenc.encode(sha256_of(input_file).bytes)
     workdir = _workdir_root() / kind / dirname / sha256_wordybin
     return workdir
 
 
 workdir: config.ConfigItem[Path] = config.item("workdir", parse=Path, default=_workdir_root())
+
+
+@contextlib.contextmanager
+def bound_workdir(input_file: Path, kind: str) -> ty.Iterator[Path]:
+    """Create the workdir for this input file and make it the workdir for the current context.
+
+    The binding is context-local rather than global, so different recordings can be
+    processed concurrently in separate threads without clobbering each other's outputs.
+    Threads spawned inside the context do not inherit it, so steps that fan out to a
+    thread pool should resolve workdir() first and pass the path to their workers.
+    """
+    with workdir.set_local(derive_workdir(input_file, kind)) as wd:
+        wd.mkdir(parents=True, exist_ok=True)
+        os.utime(wd)  # marks it as recently used, for garbage collection
+        yield wd
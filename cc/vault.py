@@ -1,5 +1,6 @@
 import difflib
 import logging
+import os
 import re
 import typing as ty
 import urllib
@@ -8,6 +9,8 @@ from dataclasses import dataclass
 from functools import lru_cache, partial
 from pathlib import Path
 
+from cc import spans
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,12 +58,72 @@ def build_vault_index(vault_root: Path) -> VaultIndex:
     Stem is used instead of filename because Obsidian allows you to reference
     files by stem (without extension)."""
     index: VaultIndex = defaultdict(set)
-    for path in vault_root.rglob("*"):
-        if path.is_file():
-            index[path.stem].add(path)
+    with spans.span(spans.VAULT_SCAN) as s:
+        for path in vault_root.rglob("*"):
+            if path.is_file():
+                index[path.stem].add(path)
+        s.set(stems=len(index))
     return index
 
 
+@dataclass
+class _Listing:
+    mtime_ns: int
+    files: list[Path]
+    subdirs: list[Path]
+
+
+class VaultIndexCache:
+    """Keeps vault indexes between runs, re-listing only the directories that changed.
+
+    Adding, removing or renaming an entry changes its directory's mtime, so an unchanged
+    directory costs a stat rather than a listing. Builds the same index as build_vault_index.
+    """
+
+    def __init__(self) -> None:
+        self._listings: dict[Path, _Listing] = {}
+
+    def _list(self, directory: Path) -> _Listing | None:
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._listings.get(directory)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached
+
+        listing = _Listing(mtime_ns, [], [])
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    listing.subdirs.append(Path(entry.path))
+                elif entry.is_file():
+                    listing.files.append(Path(entry.path))
+        self._listings[directory] = listing
+        return listing
+
+    def index(self, vault_root: Path) -> VaultIndex:
+        index: VaultIndex = defaultdict(set)
+        seen: set[Path] = set()
+        pending = [vault_root]
+        with spans.span(spans.VAULT_SCAN, incremental=True) as s:
+            while pending:
+                directory = pending.pop()
+                if (listing := self._list(directory)) is None:
+                    continue
+                seen.add(directory)
+                for path in listing.files:
+                    index[path.stem].add(path)
+                pending.extend(listing.subdirs)
+            s.set(stems=len(index), directories=len(seen))
+
+        # forget directories that were removed from under this root
+        for directory in [d for d in self._listings if d.is_relative_to(vault_root)]:
+            if directory not in seen:
+                del self._listings[directory]
+        return index
+
+
 @dataclass
 class _Link:
     """Represents a Markdown or Obsidian link found in a note."""
@@ -365,14 +428,18 @@ def find_linking_notes(index: VaultIndex, vault_root: Path, audio_path: Path) ->
     """Find all text notes that link to the given audio file."""
     logger.info(f"Looking for notes linking to: {audio_path.name}")
     linking_notes = []
-    for note_path in vault_root.rglob("*.md"):
-        try:
-            links = _find_links_to_file(index=index, in_md_file=note_path, target_file=audio_path)
-            if links:
-                linking_notes.append(note_path)
-                logger.info(f"Found linking note: {note_path}")
-        except Exception as e:
-            logger.warning(f"Could not read {note_path}: {e}")
+    with spans.span(spans.FIND_LINKS) as s:
+        n_notes = 0
+        for note_path in vault_root.rglob("*.md"):
+            n_notes += 1
+            try:
+                links = _find_links_to_file(index=index, in_md_file=note_path, target_file=audio_path)
+                if links:
+                    linking_notes.append(note_path)
+                    logger.info(f"Found linking note: {note_path}")
+            except Exception as e:
+                logger.warning(f"Could not read {note_path}: {e}")
+        s.set(notes=n_notes, linking_notes=len(linking_notes))
     return linking_notes
 
 
@@ -424,29 +491,82 @@ def replace_links_in_notes(
 
         return link.full_match  # Failsafe
 
-    for note_path in linking_notes:
-        try:
-            content = note_path.read_text(encoding="utf-8")
-            new_content = _LINK_PATTERN.sub(partial(replacer, note_path), content)
-
-            if content != new_content:
-                logger.info(f"Links in {note_path} need updating:")
-                _print_diff(
-                    difflib.unified_diff(
-                        content.splitlines(keepends=True),
-                        new_content.splitlines(keepends=True),
-                        fromfile=f"{note_path.name} (original)",
-                        tofile=f"{note_path.name} (modified)",
+    with spans.span(spans.LINK_REWRITE, notes=len(linking_notes), dry_run=dry_run):
+        for note_path in linking_notes:
+            try:
+                content = note_path.read_text(encoding="utf-8")
+                new_content = _LINK_PATTERN.sub(partial(replacer, note_path), content)
+
+                if content != new_content:
+                    logger.info(f"Links in {note_path} need updating:")
+                    _print_diff(
+                        difflib.unified_diff(
+                            content.splitlines(keepends=True),
+                            new_content.splitlines(keepends=True),
+                            fromfile=f"{note_path.name} (original)",
+                            tofile=f"{note_path.name} (modified)",
+                        )
+                    )
+                    if not dry_run:
+                        note_path.write_text(new_content, encoding="utf-8")
+                        logger.info(f"Updated links in: {note_path}")
+                    else:
+                        logger.info(f"DRY RUN: Would update links in: {note_path}")
+                else:
+                    logger.warning(
+                        f"No changes made to {note_path}, though it was identified as a linking note."
                     )
-                )
+            except Exception as e:
+                logger.exception(f"Failed to update links in {note_path}: {e}")
+
+
+def replace_note_links(
+    vault_root: Path,
+    linking_notes: ty.Iterable[Path],
+    old_note_path: Path,
+    new_note_path: Path,
+    old_title: str,
+    new_title: str,
+    dry_run: bool = False,
+) -> list[Path]:
+    """Point links to old_note_path, as replace_links_in_notes writes them, at new_note_path,
+    in a single pass over the linking notes. Returns the notes that changed.
+
+    Link text that is still old_title becomes new_title; text that has been edited is kept.
+    """
+    old_target = old_note_path.relative_to(vault_root).as_posix()
+    old_targets = {old_target, old_target.removesuffix(".md")}
+    new_target = new_note_path.relative_to(vault_root).as_posix()
+
+    def replacer(match: re.Match) -> str:
+        if match.group("obsidian"):
+            if match.group("obs_target").strip() not in old_targets:
+                return match.group(0)
+            text = match.group("obs_text")
+            text = new_title if text is None or text == old_title else text
+            return f"{match.group('obs_embed') or ''}[[{new_target}|{text}]]"
+
+        if urllib.parse.unquote(match.group("md_target").strip()) not in old_targets:
+            return match.group(0)
+        text = match.group("md_text")
+        text = new_title if text == old_title else text
+        return f"{match.group('md_embed') or ''}[{text}]({new_target})"
+
+    changed = []
+    linking_notes = list(linking_notes)
+    with spans.span(spans.LINK_REWRITE, notes=len(linking_notes), dry_run=dry_run):
+        for note_path in linking_notes:
+            try:
+                content = note_path.read_text(encoding="utf-8")
+                new_content = _LINK_PATTERN.sub(replacer, content)
+                if content == new_content:
+                    continue
+                changed.append(note_path)
                 if not dry_run:
                     note_path.write_text(new_content, encoding="utf-8")
-                    logger.info(f"Updated links in: {note_path}")
+                    logger.info(f"Pointed links in {note_path} at {new_target}")
                 else:
-                    logger.info(f"DRY RUN: Would update links in: {note_path}")
-            else:
-                logger.warning(
-                    f"No changes made to {note_path}, though it was identified as a linking note."
-                )
-        except Exception as e:
-            logger.exception(f"Failed to update links in {note_path}: {e}")
+                    logger.info(f"DRY RUN: Would point links in {note_path} at {new_target}")
+            except Exception as e:
+                logger.exception(f"Failed to update links in {note_path}: {e}")
+    return changed
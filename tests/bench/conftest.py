@@ -0,0 +1,176 @@
+"""Shared fixtures for the benchmarks.
+
+Benchmarks are deselected by default. Run with:  uv run pytest tests/bench -m bench -s
+
+Each measurement records wall time, subprocess CPU time (ffmpeg's work) and, on Linux, the
+read/write syscalls and bytes this process made, from /proc/self/io. `Results.measure`
+also runs the operation an extra time under tracemalloc, for its peak Python memory, so
+that tracing doesn't slow down the timed run.
+
+Every measurement is also written, with the commit and machine it came from, to
+tests/bench/results/<session start>.json, so runs can be compared over time.
+"""
+
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+import typing as ty
+from pathlib import Path
+
+import pytest
+
+from tests.bench import synthetic_audio, synthetic_vault
+
+_BENCH_DIR = Path(__file__).parent
+_GENERATED = _BENCH_DIR / "generated"
+_RESULTS = _BENCH_DIR / "results"
+
+
+def _git_rev() -> str:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        capture_output=True,
+        text=True,
+        cwd=_BENCH_DIR,
+        check=False,
+    )
+    return result.stdout.strip() or "unknown"
+
+
+def _children_cpu_s() -> float:
+    """CPU time used by finished subprocesses - where ffmpeg's work shows up."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+_PROC_IO = Path("/proc/self/io")
+_IO_FIELDS = ("syscr", "syscw", "rchar", "wchar")
+
+
+def _proc_io() -> dict[str, int]:
+    """This process's read/write syscall counts and bytes so far; empty where there's no /proc."""
+    try:
+        text = _PROC_IO.read_text()
+    except OSError:
+        return {}
+    counters = dict(line.split(": ") for line in text.splitlines())
+    return {name: int(counters[name]) for name in _IO_FIELDS}
+
+
+R = ty.TypeVar("R")
+
+
+class Results:
+    def __init__(self) -> None:
+        self.started = time.strftime("%Y%m%dT%H%M%S")
+        self.rows: list[dict[str, ty.Any]] = []
+
+    def add(self, benchmark: str, **fields: ty.Any) -> None:
+        self.rows.append({"benchmark": benchmark, **fields})
+        print(f"\n{benchmark}: " + ", ".join(f"{k}={v}" for k, v in fields.items()))
+
+    @contextlib.contextmanager
+    def timed(self, benchmark: str, **fields: ty.Any) -> ty.Iterator[dict[str, ty.Any]]:
+        """Record the wall time (and subprocess CPU time) of the block; add to the yielded dict
+        to record more about it."""
+        extra: dict[str, ty.Any] = {}
+        cpu = _children_cpu_s()
+        io = _proc_io()
+        start = time.perf_counter()
+        yield extra
+        wall_s = time.perf_counter() - start
+        io_after = _proc_io()
+        self.add(
+            benchmark,
+            **fields,
+            wall_s=round(wall_s, 4),
+            subprocess_cpu_s=round(_children_cpu_s() - cpu, 4),
+            **{name: io_after[name] - io[name] for name in io},
+            **extra,
+        )
+
+    def measure(self, benchmark: str, operation: ty.Callable[[], R], **fields: ty.Any) -> R:
+        """Run the operation under tracemalloc for its peak memory, then again, timed.
+
+        It must be repeatable; the result of the timed run is returned."""
+        tracemalloc.start()
+        try:
+            operation()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        with self.timed(benchmark, **fields, peak_mb=round(peak / 2**20, 2)):
+            return operation()
+
+    def write(self) -> Path | None:
+        if not self.rows:
+            return None
+        _RESULTS.mkdir(parents=True, exist_ok=True)
+        path = _RESULTS / f"{self.started}.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "started": self.started,
+                    "git_rev": _git_rev(),
+                    "machine": {
+                        "platform": platform.platform(),
+                        "python": platform.python_version(),
+                        "cpus": os.cpu_count(),
+                    },
+                    "results": self.rows,
+                },
+                indent=2,
+            )
+            + "\n",
+            encoding="utf-8",
+        )
+        return path
+
+
+@pytest.fixture(scope="session")
+def bench_results() -> ty.Iterator[Results]:
+    results = Results()
+    yield results
+    if path := results.write():
+        print(f"\nBenchmark results: {path}")
+
+
+@pytest.fixture(scope="session")
+def requires_ffmpeg() -> None:
+    from cc.transcribe.split.env import which_ffmpeg_or_raise
+
+    try:
+        which_ffmpeg_or_raise()
+    except OSError as e:
+        pytest.skip(f"ffmpeg is needed for this benchmark: {e}")
+
+
+@pytest.fixture(scope="session")
+def synthetic_recording(requires_ffmpeg) -> ty.Callable[[synthetic_audio.Spec], Path]:
+    """Generates the recording for a spec, or reuses the one generated by an earlier run."""
+
+    def _get(spec: synthetic_audio.Spec) -> Path:
+        audio_file = _GENERATED / f"{spec.name}.m4a"
+        if audio_file.exists():
+            return audio_file
+        partial = audio_file.with_suffix(".partial.m4a")
+        synthetic_audio.generate(spec, partial)
+        partial.rename(audio_file)
+        return audio_file
+
+    return _get
+
+
+@pytest.fixture(scope="session")
+def generated_vault() -> ty.Callable[[synthetic_vault.Spec], synthetic_vault.Vault]:
+    """Generates the vault for a spec, or reuses the one generated by an earlier run."""
+
+    def _get(spec: synthetic_vault.Spec) -> synthetic_vault.Vault:
+        return synthetic_vault.generate_or_reuse(spec, _GENERATED / f"vault-{spec.name}")
+
+    return _get
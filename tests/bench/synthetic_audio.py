@@ -0,0 +1,174 @@
+"""Generate synthetic recordings of any length with ffmpeg's lavfi sources - no TTS needed.
+
+"Speech" is a harmonic tone with a syllable-rate tremolo, one pitch per speaker, loud enough
+to never count as silence. Between utterances are pauses drawn from a controlled
+distribution: mostly short gaps (too short for silencedetect's 0.4s minimum), sometimes
+long ones. A pink noise bed can be laid under everything, and each speaker can get their own
+audio stream, like an iOS call recording.
+
+Each voice is rendered once; the recording is then stitched from slices of it with the
+concat demuxer, so even a 4-hour recording is a single encoding pass.
+
+Usage:
+    python -m tests.bench.synthetic_audio <output.m4a> --minutes 60 [--speakers 2 --streams 2]
+"""
+
+import random
+import subprocess
+import tempfile
+import typing as ty
+from dataclasses import dataclass
+from pathlib import Path
+
+_SAMPLE_RATE = 16_000
+_VOICE_HZ = (140.0, 210.0, 110.0, 250.0)
+
+
+@dataclass(frozen=True)
+class Spec:
+    duration_s: float
+    speakers: int = 1
+    streams: int = 1  # 1: everyone mixed together; == speakers: one stream per speaker
+    utterance_s: tuple[float, float] = (2.0, 20.0)  # uniform
+    gap_mean_s: float = 0.25  # exponential; most are too short to be detected as silence
+    long_pause_probability: float = 0.15
+    long_pause_s: tuple[float, float] = (0.6, 4.0)  # uniform
+    noise_bed_db: float | None = -55.0
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        assert self.streams in (1, self.speakers), "either one stream, or one per speaker"
+        assert self.speakers <= len(_VOICE_HZ)
+
+    @property
+    def name(self) -> str:
+        noise = "quiet" if self.noise_bed_db is None else f"noise{-self.noise_bed_db:g}"
+        return (
+            f"{self.duration_s / 60:g}min-{self.speakers}spk-{self.streams}str-{noise}-seed{self.seed}"
+        )
+
+
+class Segment(ty.NamedTuple):
+    speaker: int | None  # None: a pause
+    duration_s: float
+
+
+def schedule(spec: Spec) -> list[Segment]:
+    """Who speaks when, and the pauses between, filling exactly spec.duration_s."""
+    rng = random.Random(spec.seed)
+    segments: list[Segment] = []
+    elapsed = 0.0
+    speaker = 0
+    while elapsed < spec.duration_s:
+        utterance = min(rng.uniform(*spec.utterance_s), spec.duration_s - elapsed)
+        segments.append(Segment(speaker, utterance))
+        elapsed += utterance
+        if elapsed >= spec.duration_s:
+            break
+
+        if rng.random() < spec.long_pause_probability:
+            pause = rng.uniform(*spec.long_pause_s)
+        else:
+            pause = rng.expovariate(1 / spec.gap_mean_s)
+        pause = min(pause, spec.duration_s - elapsed)
+        segments.append(Segment(None, pause))
+        elapsed += pause
+        if spec.speakers > 1:
+            speaker = rng.choice([s for s in range(spec.speakers) if s != speaker])
+    return segments
+
+
+def _ffmpeg(*args: str | Path) -> None:
+    subprocess.run(["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *map(str, args)], check=True)
+
+
+def _render_voice(path: Path, hz: float, seconds: float) -> None:
+    harmonics = f"sin(2*PI*{hz}*t)+0.5*sin(4*PI*{hz}*t)+0.25*sin(6*PI*{hz}*t)"
+    tremolo = "0.55+0.45*sin(2*PI*4.3*t)"
+    _ffmpeg(
+        "-f", "lavfi",
+        "-i", f"aevalsrc='0.25*({harmonics})*({tremolo})':s={_SAMPLE_RATE}:d={seconds}",
+        path,
+    )  # fmt: skip
+
+
+def _render_silence(path: Path, seconds: float) -> None:
+    _ffmpeg("-f", "lavfi", "-i", f"anullsrc=r={_SAMPLE_RATE}:cl=mono", "-t", str(seconds), path)
+
+
+def _concat_list(
+    segments: list[Segment], stream_speaker: int | None, voices: list[Path], silence: Path
+) -> str:
+    """A concat demuxer script for one stream; other speakers' turns are silence on it."""
+    lines: list[str] = []
+    for segment in segments:
+        audible = segment.speaker is not None and stream_speaker in (None, segment.speaker)
+        clip = voices[segment.speaker] if audible and segment.speaker is not None else silence
+        lines += [f"file '{clip}'", "inpoint 0", f"outpoint {segment.duration_s:.3f}"]
+    return "\n".join(lines) + "\n"
+
+
+def generate(spec: Spec, output: Path) -> Path:
+    """Write the recording described by spec to output (any format ffmpeg can encode, e.g. .m4a)."""
+    segments = schedule(spec)
+    longest = max(s.duration_s for s in segments) + 1.0
+    with tempfile.TemporaryDirectory(prefix="synthetic-audio-") as tmp:
+        tmpdir = Path(tmp)
+        voices = [tmpdir / f"voice{i}.wav" for i in range(spec.speakers)]
+        for voice, hz in zip(voices, _VOICE_HZ):
+            _render_voice(voice, hz, longest)
+        silence = tmpdir / "silence.wav"
+        _render_silence(silence, longest)
+
+        inputs: list[str | Path] = []
+        filters: list[str] = []
+        for i in range(spec.streams):
+            concat = tmpdir / f"stream{i}.txt"
+            concat.write_text(
+                _concat_list(segments, i if spec.streams > 1 else None, voices, silence),
+                encoding="utf-8",
+            )
+            inputs += ["-f", "concat", "-safe", "0", "-i", concat]
+            if spec.noise_bed_db is None:
+                filters.append(f"[{i}:a]anull[out{i}]")
+            else:
+                amplitude = 10 ** (spec.noise_bed_db / 20)
+                filters.append(
+                    f"anoisesrc=color=pink:r={_SAMPLE_RATE}:a={amplitude:.6f}:d={spec.duration_s}[noise{i}];"
+                    f"[{i}:a][noise{i}]amix=inputs=2:duration=first:normalize=0[out{i}]"
+                )
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        _ffmpeg(
+            *inputs,
+            "-filter_complex", ";".join(filters),
+            *[arg for i in range(spec.streams) for arg in ("-map", f"[out{i}]")],
+            "-c:a", "aac", "-b:a", "48k",
+            output,
+        )  # fmt: skip
+    return output
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--minutes", type=float, default=5.0)
+    parser.add_argument("--speakers", type=int, default=1)
+    parser.add_argument("--streams", type=int, default=1)
+    parser.add_argument("--noise-bed-db", type=float, default=-55.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    spec = Spec(
+        duration_s=args.minutes * 60,
+        speakers=args.speakers,
+        streams=args.streams,
+        noise_bed_db=args.noise_bed_db,
+        seed=args.seed,
+    )
+    print(generate(spec, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Generate synthetic Obsidian vaults of any size, for benchmarking discovery and link rewriting.
+
+Notes and attachments are scattered over a deep folder tree. Each note has headings, filler
+paragraphs and links to attachments, in a chosen mix of styles: wikilinks (by stem, name or
+partial path), embeds, relative markdown links, and bare-stem wikilinks to attachments
+whose stem is shared with another attachment elsewhere (ambiguous, as Obsidian allows).
+
+One attachment is the recording being processed: `target_links` notes link to it, each in
+its own section with some context on the line above, in every link style in turn.
+
+Usage:
+    python -m tests.bench.synthetic_vault <vault dir> --notes 10000 [--attachments 1000]
+"""
+
+import json
+import os
+import random
+import shutil
+import typing as ty
+import urllib.parse
+from dataclasses import dataclass
+from pathlib import Path
+
+_COMPLETE = ".synthetic-vault-complete"
+
+_WORDS = (
+    "project plan review budget team notes idea draft meeting garden travel recipe reading"
+    " weekly journal research design hiring launch follow up question answer summary"
+).split()
+
+_LINK_STYLES = ("wikilink", "embed", "markdown", "ambiguous")
+
+
+@dataclass(frozen=True)
+class Spec:
+    notes: int
+    attachments: int | None = None  # default: one per ten notes
+    depth: int = 4
+    fanout: int = 6
+    # relative weights of the link styles, in the order of _LINK_STYLES
+    link_mix: tuple[float, float, float, float] = (0.4, 0.3, 0.2, 0.1)
+    links_per_note: tuple[int, int] = (0, 6)  # uniform
+    ambiguous_fraction: float = 0.05  # of attachment stems, shared with a second attachment
+    target_links: int = 5
+    seed: int = 0
+
+    @property
+    def n_attachments(self) -> int:
+        return self.attachments if self.attachments is not None else max(1, self.notes // 10)
+
+    @property
+    def name(self) -> str:
+        mix = "-".join(f"{w:g}" for w in self.link_mix)
+        return (
+            f"{self.notes}n-{self.n_attachments}a-d{self.depth}f{self.fanout}-mix{mix}"
+            f"-amb{self.ambiguous_fraction:g}-t{self.target_links}-seed{self.seed}"
+        )
+
+
+class Vault(ty.NamedTuple):
+    root: Path
+    target: Path  # the recording being processed
+    linking_notes: list[Path]  # the notes that link to it
+
+
+def _folders(rng: random.Random, spec: Spec) -> list[Path]:
+    """Every folder in a tree spec.depth deep with spec.fanout children each; some names have
+    spaces, which markdown links must then %-encode."""
+    folders = [Path()]
+    level = [Path()]
+    for depth in range(spec.depth):
+        level = [
+            parent / (f"{rng.choice(_WORDS)} {depth}-{i}" if rng.random() < 0.2 else f"{depth}-{i}")
+            for parent in level
+            for i in range(spec.fanout)
+        ]
+        folders.extend(level)
+    return folders
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(rng.choices(_WORDS, k=rng.randint(20, 60))).capitalize() + "."
+
+
+def _link(rng: random.Random, style: str, note: Path, attachment: Path, root: Path) -> str:
+    if style == "embed":
+        return f"![[{attachment.name}]]"
+    if style == "markdown":
+        href = urllib.parse.quote(os.path.relpath(attachment, note.parent))
+        return f"[{attachment.stem}]({href if href.startswith('.') else './' + href})"
+    if style == "ambiguous":
+        return f"[[{attachment.stem}]]"
+    # wikilinks come by stem, by name, and by partial path
+    partial_path = f"{attachment.relative_to(root).parent.name}/{attachment.name}"
+    return rng.choice([f"[[{attachment.stem}]]", f"[[{attachment.name}]]", f"[[{partial_path}]]"])
+
+
+def generate(spec: Spec, root: Path) -> Vault:
+    """Write the vault described by spec under root (which should be empty or absent)."""
+    rng = random.Random(spec.seed)
+    folders = _folders(rng, spec)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / ".obsidian").mkdir(exist_ok=True)
+    for folder in folders:
+        (root / folder).mkdir(parents=True, exist_ok=True)
+
+    attachments: list[Path] = []
+    for i in range(spec.n_attachments):
+        suffix = rng.choice([".m4a", ".m4a", ".png", ".pdf"])
+        attachments.append(root / rng.choice(folders) / f"attachment-{i}{suffix}")
+    # the same stem again, somewhere else: these are the ambiguous ones
+    n_ambiguous = int(len(attachments) * spec.ambiguous_fraction)
+    ambiguous = rng.sample(attachments, n_ambiguous)
+    twins = [root / rng.choice(folders) / f"{a.stem}{rng.choice(['.m4a', '.png'])}" for a in ambiguous]
+    twins = [twin for twin, original in zip(twins, ambiguous) if twin != original]
+    for attachment in attachments + twins:
+        attachment.write_bytes(b"\0" * 64)
+
+    target = root / folders[-1] / f"Recording {spec.seed}.m4a"  # spaces, as iOS names them
+    target.write_bytes(b"\0" * 64)
+
+    notes = [root / rng.choice(folders) / f"note-{i}.md" for i in range(spec.notes)]
+    linking_notes = sorted(rng.sample(notes, min(spec.target_links, len(notes))))
+    target_styles = {
+        note: ("wikilink", "embed", "markdown")[i % 3] for i, note in enumerate(linking_notes)
+    }
+    ambiguous_set = set(ambiguous)
+    unique = [a for a in attachments if a not in ambiguous_set] or attachments
+    for note in notes:
+        lines = [f"# {' '.join(rng.choices(_WORDS, k=3)).title()}", "", _paragraph(rng), ""]
+        for _ in range(rng.randint(*spec.links_per_note)):
+            (style,) = rng.choices(_LINK_STYLES, weights=spec.link_mix)
+            pool = ambiguous if style == "ambiguous" and ambiguous else unique
+            lines += [f"- {rng.choice(_WORDS)} {_link(rng, style, note, rng.choice(pool), root)}"]
+        lines += ["", f"## {rng.choice(_WORDS).title()}", "", _paragraph(rng)]
+        if note in target_styles:
+            lines += [
+                "",
+                "## Meeting",
+                "",
+                f"Discussed the {rng.choice(_WORDS)} with the team #meeting",
+                _link(rng, target_styles[note], note, target, root),
+                "",
+                _paragraph(rng),
+            ]
+        lines += ["", f"## {rng.choice(_WORDS).title()}", "", _paragraph(rng), ""]
+        note.write_text("\n".join(lines), encoding="utf-8")
+
+    vault = Vault(root, target, linking_notes)
+    (root / _COMPLETE).write_text(
+        json.dumps(
+            {
+                "target": str(target.relative_to(root)),
+                "linking_notes": [str(n.relative_to(root)) for n in linking_notes],
+            }
+        ),
+        encoding="utf-8",
+    )
+    return vault
+
+
+def generate_or_reuse(spec: Spec, root: Path) -> Vault:
+    """The vault an earlier call generated into root, if it finished; otherwise a new one."""
+    complete = root / _COMPLETE
+    if complete.exists():
+        written = json.loads(complete.read_text(encoding="utf-8"))
+        return Vault(root, root / written["target"], [root / note for note in written["linking_notes"]])
+    if root.exists():
+        shutil.rmtree(root)
+    return generate(spec, root)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("vault_dir", type=Path)
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--attachments", type=int, default=None)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    spec = Spec(
+        notes=args.notes,
+        attachments=args.attachments,
+        depth=args.depth,
+        fanout=args.fanout,
+        seed=args.seed,
+    )
+    vault = generate(spec, args.vault_dir)
+    print(f"{vault.root}: {len(vault.linking_notes)} notes link to {vault.target}")
+
+
+if __name__ == "__main__":
+    main()
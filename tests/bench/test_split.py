@@ -0,0 +1,64 @@
+"""How long each step of splitting a recording takes, from 5 minutes to 4 hours of audio.
+
+The steps are timed separately, with the production defaults, on synthetic recordings: the
+split itself is timed without the silent-chunk filter, and the filter is then timed over all
+of the chunks, so that neither hides the other. Recordings short enough to go whole are
+only extracted and volume-checked, as in production.
+"""
+
+import pytest
+from thds.core.source import Source
+
+from cc.transcribe.split import core
+from cc.transcribe.split.choose_silence_cuts import choose_cuts
+from tests.bench.synthetic_audio import Spec
+
+pytestmark = pytest.mark.bench
+
+_EVERY = 1200.0
+_WINDOW = 90.0
+
+_SPECS = [
+    Spec(duration_s=5 * 60),
+    Spec(duration_s=30 * 60),
+    Spec(duration_s=60 * 60),
+    Spec(duration_s=60 * 60, speakers=2, streams=2),  # an iOS call recording
+    Spec(duration_s=4 * 60 * 60),
+]
+
+
+@pytest.mark.parametrize("spec", _SPECS, ids=[spec.name for spec in _SPECS])
+def test_split_steps(spec, synthetic_recording, bench_results, tmp_path):
+    recording = Source.from_file(synthetic_recording(spec))
+    step = f"split.{spec.name}"
+
+    with bench_results.timed(f"{step}.extract_audio", audio_s=spec.duration_s):
+        audio = core.extract_audio(recording, tmp_path)
+
+    core._get_audio_duration.cache_clear()
+    with bench_results.timed(f"{step}.get_audio_duration"):
+        duration = core._get_audio_duration(audio)
+    assert duration == pytest.approx(spec.duration_s, abs=1.0)
+
+    if core._is_audio_file_chunk_sized(duration, _EVERY, _WINDOW):
+        with bench_results.timed(f"{step}.is_silent", chunks=1):
+            assert not core._is_silent(audio.path())
+        return
+
+    with bench_results.timed(f"{step}.detect_silence", audio_s=spec.duration_s) as extra:
+        log_file = core._detect_silence(audio, core._DEFAULT_SILENCE_THRESHOLD, tmp_path)
+        extra["log_lines"] = len(log_file.path().read_text(encoding="utf-8").splitlines())
+
+    with bench_results.timed(f"{step}.choose_cuts") as extra:
+        cuts = choose_cuts(log_file.path(), every=_EVERY, duration=duration, window=_WINDOW)
+        extra["cuts"] = len(cuts)
+
+    chunks_dir = tmp_path / "chunks"
+    chunks_dir.mkdir()
+    with bench_results.timed(f"{step}.split_on_silence") as extra:
+        chunk_files = list(core._iter_chunk_files(audio, cuts, chunks_dir))
+        extra["chunks"] = len(chunk_files)
+    assert len(chunk_files) == len(cuts) + 1
+
+    with bench_results.timed(f"{step}.silent_chunk_filter", chunks=len(chunk_files)):
+        assert not any(core._is_silent(chunk_file) for chunk_file in chunk_files)
@@ -0,0 +1,46 @@
+import itertools
+
+import pytest
+
+from tests.bench.synthetic_audio import Spec, _concat_list, schedule
+
+
+def test_schedule_fills_the_duration_exactly_and_is_reproducible():
+    spec = Spec(duration_s=3600, speakers=2, seed=7)
+
+    segments = schedule(spec)
+
+    assert sum(s.duration_s for s in segments) == pytest.approx(3600)
+    assert segments == schedule(spec)
+    assert segments != schedule(Spec(duration_s=3600, speakers=2, seed=8))
+
+
+def test_schedule_alternates_speakers_with_pauses_between():
+    segments = schedule(Spec(duration_s=600, speakers=3))
+
+    utterances = segments[::2]
+    pauses = segments[1::2]
+    assert all(s.speaker is not None for s in utterances)
+    assert all(s.speaker is None for s in pauses)
+    assert all(a.speaker != b.speaker for a, b in itertools.pairwise(utterances))
+
+
+def test_pauses_are_mostly_too_short_to_detect_with_some_long_ones():
+    pauses = [s.duration_s for s in schedule(Spec(duration_s=4 * 3600)) if s.speaker is None]
+
+    detectable = [p for p in pauses if p >= 0.4]  # silencedetect's minimum
+    assert 0.1 < len(detectable) / len(pauses) < 0.5
+    assert max(pauses) > 2.0
+
+
+def test_each_stream_of_a_call_recording_hears_only_its_own_speaker(tmp_path):
+    segments = schedule(Spec(duration_s=120, speakers=2, streams=2))
+    voices = [tmp_path / "voice0.wav", tmp_path / "voice1.wav"]
+    silence = tmp_path / "silence.wav"
+
+    stream0 = _concat_list(segments, 0, voices, silence)
+
+    spoken = [s for s in segments if s.speaker is not None]
+    assert stream0.count(f"file '{voices[0]}'") == sum(s.speaker == 0 for s in spoken)
+    assert f"file '{voices[1]}'" not in stream0
+    assert stream0.count("file '") == len(segments)
@@ -0,0 +1,41 @@
+from cc.vault import build_vault_index, find_linking_notes, find_section_context
+from tests.bench.synthetic_vault import Spec, generate, generate_or_reuse
+
+
+def test_generated_vault_has_the_links_it_says_it_has(tmp_path):
+    spec = Spec(notes=200, depth=3, fanout=3, target_links=6)
+
+    vault = generate(spec, tmp_path / "vault")
+
+    index = build_vault_index(vault.root)
+    assert sum(p.suffix == ".md" for paths in index.values() for p in paths) == 200
+    assert index[vault.target.stem] == {vault.target}
+    assert sorted(find_linking_notes(index, vault.root, vault.target)) == vault.linking_notes
+    for note in vault.linking_notes:
+        (section,) = find_section_context(index, in_md_file=note, target_file=vault.target)
+        assert section.startswith("## Meeting")
+
+
+def test_generated_vault_has_every_link_style_including_ambiguous_stems(tmp_path):
+    vault = generate(Spec(notes=300, ambiguous_fraction=0.2), tmp_path / "vault")
+
+    text = "\n".join(p.read_text(encoding="utf-8") for p in vault.root.rglob("*.md"))
+    assert "![[" in text
+    assert "](./" in text or "](../" in text
+    assert "%20" in text  # folder names with spaces, in markdown links
+    index = build_vault_index(vault.root)
+    assert any(len(paths) > 1 for paths in index.values())
+
+
+def test_an_unfinished_vault_is_regenerated(tmp_path):
+    spec = Spec(notes=50)
+    root = tmp_path / "vault"
+    first = generate_or_reuse(spec, root)
+    (root / "stray.md").write_text("left over")
+
+    assert generate_or_reuse(spec, root) == first
+    assert (root / "stray.md").exists()  # reused, not regenerated
+
+    (root / ".synthetic-vault-complete").unlink()
+    assert generate_or_reuse(spec, root) == first
+    assert not (root / "stray.md").exists()
@@ -0,0 +1,76 @@
+"""How vault discovery, link resolution and link rewriting scale, from 1k to 100k notes.
+
+Each operation runs over a synthetic vault exactly as `coco` runs it for one recording:
+index the vault, find the notes that link to the recording, read each link's context and
+section, and rewrite the links. Link rewriting is measured as a dry run, and then for real
+with the notes restored afterwards, so the generated vault can be reused.
+"""
+
+import pytest
+
+from cc import vault
+from tests.bench.synthetic_vault import Spec
+
+pytestmark = pytest.mark.bench
+
+_SPECS = [Spec(notes=1_000), Spec(notes=10_000), Spec(notes=100_000)]
+
+
+@pytest.mark.parametrize("spec", _SPECS, ids=[f"{spec.notes}-notes" for spec in _SPECS])
+def test_vault_operations(spec, generated_vault, bench_results):
+    generated = generated_vault(spec)
+    root, target = generated.root, generated.target
+    step = f"vault.{spec.notes}-notes"
+
+    index = bench_results.measure(
+        f"{step}.build_vault_index", lambda: vault.build_vault_index(root), vault=spec.name
+    )
+    cache = vault.VaultIndexCache()
+    bench_results.measure(f"{step}.vault_index_cache.cold", lambda: vault.VaultIndexCache().index(root))
+    cache.index(root)
+    bench_results.measure(f"{step}.vault_index_cache.unchanged", lambda: cache.index(root))
+
+    linking_notes = bench_results.measure(
+        f"{step}.find_linking_notes", lambda: vault.find_linking_notes(index, root, target)
+    )
+    assert sorted(linking_notes) == generated.linking_notes
+
+    contexts = bench_results.measure(
+        f"{step}.find_link_context",
+        lambda: [
+            vault.find_link_context(index, in_md_file=note, target_file=target) for note in linking_notes
+        ],
+        notes=len(linking_notes),
+    )
+    assert all(len(found) == 1 for found in contexts)
+
+    sections = bench_results.measure(
+        f"{step}.find_section_context",
+        lambda: [
+            vault.find_section_context(index, in_md_file=note, target_file=target)
+            for note in linking_notes
+        ],
+        notes=len(linking_notes),
+    )
+    assert all(found and found[0].startswith("## Meeting") for found in sections)
+
+    new_note = root / "Notes" / "Transcript.md"
+
+    def replace_links(dry_run: bool) -> None:
+        vault.replace_links_in_notes(
+            index, root, linking_notes, target, new_note, "Transcript", dry_run=dry_run
+        )
+
+    bench_results.measure(
+        f"{step}.replace_links_in_notes.dry_run",
+        lambda: replace_links(dry_run=True),
+        notes=len(linking_notes),
+    )
+    originals = {note: note.read_text(encoding="utf-8") for note in linking_notes}
+    try:
+        with bench_results.timed(f"{step}.replace_links_in_notes", notes=len(linking_notes)):
+            replace_links(dry_run=False)
+        assert all("Notes/Transcript.md" in note.read_text(encoding="utf-8") for note in linking_notes)
+    finally:
+        for note, content in originals.items():
+            note.write_text(content, encoding="utf-8")
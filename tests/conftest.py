@@ -0,0 +1,18 @@
+import pytest
+
+from cc import files
+from cc.llm import response_cache
+
+
+@pytest.fixture(autouse=True)
+def _isolated_llm_response_cache(tmp_path, monkeypatch):
+    """Never read or write the user's real LLM response cache during tests."""
+    monkeypatch.setattr(response_cache.CACHE_DIR, "global_value", tmp_path / "llm-responses")
+    monkeypatch.setattr(response_cache, "_SIZES", {})
+
+
+@pytest.fixture(autouse=True)
+def _isolated_file_hash_cache(tmp_path, monkeypatch):
+    """Never read or write the user's real file hash cache during tests."""
+    monkeypatch.setattr(files.HASH_CACHE_DB, "global_value", tmp_path / "file-hashes.sqlite3")
+    monkeypatch.setattr(files, "_HASHES", {})
@@ -31,7 +31,7 @@ def test_summarize_transcript():
     result = summarize_transcript(
         ll_model=CHEAP_CONFIG.note_model,
         transcript=SAMPLE_TRANSCRIPT,
-        prompt=CHEAP_CONFIG.note_prompt,
+        prompt=CHEAP_CONFIG.note_prompts.get("default", ""),
     )
 
     assert isinstance(result, SummaryNote)
@@ -0,0 +1,104 @@
+import io
+import json
+import time
+
+import httpx
+import litellm
+import pytest
+
+from cc import env
+from cc.llm import cassette, complete, fake, providers
+
+_AUDIO = bytes(range(256)) * 500
+_MESSAGES = [{"role": "system", "content": "Give it a title."}, {"role": "user", "content": "hello"}]
+
+
+@pytest.fixture(autouse=True)
+def _cassette(tmp_path, monkeypatch):
+    monkeypatch.setattr(cassette.PATH, "global_value", tmp_path / "cassette.jsonl")
+    monkeypatch.setattr(cassette.SPEED, "global_value", 0.0)
+    monkeypatch.setattr(cassette, "_TAPES", {})
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    """Record, with the fake provider standing in for the real services."""
+    monkeypatch.setattr(providers.BACKEND, "global_value", providers.RECORD)
+    monkeypatch.setattr(env, "activate_api_keys", lambda: None)
+    monkeypatch.setenv("OPENAI_API_KEY", "not-a-real-key")
+    monkeypatch.setattr(
+        cassette.httpx, "HTTPTransport", lambda: httpx.MockTransport(fake.handle_openai_request)
+    )
+    real_completion = litellm.completion
+    monkeypatch.setattr(
+        litellm,
+        "completion",
+        lambda **kw: real_completion(**{"mock_response": fake.completion_text(kw["messages"]), **kw}),
+    )
+
+
+def _transcribe() -> str:
+    client = providers.openai_client()
+    return client.audio.transcriptions.create(model="whisper-1", file=("a.m4a", io.BytesIO(_AUDIO))).text
+
+
+def test_replay_returns_what_was_recorded_including_retries(recording, monkeypatch):
+    outcomes = iter([(0.0, fake._RATE_LIMITED), (0.0, fake._OK)])
+    monkeypatch.setattr(fake, "_draw", lambda: next(outcomes))
+    recorded_text = _transcribe()
+    recorded_note = "".join(complete.stream_complete("gpt-4o-mini", _MESSAGES))
+    recorded_edit = complete.complete("gpt-4o-mini", [{"role": "user", "content": "just this"}])
+
+    entries = [json.loads(line) for line in cassette.PATH().read_text().splitlines()]
+    assert [(e["kind"], e.get("status")) for e in entries] == [
+        ("transcription", 429),
+        ("transcription", 200),
+        ("completion", None),
+        ("completion", None),
+    ]
+
+    monkeypatch.setattr(providers.BACKEND, "global_value", providers.REPLAY)
+    monkeypatch.setattr(fake, "_draw", lambda: pytest.fail("replay must not reach the provider"))
+    assert _transcribe() == recorded_text
+    assert "".join(complete.stream_complete("gpt-4o-mini", _MESSAGES)) == recorded_note
+    assert complete.complete("gpt-4o-mini", _MESSAGES) == recorded_note  # recorded streaming
+    assert complete.complete("gpt-4o-mini", [{"role": "user", "content": "just this"}]) == recorded_edit
+
+
+def test_replay_of_an_unrecorded_request_fails(monkeypatch):
+    monkeypatch.setattr(providers.BACKEND, "global_value", providers.REPLAY)
+    with pytest.raises(cassette.CassetteMiss):
+        complete.complete("gpt-4o-mini", [{"role": "user", "content": "never asked"}])
+
+
+def test_replay_keeps_the_recorded_latency_scaled_by_speed(monkeypatch):
+    messages = [{"role": "user", "content": "slow"}]
+    entry = {
+        "kind": "completion",
+        "key": cassette._completion_key({"model": "gpt-4o-mini", "messages": messages}),
+    }
+    cassette.PATH().write_text(json.dumps({**entry, "latency_s": 0.5, "content": "ok"}) + "\n")
+    monkeypatch.setattr(providers.BACKEND, "global_value", providers.REPLAY)
+    monkeypatch.setattr(cassette.SPEED, "global_value", 5.0)
+
+    start = time.monotonic()
+    assert complete.complete("gpt-4o-mini", messages) == "ok"
+    assert 0.1 <= time.monotonic() - start < 0.5
+
+
+def test_recorded_errors_are_raised_again(monkeypatch):
+    messages = [{"role": "user", "content": "busy"}]
+    entry = {
+        "kind": "completion",
+        "key": cassette._completion_key({"model": "gpt-4o-mini", "messages": messages}),
+    }
+    error = {"type": "RateLimitError", "message": "slow down"}
+    cassette.PATH().write_text(json.dumps({**entry, "latency_s": 0.0, "error": error}) + "\n")
+    monkeypatch.setattr(providers.BACKEND, "global_value", providers.REPLAY)
+    with pytest.raises(litellm.RateLimitError, match="slow down"):
+        complete.complete("gpt-4o-mini", messages)
+
+
+def test_errors_other_than_the_providers_are_raised_as_runtime_errors():
+    with pytest.raises(RuntimeError, match="^KeyError: 'choices'$"):
+        cassette._raise_recorded({"type": "KeyError", "message": "'choices'"}, "gpt-4o-mini")
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from cc.llm import complete
+from cc.llm.complete import TokenUsage, _usage_of, cacheable_text
+
+
+_LONG = "word " * 1000  # ~1250 tokens
+
+
+def test_anthropic_prefixes_are_marked_cacheable():
+    assert cacheable_text(_LONG, "anthropic/claude-sonnet-4-20250514") == [
+        {"type": "text", "text": _LONG, "cache_control": {"type": "ephemeral"}}
+    ]
+
+
+def test_prefixes_below_anthropics_minimum_are_left_alone():
+    # Anthropic won't cache fewer than 1024 tokens (2048 for Haiku); a marker would do nothing
+    assert cacheable_text("instructions", "anthropic/claude-sonnet-4-20250514") == "instructions"
+    assert cacheable_text(_LONG, "anthropic/claude-3-5-haiku-latest") == _LONG
+
+
+def test_openai_prefixes_are_left_alone():
+    # OpenAI caches long prefixes automatically
+    assert cacheable_text(_LONG, "gpt-4o") == _LONG
+
+
+def test_usage_reports_anthropic_cache_reads():
+    usage = SimpleNamespace(
+        prompt_tokens=2000,
+        completion_tokens=300,
+        cache_read_input_tokens=1500,
+        cache_creation_input_tokens=0,
+        prompt_tokens_details=None,
+    )
+    assert _usage_of({"usage": usage}) == TokenUsage(2000, 1500, 0, 300)
+
+
+def test_usage_reports_openai_cached_tokens():
+    usage = SimpleNamespace(
+        prompt_tokens=2000,
+        completion_tokens=300,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=1024),
+    )
+    assert _usage_of({"usage": usage}) == TokenUsage(2000, 1024, 0, 300)
+
+
+def test_cached_responses_skip_the_provider(monkeypatch):
+    calls: list[dict] = []
+
+    def completion(model, messages):
+        calls.append(messages)
+        return {"choices": [{"message": {"content": "hi"}}]}
+
+    monkeypatch.setattr(complete, "completion", completion)
+    messages = [{"role": "user", "content": "hello"}]
+
+    assert complete.complete("gpt-4o", messages) == "hi"
+    assert complete.complete("gpt-4o", messages) == "hi"
+    assert len(calls) == 1
@@ -0,0 +1,81 @@
+import io
+import itertools
+import random
+import typing as ty
+
+import pytest
+
+from cc.llm import fake, providers, response_cache, summarize
+
+_AUDIO = bytes(range(256)) * 2000  # ~32s of "audio"
+
+
+@pytest.fixture(autouse=True)
+def _fake_backend(monkeypatch):
+    monkeypatch.setattr(providers.BACKEND, "global_value", providers.FAKE)
+
+
+def _transcribe(audio: bytes, **kwargs):
+    return providers.openai_client().audio.transcriptions.create(
+        model="whisper-1", file=("chunk.m4a", io.BytesIO(audio)), **kwargs
+    )
+
+
+def test_transcripts_are_deterministic_per_audio():
+    text = _transcribe(_AUDIO).text
+    assert text == _transcribe(_AUDIO).text
+    assert text != _transcribe(_AUDIO[:-1]).text
+    assert len(text.split()) > 50
+
+
+def test_diarized_segments_cover_the_audio():
+    response = _transcribe(_AUDIO, response_format="diarized_json", chunking_strategy="auto")
+    segments = response.segments
+    assert segments[0].start == 0.0
+    assert all(a.end == b.start for a, b in itertools.pairwise(segments))
+    assert {s.speaker for s in segments} <= {"A", "B", "C"}
+
+
+def test_rate_limits_are_retried_by_the_client(monkeypatch):
+    outcomes = iter([(0.0, fake._RATE_LIMITED), (0.0, fake._SERVER_ERROR), (0.0, fake._OK)])
+    monkeypatch.setattr(fake, "_draw", lambda: next(outcomes))
+    assert _transcribe(_AUDIO).text == fake.transcript_text(_AUDIO)
+
+
+def test_notes_get_a_title_and_edits_echo_the_material():
+    note = summarize.summarize_transcript("gpt-4o-mini", "we talked about the plan " * 20, prompt="")
+    assert 3 <= len(note.title.split()) <= 7
+    assert "we talked about the plan" in note.note  # the transcript is attached
+
+    edit = [{"role": "system", "content": "Fix the punctuation."}, {"role": "user", "content": "a b. c"}]
+    assert fake.completion_text(edit) == "a b. c"
+
+
+def test_fake_responses_are_cached_apart_from_live_ones(monkeypatch):
+    args: tuple[str, list[dict[str, ty.Any]], dict[str, ty.Any]] = (
+        "gpt-4o",
+        [{"role": "user", "content": "hi"}],
+        {},
+    )
+    fake_key = response_cache.request_key(*args)
+    monkeypatch.setattr(providers.BACKEND, "global_value", providers.LIVE)
+    assert response_cache.request_key(*args) != fake_key
+
+
+def test_draws_follow_the_seed_set_at_any_time(monkeypatch):
+    monkeypatch.setattr(fake.LATENCY, "global_value", "0.2-1.5")
+    with fake.SEED.set_local(7):
+        first = [fake._draw() for _ in range(5)]
+    with fake.SEED.set_local(8):
+        assert [fake._draw() for _ in range(5)] != first
+    with fake.SEED.set_local(7):
+        assert [fake._draw() for _ in range(5)] == first
+
+
+@pytest.mark.parametrize(
+    ("spec", "low", "high"),
+    [("0.5", 0.5, 0.5), ("0.2-1.5", 0.2, 1.5), ("lognormal:0.8,0.5", 0.0, float("inf"))],
+)
+def test_latency_specs(spec, low, high):
+    sample = fake.parse_latency(spec)
+    assert all(low <= sample(random.Random(i)) <= high for i in range(20))
@@ -0,0 +1,142 @@
+import os
+
+import pytest
+
+from cc.llm import response_cache
+from cc.llm.response_cache import get_or_compute, request_key
+
+_MESSAGES = [{"role": "user", "content": "summarize this"}]
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = response_cache.CacheStats()
+    monkeypatch.setattr(response_cache, "STATS", stats)
+    return stats
+
+
+def test_key_depends_on_model_messages_and_params():
+    key = request_key("m", _MESSAGES, {})
+    assert key == request_key("m", [dict(_MESSAGES[0])], {})
+    assert key != request_key("other", _MESSAGES, {})
+    assert key != request_key("m", [{"role": "user", "content": "summarize that"}], {})
+    assert key != request_key("m", _MESSAGES, {"temperature": 0})
+
+
+def test_second_identical_request_is_a_hit(stats):
+    calls: list[int] = []
+
+    def compute() -> str:
+        calls.append(1)
+        return "the response"
+
+    assert get_or_compute("m", _MESSAGES, {}, compute) == "the response"
+    assert get_or_compute("m", _MESSAGES, {}, compute) == "the response"
+
+    assert len(calls) == 1
+    assert (stats.hits, stats.misses) == (1, 1)
+
+
+def test_empty_responses_are_not_cached(stats):
+    get_or_compute("m", _MESSAGES, {}, lambda: "")
+    get_or_compute("m", _MESSAGES, {}, lambda: "")
+    assert (stats.hits, stats.misses) == (0, 2)
+
+
+def test_disabled_cache_always_computes(stats):
+    with response_cache.ENABLED.set_local(False):
+        get_or_compute("m", _MESSAGES, {}, lambda: "one")
+        assert get_or_compute("m", _MESSAGES, {}, lambda: "two") == "two"
+    assert (stats.hits, stats.misses) == (0, 0)
+
+
+def test_least_recently_used_entries_are_evicted(stats, tmp_path):
+    cache_dir = tmp_path / "llm-responses"
+    with response_cache.MAX_BYTES.set_local(500):
+        for i in range(3):
+            get_or_compute("m", _MESSAGES, {"i": i}, lambda: "x" * 100)
+            entry = response_cache._entry_path(cache_dir, request_key("m", _MESSAGES, {"i": i}))
+            os.utime(entry, ns=(i * 10**9, i * 10**9))
+        # touching entry 0 makes it the most recently used
+        get_or_compute("m", _MESSAGES, {"i": 0}, lambda: "unused")
+        get_or_compute("m", _MESSAGES, {"i": 3}, lambda: "x" * 100)
+
+    remaining = {p.name for p in cache_dir.glob("*/*.json")}
+    assert (
+        response_cache._entry_path(cache_dir, request_key("m", _MESSAGES, {"i": 1})).name
+        not in remaining
+    )
+    assert response_cache._entry_path(cache_dir, request_key("m", _MESSAGES, {"i": 0})).name in remaining
+    assert stats.evictions >= 1
+
+
+def test_only_responses_that_parse_are_cached(stats):
+    def has_title(content: str) -> bool:
+        return not content.startswith("\n")
+
+    assert get_or_compute("m", _MESSAGES, {}, lambda: "\nno title", has_title) == "\nno title"
+    assert get_or_compute("m", _MESSAGES, {}, lambda: "A Title\nbody", has_title) == "A Title\nbody"
+    assert get_or_compute("m", _MESSAGES, {}, lambda: "unused", has_title) == "A Title\nbody"
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+def test_a_cached_response_that_no_longer_parses_is_a_miss(stats):
+    get_or_compute("m", _MESSAGES, {}, lambda: "old format")
+    assert get_or_compute("m", _MESSAGES, {}, lambda: "new: format", lambda c: ":" in c) == "new: format"
+    assert get_or_compute("m", _MESSAGES, {}, lambda: "unused") == "new: format"
+
+
+def test_entries_that_vanish_while_evicting_are_skipped(stats, tmp_path, monkeypatch):
+    get_or_compute("m", _MESSAGES, {"i": 0}, lambda: "x" * 100)
+    vanishing = response_cache._entry_path(
+        tmp_path / "llm-responses", request_key("m", _MESSAGES, {"i": 0})
+    )
+    real_glob = type(tmp_path).glob
+
+    def glob_then_lose_one(self, pattern):
+        paths = list(real_glob(self, pattern))
+        vanishing.unlink()  # as if another thread evicted it in between
+        return paths
+
+    monkeypatch.setattr(type(tmp_path), "glob", glob_then_lose_one)
+    with response_cache.MAX_BYTES.set_local(150):
+        assert get_or_compute("m", _MESSAGES, {"i": 1}, lambda: "y" * 100) == "y" * 100
+
+
+def test_the_cache_is_only_scanned_once_it_may_be_over_budget(stats, monkeypatch):
+    scans = []
+    real_stat_entries = response_cache._stat_entries
+
+    def counting_stat_entries(cache_dir):
+        scans.append(cache_dir)
+        return real_stat_entries(cache_dir)
+
+    monkeypatch.setattr(response_cache, "_stat_entries", counting_stat_entries)
+    with response_cache.MAX_BYTES.set_local(1000):
+        for i in range(5):
+            get_or_compute("m", _MESSAGES, {"i": i}, lambda: "x" * 100)
+        assert len(scans) == 1  # just the first store, to learn the size of what's there
+        for i in range(5, 10):
+            get_or_compute("m", _MESSAGES, {"i": i}, lambda: "x" * 100)
+        assert len(scans) > 1
+    assert stats.evictions >= 1
+
+
+@pytest.mark.parametrize("cached", ['"just a string"', "[1, 2]", '{"content": 3}'])
+def test_a_cache_entry_that_isnt_what_we_wrote_is_a_miss(stats, tmp_path, cached):
+    entry = response_cache._entry_path(tmp_path / "llm-responses", request_key("m", _MESSAGES, {}))
+    entry.parent.mkdir(parents=True)
+    entry.write_text(cached)
+    assert get_or_compute("m", _MESSAGES, {}, lambda: "fresh") == "fresh"
+    assert (stats.hits, stats.misses) == (0, 1)
+
+
+def test_a_hit_that_cant_be_touched_is_still_a_hit(stats, monkeypatch):
+    get_or_compute("m", _MESSAGES, {}, lambda: "cached")
+
+    def read_only(*args, **kwargs):
+        raise PermissionError("read-only file system")
+
+    monkeypatch.setattr(response_cache.os, "utime", read_only)
+    assert get_or_compute("m", _MESSAGES, {}, lambda: "unused") == "cached"
+    assert stats.hits == 1
@@ -0,0 +1,109 @@
+import threading
+from types import SimpleNamespace
+
+from cc.llm import complete, summarize
+from cc.llm.summarize import _split_into_sections
+
+
+class TestSplitIntoSections:
+    def test_short_transcript_is_one_section(self):
+        assert _split_into_sections("one paragraph\n\nand another", max_tokens=100) == [
+            "one paragraph\n\nand another"
+        ]
+
+    def test_splits_on_paragraph_breaks(self):
+        paragraphs = ["a" * 30, "b" * 30, "c" * 30]
+        sections = _split_into_sections("\n\n".join(paragraphs), max_tokens=16)  # 64 chars
+        assert sections == [f"{'a' * 30}\n\n{'b' * 30}", "c" * 30]
+
+    def test_splits_oversized_paragraph_between_words(self):
+        sections = _split_into_sections("word " * 20, max_tokens=5)  # 20 chars
+        assert all(len(s) <= 20 for s in sections)
+        assert " ".join(sections).split() == ["word"] * 20
+
+
+def _fake_completion(calls: list[str]):
+    lock = threading.Lock()
+
+    def completion(model, messages, stream=False, **_kwargs):
+        prompt = messages[-1]["content"]
+        with lock:
+            calls.append(prompt)
+        if "Transcript part" in prompt:
+            content = "- notes"
+        else:
+            content = "A Long Meeting About Things\n# Summary\n\nwe talked"
+        if stream:  # a few characters at a time, like a provider would
+            return iter(
+                SimpleNamespace(
+                    choices=[SimpleNamespace(delta=SimpleNamespace(content=content[i : i + 5]))]
+                )
+                for i in range(0, len(content), 5)
+            )
+        return {"choices": [{"message": {"content": content}}]}
+
+    return completion
+
+
+def test_long_transcript_is_summarized_in_sections(monkeypatch):
+    calls: list[str] = []
+    monkeypatch.setattr(complete, "completion", _fake_completion(calls))
+    transcript = "\n\n".join(f"paragraph {i} " + "blah " * 50 for i in range(10))
+
+    note = summarize.summarize_transcript(
+        "some-model", transcript, prompt="summarize it", long_transcript_tokens=200
+    )
+
+    assert note.title == "A Long Meeting About Things"
+    reduce_prompts = [c for c in calls if "Notes on part" in c]
+    assert len(reduce_prompts) == 1
+    assert len(calls) > 2
+    assert transcript not in reduce_prompts[0]
+    assert note.note.endswith(f"# Full transcript\n\n{transcript}")
+
+
+def test_long_transcript_note_does_not_ask_for_the_transcript(monkeypatch):
+    instructions: list[str] = []
+    completion = _fake_completion([])
+
+    def recording_completion(model, messages, **kwargs):
+        instructions.append(str(messages[0]["content"]))
+        return completion(model, messages, **kwargs)
+
+    monkeypatch.setattr(complete, "completion", recording_completion)
+    transcript = "\n\n".join(f"paragraph {i} " + "blah " * 50 for i in range(10))
+
+    summarize.summarize_transcript("some-model", transcript, prompt="", long_transcript_tokens=200)
+
+    (reduce_instructions,) = [i for i in instructions if "split into consecutive parts" in i]
+    assert "# Outline" in reduce_instructions
+    assert "readable transcript" not in reduce_instructions
+    assert "{full_readable_transcript}" not in reduce_instructions
+
+
+def test_short_transcript_is_summarized_in_one_call(monkeypatch):
+    calls: list[str] = []
+    monkeypatch.setattr(complete, "completion", _fake_completion(calls))
+
+    summarize.summarize_transcript("some-model", "a short transcript", prompt="summarize it")
+
+    assert len(calls) == 1
+    assert calls[0].endswith("Raw transcript to be analyzed:\na short transcript")
+
+
+def test_streamed_note_has_title_before_body_is_generated(monkeypatch):
+    calls: list[str] = []
+    monkeypatch.setattr(complete, "completion", _fake_completion(calls))
+
+    title, body = summarize.stream_transcript_note("some-model", "a short transcript", prompt="p")
+
+    assert title == "A Long Meeting About Things"
+    assert "".join(body) == "# Summary\n\nwe talked\n\n# Raw transcript\n\na short transcript"
+
+
+def test_peel_title_leaves_rest_of_stream_unconsumed():
+    chunks = iter(["The Ti", "tle\nfirst ", "line", "\n\nmore"])
+    title, body = summarize._peel_title(chunks)
+    assert title == "The Title"
+    assert next(chunks) == "line"
+    assert "".join(body) == "first \n\nmore"
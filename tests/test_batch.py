@@ -0,0 +1,75 @@
+from pathlib import Path
+
+from cc import batch
+
+
+def _files(root: Path, *names: str) -> list[Path]:
+    paths = []
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"transcript of {name}")
+        paths.append(path)
+    return paths
+
+
+def test_expand_globs_in_order_without_repeats(tmp_path):
+    b, a, deep = _files(tmp_path, "b.txt", "a.txt", "old/deep/c.txt")
+    (tmp_path / "notes.md").write_text("")
+
+    assert batch.expand([str(b), f"{tmp_path}/**/*.txt", str(tmp_path / "missing.txt")]) == [
+        b,
+        a,
+        deep,
+        tmp_path / "missing.txt",
+    ]
+    assert batch.expand([f"{tmp_path}/*.wav"]) == []
+
+
+def test_an_interrupted_batch_resumes_from_its_manifest(tmp_path):
+    a, b, c = _files(tmp_path, "a.txt", "b.txt", "c.txt")
+    manifest = tmp_path / "batch" / "manifest.jsonl"
+    failing = {b}
+
+    def work(path: Path) -> Path:
+        if path in failing:
+            raise RuntimeError("rate limited")
+        return path.with_suffix(".md")
+
+    summary = batch.run([a, b, c], work, "Summarized", "transcripts", workers=2, manifest=manifest)
+    assert sorted(done for done, _output in summary.finished) == [a, c]
+    assert summary.failed == [(b, "RuntimeError: rate limited")]
+    assert "Summarized 2 transcripts in " in summary.format()
+    assert "1 failed, 0 skipped as already done" in summary.format()
+
+    failing.clear()
+    c.write_text("edited since")
+    with manifest.open("a") as f:
+        f.write('{"input": "cut sho')  # as if interrupted mid-write
+    summary = batch.run([a, b, c], work, "Summarized", "transcripts", workers=2, manifest=manifest)
+    assert sorted(done for done, _output in summary.finished) == [b, c]
+    assert summary.skipped == [a] and not summary.failed
+
+    summary = batch.run([a, b, c], work, "Summarized", "transcripts", manifest=manifest)
+    assert not summary.finished and sorted(summary.skipped) == [a, b, c]
+
+
+def test_inputs_are_done_again_when_their_settings_change(tmp_path):
+    (a,) = _files(tmp_path, "a.txt")
+    manifest = tmp_path / "manifest.jsonl"
+    settings = {"model": "gpt-4o-mini", "prompt": "Summarize."}
+
+    def run() -> batch.Summary:
+        return batch.run(
+            [a],
+            lambda p: None,
+            "Summarized",
+            "transcripts",
+            manifest=manifest,
+            settings=lambda p: settings,
+        )
+
+    assert run().finished == [(a, None)]
+    assert run().skipped == [a]
+    settings["prompt"] = "Summarize, briefly."
+    assert run().finished == [(a, None)]
@@ -1,7 +1,11 @@
+import os
+
+from cc import config as config_module
 from cc.config import (
     ConfidentConfidantConfig,
     DEFAULT_NOTE_PROMPT,
     _parse_config_md,
+    read_config_from_directory_hierarchy,
     resolve_prompt,
 )
 
@@ -82,6 +86,40 @@ note_model: anthropic/claude-haiku-3-20240307
     assert config.note_model == "anthropic/claude-haiku-3-20240307"
 
 
+def test_edited_configs_are_read_again(tmp_path):
+    config_file = tmp_path / ".cc-config.md"
+    config_file.write_text("# Confident Confidant Config\n\n## Base Config\n\nnote_model: first\n")
+    os.utime(config_file, ns=(1_000_000_000, 1_000_000_000))
+    assert read_config_from_directory_hierarchy(tmp_path).note_model == "first"
+
+    config_file.write_text("# Confident Confidant Config\n\n## Base Config\n\nnote_model: second\n")
+    os.utime(config_file, ns=(2_000_000_000, 2_000_000_000))
+    assert read_config_from_directory_hierarchy(tmp_path).note_model == "second"
+
+
+def test_configs_are_looked_up_once_per_directory_until_one_changes(tmp_path, monkeypatch):
+    recordings = tmp_path / "recordings"
+    recordings.mkdir()
+    base_config = "# Confident Confidant Config\n\n## Base Config\n\nnote_model: {}\n"
+    (tmp_path / ".cc-config.md").write_text(base_config.format("root"))
+    lookups = []
+    real_find_config_in_dir = config_module._find_config_in_dir
+
+    def counting_find_config_in_dir(current_dir):
+        lookups.append(current_dir)
+        return real_find_config_in_dir(current_dir)
+
+    monkeypatch.setattr(config_module, "_find_config_in_dir", counting_find_config_in_dir)
+    for name in ("a.m4a", "b.m4a"):
+        assert read_config_from_directory_hierarchy(recordings / name).note_model == "root"
+    assert lookups.count(recordings) == 1
+
+    # a new config closer to the recordings changes the directory's mtime
+    (recordings / ".cc-config.md").write_text(base_config.format("leaf"))
+    assert read_config_from_directory_hierarchy(recordings / "a.m4a").note_model == "leaf"
+    assert lookups.count(recordings) == 2
+
+
 # resolve_prompt tests
 
 def test_resolve_default_with_no_tags():
@@ -0,0 +1,82 @@
+import logging
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from cc import daemon
+
+
+@pytest.fixture
+def socket_path(tmp_path, monkeypatch):
+    """A daemon serving on a temporary socket, with a couple of fake jobs."""
+
+    def echo(text: str) -> str:
+        logging.getLogger("cc.test").warning(f"echoing {text}")
+        print(f"printed {text}")
+        return text.upper()
+
+    def fail() -> None:
+        raise ValueError("no good")
+
+    monkeypatch.setattr(daemon, "JOBS", {"echo": echo, "fail": fail})
+    path = tmp_path / "d.sock"
+    server = daemon.make_server(path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+def test_a_job_relays_its_logs_and_output_and_returns_its_result(socket_path):
+    # the client runs in its own process, as it would for real: the daemon redirects its
+    # own stdout during a job
+    client = (
+        "import sys; from pathlib import Path; from cc import daemon;"
+        " print('result', daemon.request('echo', {'text': 'hi'}, Path(sys.argv[1])))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", client, str(socket_path)], capture_output=True, text=True, check=True
+    )
+    assert proc.stdout == "printed hi\nresult HI\n"
+    assert "echoing hi" in proc.stderr
+
+
+def test_a_failed_job_raises_in_the_client(socket_path):
+    with pytest.raises(daemon.JobFailed, match="ValueError: no good"):
+        daemon.request("fail", {}, socket_path)
+
+
+def test_unknown_jobs_are_refused(socket_path):
+    with pytest.raises(daemon.JobFailed, match="Unknown job"):
+        daemon.request("nope", {}, socket_path)
+
+
+def test_a_client_configured_differently_does_the_job_itself(socket_path, monkeypatch):
+    monkeypatch.setattr(daemon.SOCKET_PATH, "global_value", socket_path)
+    monkeypatch.setenv("CC_LLM_FAKE_ENABLED", "true")  # set after the daemon started
+    monkeypatch.setenv("CC_DAEMON_SOCKET", str(socket_path))  # configures the daemon, not jobs
+
+    with pytest.raises(daemon.Refused, match="different values of CC_LLM_FAKE_ENABLED$"):
+        daemon.request("echo", {"text": "hi"})
+    assert not daemon.submit("echo", text="hi")
+
+
+def test_submit_falls_back_when_no_daemon_is_running(tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon.SOCKET_PATH, "global_value", tmp_path / "absent.sock")
+    with pytest.raises(daemon.NotRunning):
+        daemon.request("echo", {"text": "hi"})
+    assert not daemon.submit("echo", text="hi")
+
+
+def test_a_stale_socket_is_replaced_but_a_live_one_is_not(socket_path, tmp_path):
+    with pytest.raises(RuntimeError, match="already listening"):
+        daemon.make_server(socket_path)
+
+    stale = tmp_path / "stale.sock"
+    dead = daemon.make_server(stale)
+    dead.server_close()  # leaves the socket file behind, as a killed daemon would
+    assert stale.exists()
+    daemon.make_server(stale).server_close()
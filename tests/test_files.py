@@ -0,0 +1,151 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from cc import files
+
+
+def _read_counter(monkeypatch) -> list[Path]:
+    reads: list[Path] = []
+    real_file_digest = hashlib.file_digest
+
+    def file_digest(f, digest):
+        reads.append(Path(f.name))
+        return real_file_digest(f, digest)
+
+    monkeypatch.setattr(files.hashlib, "file_digest", file_digest)
+    return reads
+
+
+def test_unchanged_file_is_read_once(tmp_path: Path, monkeypatch):
+    reads = _read_counter(monkeypatch)
+    audio = tmp_path / "a.m4a"
+    audio.write_bytes(b"some audio")
+
+    assert files.hash_file(audio) == hashlib.sha256(b"some audio").hexdigest()
+    assert files.hash_file(audio) == hashlib.sha256(b"some audio").hexdigest()
+    assert files.sha256_of(audio).bytes == hashlib.sha256(b"some audio").digest()
+    assert reads == [audio]
+
+
+def test_modified_file_is_rehashed(tmp_path: Path, monkeypatch):
+    reads = _read_counter(monkeypatch)
+    audio = tmp_path / "a.m4a"
+    audio.write_bytes(b"before")
+    files.hash_file(audio)
+
+    audio.write_bytes(b"after!")
+    st = audio.stat()
+    os.utime(audio, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert files.hash_file(audio) == hashlib.sha256(b"after!").hexdigest()
+    assert len(reads) == 2
+
+
+def test_hashes_are_persisted_across_processes(tmp_path: Path, monkeypatch):
+    reads = _read_counter(monkeypatch)
+    audio = tmp_path / "a.m4a"
+    audio.write_bytes(b"some audio")
+    files.hash_file(audio)
+
+    monkeypatch.setattr(files, "_HASHES", {})  # as if in a new process
+    assert files.hash_file(audio) == hashlib.sha256(b"some audio").hexdigest()
+    assert len(reads) == 1
+
+    monkeypatch.setattr(files, "_HASHES", {})
+    monkeypatch.setattr(files.PERSIST_HASHES, "global_value", False)
+    files.hash_file(audio)
+    assert len(reads) == 2
+
+
+def _recording(tmp_path: Path, content: bytes = b"some audio") -> tuple[Path, str]:
+    audio = tmp_path / "Recording 1.m4a"
+    audio.write_bytes(content)
+    return audio, files.hash_file(audio)
+
+
+def test_archive_within_filesystem_renames(tmp_path: Path, monkeypatch):
+    reads = _read_counter(monkeypatch)
+    audio, sha = _recording(tmp_path)
+    inode = audio.stat().st_ino
+    new_path = tmp_path / "audio" / "24-01-01_a-title.m4a"
+
+    files.archive_file(audio, new_path, sha, dry_run=False)
+
+    assert not audio.exists()
+    assert new_path.stat().st_ino == inode
+    assert len(reads) == 1  # verified against the cached hash
+
+
+def test_archive_across_filesystems_copies_and_verifies(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(files, "_same_filesystem", lambda a, b: False)
+    audio, sha = _recording(tmp_path)
+    new_path = tmp_path / "audio" / "24-01-01_a-title.m4a"
+
+    files.archive_file(audio, new_path, sha, dry_run=False)
+
+    assert not audio.exists()
+    assert new_path.read_bytes() == b"some audio"
+    assert list(new_path.parent.iterdir()) == [new_path]
+
+
+def test_archive_keeps_original_if_it_changed(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(files, "_same_filesystem", lambda a, b: False)
+    audio, _ = _recording(tmp_path)
+    new_path = tmp_path / "audio" / "24-01-01_a-title.m4a"
+
+    with pytest.raises(ValueError, match="hash changed"):
+        files.archive_file(audio, new_path, "not-the-hash", dry_run=False)
+
+    assert audio.read_bytes() == b"some audio"
+    assert list(new_path.parent.iterdir()) == []
+
+
+def test_archive_never_overwrites(tmp_path: Path):
+    audio, sha = _recording(tmp_path)
+    existing = tmp_path / "existing.m4a"
+    existing.write_bytes(b"other audio")
+
+    with pytest.raises(FileExistsError):
+        files.archive_file(audio, existing, sha, dry_run=False)
+    assert audio.exists() and existing.read_bytes() == b"other audio"
+
+
+def test_archive_dry_run_touches_nothing(tmp_path: Path):
+    audio, sha = _recording(tmp_path)
+    files.archive_file(audio, tmp_path / "audio" / "new.m4a", sha, dry_run=True)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["Recording 1.m4a", "file-hashes.sqlite3"]
+
+
+def test_unique_paths_are_never_handed_out_twice(tmp_path: Path):
+    audio = tmp_path / "Recording 1.m4a"
+    (tmp_path / "notes").mkdir()
+    (tmp_path / "notes" / "title.md").write_text("someone else's note")
+
+    first = files.create_unique_file_path(audio, tmp_path / "audio", "title")
+    second = files.create_unique_file_path(audio, tmp_path / "audio", "title")
+    assert (first.name, second.name) == ("title.m4a", "title-1.m4a")
+    assert not (tmp_path / "audio").exists()  # only claimed, not created
+
+    note = files.create_unique_file_path(
+        audio.with_suffix(".md"), tmp_path / "notes", "title", create=True
+    )
+    assert note.name == "title-1.md" and note.read_text() == ""
+    assert (tmp_path / "notes" / "title.md").read_text() == "someone else's note"
+
+
+def test_rename_never_overwrites_a_file_that_appears_after_the_check(tmp_path: Path, monkeypatch):
+    audio, sha = _recording(tmp_path)
+    new_path = tmp_path / "audio" / "new.m4a"
+    real_same_filesystem = files._same_filesystem
+
+    def same_filesystem(a: Path, b: Path) -> bool:
+        new_path.write_bytes(b"other audio")  # e.g. another process archiving under this name
+        return real_same_filesystem(a, b)
+
+    monkeypatch.setattr(files, "_same_filesystem", same_filesystem)
+    with pytest.raises(FileExistsError):
+        files.archive_file(audio, new_path, sha, dry_run=False)
+    assert audio.read_bytes() == b"some audio" and new_path.read_bytes() == b"other audio"
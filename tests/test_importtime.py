@@ -0,0 +1,43 @@
+"""Console scripts must start fast: heavy dependencies are only imported when first used."""
+
+import subprocess
+import sys
+import tomllib
+from pathlib import Path
+
+import pytest
+
+_PYPROJECT = Path(__file__).parents[1] / "pyproject.toml"
+_SCRIPT_MODULES = sorted(
+    {
+        target.split(":")[0]
+        for target in tomllib.loads(_PYPROJECT.read_text())["project"]["scripts"].values()
+    }
+)
+_HEAVY_MODULES = ("litellm", "openai", "thds.mops")
+_BUDGET_S = 1.0  # currently well under 0.5s; importing litellm alone takes several seconds
+
+
+def _import_times(module: str) -> dict[str, float]:
+    """Cumulative import time, in seconds, of every module imported by `import module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+            if cumulative_us.strip().isdigit():
+                times[name.strip()] = int(cumulative_us) / 1e6
+    return times
+
+
+@pytest.mark.parametrize("module", _SCRIPT_MODULES)
+def test_console_script_imports_are_light(module: str):
+    times = _import_times(module)
+
+    assert not [m for m in _HEAVY_MODULES if m in times], f"{module} imports heavy dependencies"
+    assert times[module] < _BUDGET_S
@@ -0,0 +1,207 @@
+import hashlib
+import sqlite3
+from pathlib import Path
+
+from cc import __main__ as coco
+from cc import jobs
+from cc.__main__ import process_audio_file
+from cc.files import hash_file
+from cc.vault import build_vault_index
+
+
+def _vault(tmp_path: Path) -> tuple[Path, Path, Path]:
+    (tmp_path / ".obsidian").mkdir()
+    audio = tmp_path / "Recording 1.webm"
+    audio.write_bytes(b"not really audio")
+    daily = tmp_path / "daily.md"
+    daily.write_text("Talked to Grant: ![[Recording 1.webm]]\n")
+    return tmp_path, audio, daily
+
+
+def test_a_job_moves_through_the_stages(tmp_path):
+    journal = jobs.Journal(tmp_path)
+    audio = tmp_path / "Recording 1.webm"
+    assert journal.get(audio) is None
+
+    journal.discovered(audio, "abc")
+    journal.advance(audio, jobs.TRANSCRIBED)
+    journal.advance(
+        audio,
+        jobs.SUMMARIZED,
+        title="T",
+        note_path=tmp_path / "n.md",
+        new_audio_path=tmp_path / "a.webm",
+    )
+    journal.failed(audio, "ValueError: oops")
+
+    job = journal.get(audio)
+    assert job is not None
+    assert (job.audio_path, job.sha256, job.stage, job.error) == (
+        audio,
+        "abc",
+        jobs.SUMMARIZED,
+        "ValueError: oops",
+    )
+    assert (job.title, job.note_path, job.new_audio_path) == (
+        "T",
+        tmp_path / "n.md",
+        tmp_path / "a.webm",
+    )
+    assert list(job.stage_times) == [jobs.DISCOVERED, jobs.TRANSCRIBED, jobs.SUMMARIZED]
+
+    journal.advance(audio, jobs.LINKED)
+    assert journal.get(audio).error is None  # type: ignore[union-attr]
+
+    journal.discovered(audio, "def")  # starting over forgets everything
+    job = journal.get(audio)
+    assert job is not None and (job.sha256, job.stage, job.title) == ("def", jobs.DISCOVERED, None)
+
+
+def test_a_dry_run_journal_writes_nothing(tmp_path):
+    journal = jobs.Journal(tmp_path, dry_run=True)
+    journal.discovered(tmp_path / "Recording 1.webm", "abc")
+    assert not journal.db_path.exists()
+    assert journal.all() == []
+
+
+def test_a_provisional_job_remembers_its_linking_notes_and_prompt_tags(tmp_path):
+    journal = jobs.Journal(tmp_path)
+    audio = tmp_path / "Recording 1.webm"
+    journal.discovered(audio, "abc")
+    journal.advance(audio, jobs.TRANSCRIBED)
+    journal.advance(
+        audio,
+        jobs.PROVISIONAL,
+        title="Recording 1 (transcript)",
+        note_path=tmp_path / "n.md",
+        linking_notes=[tmp_path / "daily.md"],
+        prompt_tags=["#standup"],
+    )
+    journal.advance(audio, jobs.SUMMARIZED, title="Standup")
+
+    job = journal.get(audio)
+    assert job is not None
+    assert (job.title, job.linking_notes, job.prompt_tags) == (
+        "Standup",
+        [tmp_path / "daily.md"],
+        ["#standup"],
+    )
+    latencies = jobs.stage_latencies([job])
+    assert [stage for stage, times in latencies.items() if times] == [
+        jobs.TRANSCRIBED,
+        jobs.PROVISIONAL,
+        jobs.SUMMARIZED,
+    ]
+
+
+def test_a_journal_from_before_provisional_notes_gains_their_columns(tmp_path):
+    journal = jobs.Journal(tmp_path)
+    journal.db_path.parent.mkdir(parents=True)
+    with sqlite3.connect(journal.db_path) as conn:
+        conn.execute(
+            "CREATE TABLE recordings (audio_path TEXT PRIMARY KEY, sha256 TEXT NOT NULL,"
+            " stage TEXT NOT NULL, title TEXT, note_path TEXT, new_audio_path TEXT, error TEXT,"
+            " discovered_at REAL, transcribed_at REAL, summarized_at REAL, linked_at REAL,"
+            " archived_at REAL)"
+        )
+        conn.execute(
+            "INSERT INTO recordings (audio_path, sha256, stage) VALUES ('a.webm', 'abc', 'transcribed')"
+        )
+    conn.close()
+
+    job = journal.get(tmp_path / "a.webm")
+    assert job is not None and job.stage == jobs.TRANSCRIBED
+    assert (job.linking_notes, job.prompt_tags) == ([], [])
+
+
+def test_status_reports_queue_depth_latency_and_failures(tmp_path):
+    journal = jobs.Journal(tmp_path)
+    for name in ("a.webm", "b.webm", "c.webm"):
+        journal.discovered(tmp_path / name, name)
+    journal.advance(tmp_path / "a.webm", jobs.TRANSCRIBED)
+    journal.failed(tmp_path / "b.webm", "RuntimeError: no network")
+
+    status = jobs.format_status(journal)
+    assert (
+        "In progress: 3 (2 discovered, 1 transcribed, 0 provisional, 0 summarized, 0 linked)" in status
+    )
+    assert "transcribed" in status.split("Stage latency")[1]
+    assert "b.webm after discovered: RuntimeError: no network" in status
+
+
+def test_a_summarized_recording_is_linked_and_archived_without_a_second_note(tmp_path):
+    vault, audio, daily = _vault(tmp_path)
+    note = vault / "2026-01-01_talk-with-grant.md"
+    note.write_text("# Talk with Grant\n")
+    new_audio = vault / "audio" / "2026-01-01_talk-with-grant.webm"
+    journal = jobs.Journal(vault)
+    journal.discovered(audio, hash_file(audio))
+    journal.advance(
+        audio, jobs.SUMMARIZED, title="Talk with Grant", note_path=note, new_audio_path=new_audio
+    )
+
+    # no transcription or LLM is configured here - resuming must not need them
+    assert process_audio_file(build_vault_index(vault), vault, False, audio) == note
+
+    assert "[[2026-01-01_talk-with-grant.md|Talk with Grant]]" in daily.read_text()
+    assert new_audio.read_bytes() == b"not really audio" and not audio.exists()
+    assert journal.get(audio).stage == jobs.ARCHIVED  # type: ignore[union-attr]
+
+
+def test_a_linked_recording_is_archived_though_no_note_links_to_it_any_more(tmp_path):
+    vault, audio, daily = _vault(tmp_path)
+    note = vault / "talk.md"
+    note.write_text("# Talk\n")
+    daily.write_text("Talked to Grant: [[talk.md|Talk]]\n")
+    new_audio = vault / "audio" / "talk.webm"
+    journal = jobs.Journal(vault)
+    journal.discovered(audio, hash_file(audio))
+    journal.advance(audio, jobs.SUMMARIZED, title="Talk", note_path=note, new_audio_path=new_audio)
+    journal.advance(audio, jobs.LINKED)
+
+    assert process_audio_file(build_vault_index(vault), vault, False, audio) == note
+    assert new_audio.exists() and not audio.exists()
+    assert daily.read_text() == "Talked to Grant: [[talk.md|Talk]]\n"
+
+
+def test_a_provisional_recording_that_changed_starts_over_from_the_journaled_links(
+    tmp_path, monkeypatch
+):
+    vault, audio, daily = _vault(tmp_path)
+    provisional = vault / "recording-1-transcript.md"
+    provisional.write_text("# Recording 1 (transcript)\n\n![[Recording 1.webm]]\n\nold words\n")
+    daily.write_text("Talked to Grant: [[recording-1-transcript.md|Recording 1 (transcript)]]\n")
+    journal = jobs.Journal(vault)
+    journal.discovered(audio, hash_file(audio))
+    journal.advance(
+        audio,
+        jobs.PROVISIONAL,
+        title="Recording 1 (transcript)",
+        note_path=provisional,
+        linking_notes=[daily],
+        prompt_tags=[],
+    )
+    audio.write_bytes(b"re-recorded audio")  # so the provisional note is out of date
+
+    transcript = vault / "transcript.txt"
+    transcript.write_text("new words")
+    monkeypatch.setattr(coco.transcribe, "transcribe_audio_file", lambda *args, **kwargs: transcript)
+    provisional_while_summarizing = []
+
+    def summarize(*args, **kwargs):
+        provisional_while_summarizing.append(provisional.read_text())
+        return "Talk with Grant", iter(["The summary."])
+
+    monkeypatch.setattr(coco.llm.summarize, "stream_transcript_note", summarize)
+    note = process_audio_file(build_vault_index(vault), vault, False, audio)
+
+    # the links had a note to point at all along, brought up to date with the new recording
+    [while_summarizing] = provisional_while_summarizing
+    assert "new words" in while_summarizing and "old words" not in while_summarizing
+    assert hashlib.sha256(b"re-recorded audio").hexdigest() in while_summarizing
+    assert note is not None and "The summary." in note.read_text()
+    assert not provisional.exists()
+    assert f"[[{note.relative_to(vault)}|Talk with Grant]]" in daily.read_text()
+    job = journal.get(audio)
+    assert job is not None and job.stage == jobs.ARCHIVED
+    assert job.sha256 == hashlib.sha256(b"re-recorded audio").hexdigest()
@@ -0,0 +1,101 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from cc import metrics, spans, stages
+
+
+def test_histograms_render_cumulative_buckets_with_sum_and_count():
+    histogram = metrics.Histogram("t_seconds", "Some times.", buckets=(1, 10))
+    for value in (0.5, 2, 3, 20):
+        histogram.observe(value, model="m")
+
+    assert histogram.render().splitlines() == [
+        "# HELP t_seconds Some times.",
+        "# TYPE t_seconds histogram",
+        't_seconds_bucket{model="m",le="1"} 1',
+        't_seconds_bucket{model="m",le="10"} 3',
+        't_seconds_bucket{model="m",le="+Inf"} 4',
+        't_seconds_sum{model="m"} 25.5',
+        't_seconds_count{model="m"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = metrics.Counter("c_total", "A counter.")
+    counter.inc(2, path='a "b"\\c')
+    assert counter.samples() == ['c_total{path="a \\"b\\"\\\\c"} 2']
+
+
+def test_values_keep_their_precision():
+    gauge = metrics.Gauge("g", "A gauge.")
+    gauge.inc(123_456_789)
+    gauge.inc(0.1234567, kind="fraction")
+    assert gauge.samples() == ["g 123456789", 'g{kind="fraction"} 0.1234567']
+
+
+def test_spans_are_counted():
+    m = metrics.Metrics()
+    with spans.hooked(m.hook), stages.limited(stages.StageLimits()):
+        with spans.span(spans.VAULT_SCAN, incremental=True):
+            pass
+        with spans.span(spans.RECORDING) as recording:
+            assert m.recordings_in_progress.values == {(): 1}
+            with stages.stage(stages.TRANSCRIBE):
+                assert m.stage_recordings.values == {(("stage", "transcribe"),): 1}
+                with spans.span(spans.TRANSCRIBE_CHUNK, model="whisper-1", bytes=1000):
+                    pass
+            with stages.stage(stages.LLM):
+                with spans.span(spans.COMPLETION, model="gpt", cached=False) as s:
+                    s.set(prompt_tokens=100, cache_read_tokens=0, completion_tokens=20)
+                with spans.span(spans.COMPLETION, model="gpt", cached=True):
+                    pass
+            recording.set(processed=True)
+        with pytest.raises(ValueError), spans.span(spans.RECORDING):
+            raise ValueError("no good")
+
+    assert m.recordings_discovered.values == {(): 2}
+    assert m.recordings_finished.values == {(("outcome", "processed"),): 1, (("outcome", "failed"),): 1}
+    assert m.recordings_in_progress.values == {(): 0}
+    assert m.stage_recordings.values == {(("stage", "transcribe"),): 0, (("stage", "llm"),): 0}
+    assert m.chunk_bytes.values == {(("model", "whisper-1"),): 1000}
+    assert m.llm_calls.values == {
+        (("cached", "false"), ("model", "gpt")): 1,
+        (("cached", "true"), ("model", "gpt")): 1,
+    }
+    assert m.llm_tokens.values == {
+        (("kind", "prompt"), ("model", "gpt")): 100,
+        (("kind", "completion"), ("model", "gpt")): 20,
+    }
+    assert m.errors.values == {(("span", spans.RECORDING),): 1}
+
+    text = m.render()
+    assert 'coco_stage_duration_seconds_count{stage="llm"} 1' in text
+    assert 'coco_llm_call_duration_seconds_count{model="gpt"} 1' in text  # the uncached one
+    assert 'coco_vault_scan_duration_seconds_count{scan="incremental"} 1' in text
+    assert 'coco_chunk_transcription_duration_seconds_count{model="whisper-1"} 1' in text
+
+
+def test_metrics_are_served_and_observed_only_while_serving(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS", metrics.Metrics())
+    monkeypatch.setattr(metrics._Handler, "metrics", metrics.METRICS)
+    with metrics.observed(), spans.span(spans.RECORDING):
+        pass
+    assert not metrics.METRICS.recordings_discovered.values
+
+    server = metrics.serve(0)  # any free port
+    assert server is not None
+    try:
+        with metrics.observed(), spans.span(spans.RECORDING):
+            pass
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            body = response.read().decode()
+        assert "coco_recordings_discovered_total 1\n" in body
+        assert 'coco_recordings_finished_total{outcome="skipped"} 1\n' in body
+        with pytest.raises(urllib.error.HTTPError, match="404"):
+            urllib.request.urlopen(f"{url}/")
+    finally:
+        metrics.shutdown()
@@ -0,0 +1,63 @@
+import os
+import time
+import typing as ty
+from pathlib import Path
+
+import pytest
+
+from cc.output_note import create_transcript_note, remove_stale_partials, write_streamed_text
+
+
+def test_streamed_note_appears_only_when_complete(tmp_path: Path):
+    note = tmp_path / "notes" / "note.md"
+    partial = tmp_path / "notes" / "note.md.partial"
+
+    def chunks() -> ty.Iterator[str]:
+        yield "one "
+        assert partial.exists() and not note.exists()
+        yield "two"
+
+    write_streamed_text(note, chunks())
+    assert note.read_text() == "one two"
+    assert not partial.exists()
+
+
+def test_failed_stream_leaves_no_note(tmp_path: Path):
+    note = tmp_path / "note.md"
+
+    def chunks() -> ty.Iterator[str]:
+        yield "one "
+        raise RuntimeError("connection dropped")
+
+    with pytest.raises(RuntimeError):
+        write_streamed_text(note, chunks())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_transcript_note_strips_trailing_whitespace_of_streamed_body(tmp_path: Path):
+    audio = tmp_path / "audio.m4a"
+    audio.write_bytes(b"abc")
+    note = tmp_path / "note.md"
+
+    create_transcript_note(tmp_path, audio, note, "A Title", iter(["\nbody ", " \n", "text\n\n"]), "h")
+
+    lines = note.read_text().splitlines(keepends=True)
+    assert lines[:3] == ["# A Title\n", "\n", "![[audio.m4a]]\n"]
+    assert lines[3].endswith("sha256: `h`\n")
+    assert "".join(lines[4:]) == "\nbody  \ntext\n"
+
+
+def test_only_abandoned_partial_notes_are_removed(tmp_path: Path) -> None:
+    abandoned = tmp_path / "old.md.partial"
+    in_progress = tmp_path / "new.md.partial"
+    note = tmp_path / "note.md"
+    for path in (abandoned, in_progress, note):
+        path.write_text("text")
+    two_hours_ago = time.time() - 7200
+    os.utime(abandoned, (two_hours_ago, two_hours_ago))
+    os.utime(note, (two_hours_ago, two_hours_ago))
+    paths = [abandoned, in_progress, note, tmp_path / "gone.md.partial"]
+
+    assert remove_stale_partials(paths, dry_run=True) == [abandoned] and abandoned.exists()
+    assert remove_stale_partials(paths) == [abandoned]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new.md.partial", "note.md"]
@@ -0,0 +1,58 @@
+import pytest
+
+from cc import profiling, spans, stages
+
+
+def _busy(n: int) -> list[str]:
+    return [str(i) for i in range(n)]
+
+
+def _busier(n: int) -> list[str]:
+    return [str(i) * 2 for i in range(n)]
+
+
+@pytest.fixture
+def profile_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "_workdir_root", lambda: tmp_path)
+    return tmp_path / "profile"
+
+
+def test_each_stage_is_profiled_without_the_stages_it_encloses(profile_root, capsys):
+    with profiling.profiled("vault") as profiler:
+        with spans.span(spans.VAULT_SCAN):
+            _busy(1000)
+        with spans.span(spans.RECORDING, audio="Recording 1.webm"), stages.stage(stages.LLM):
+            _busy(1000)
+            with stages.stage(stages.VAULT):
+                held = _busier(1000)
+
+    assert profiler is not None
+    (run_dir,) = profile_root.iterdir()
+    assert sorted(p.relative_to(run_dir).as_posix() for p in run_dir.rglob("*.pstats")) == [
+        "Recording-1/01-llm.pstats",
+        "Recording-1/02-vault.pstats",
+        "vault/01-vault_scan.pstats",
+    ]
+
+    functions = {
+        name: {fn for (_file, _line, fn) in profiling.pstats.Stats(str(path)).stats}  # type: ignore[attr-defined]
+        for name, path in profiler.written
+    }
+    assert "_busier" in functions[stages.VAULT] and "_busier" not in functions[stages.LLM]
+    assert "_busy" in functions[stages.LLM]
+
+    allocations = (run_dir / "Recording-1" / "02-vault.tracemalloc.txt").read_text()
+    assert allocations.startswith("vault: ") and "test_profiling.py" in allocations
+    assert len(held) == 1000
+
+    summary = capsys.readouterr().err
+    assert summary.startswith(f"Profiles written to {run_dir}")
+    assert "llm (1x" in summary and "test_profiling.py" in summary
+
+
+def test_nothing_is_profiled_unless_enabled(profile_root, capsys):
+    with profiling.profiled("vault", enabled=False) as profiler, stages.stage(stages.SPLIT):
+        pass
+    assert profiler is None
+    assert not profile_root.exists()
+    assert not capsys.readouterr().err
@@ -0,0 +1,75 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from cc import schedule
+
+
+@pytest.fixture
+def durations(monkeypatch):
+    """Probed durations by file name; files not in it have no duration in their headers."""
+    probed: dict[str, float] = {}
+    monkeypatch.setattr(schedule, "probe_duration_s", lambda p: probed.get(p.name))
+    return probed
+
+
+def _recording(directory: Path, name: str, size: int = 100, hours_ago: float = 0.0) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / name
+    path.write_bytes(b"\0" * size)
+    mtime = time.time() - hours_ago * 3600
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_shortest_first_falls_back_to_the_file_size(tmp_path, durations):
+    lecture = _recording(tmp_path, "Recording lecture.m4a")
+    memo = _recording(tmp_path, "Recording memo.m4a")
+    unprobed = _recording(tmp_path, "Recording unprobed.webm", size=30 * schedule.ESTIMATED_BYTES_PER_S)
+    durations.update({lecture.name: 7200, memo.name: 10})
+
+    assert schedule.shortest_first([lecture, unprobed, memo]) == [memo, unprobed, lecture]
+
+
+def test_long_recordings_age_ahead_of_new_short_ones(tmp_path, durations, monkeypatch):
+    monkeypatch.setattr(schedule.AGING_S_PER_HOUR, "global_value", 600.0)
+    old_lecture = _recording(tmp_path, "Recording lecture.m4a", hours_ago=12)
+    new_memo = _recording(tmp_path, "Recording memo.m4a")
+    durations.update({old_lecture.name: 7000, new_memo.name: 300})
+
+    assert schedule.shortest_first([new_memo, old_lecture]) == [old_lecture, new_memo]
+
+
+def test_recordings_that_vanish_are_dropped(tmp_path, durations):
+    memo = _recording(tmp_path, "Recording memo.m4a")
+    gone = tmp_path / "Recording gone.m4a"  # e.g. archived by another run since the listing
+    assert schedule.shortest_first([gone, memo]) == [memo]
+
+
+def test_directory_priority_comes_first(tmp_path, durations):
+    urgent = tmp_path / "urgent"
+    urgent.mkdir()
+    (urgent / ".cc-config.md").write_text(
+        "# Confident Confidant Config\n\n## Base Config\n\nprocessing_priority: 5\n"
+    )
+    memo = _recording(tmp_path / "inbox", "Recording memo.m4a")
+    meeting = _recording(urgent, "Recording meeting.m4a")
+    durations.update({memo.name: 60, meeting.name: 3600})
+
+    assert schedule.shortest_first([memo, meeting]) == [meeting, memo]
+
+
+def test_probes_are_remembered_until_the_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(schedule, "_DURATIONS", {})
+    calls = []
+    monkeypatch.setattr(schedule.shutil, "which", lambda name: calls.append(name))  # no ffprobe
+    audio = _recording(tmp_path, "Recording 1.m4a")
+
+    assert schedule.probe_duration_s(audio) is None
+    assert schedule.probe_duration_s(audio) is None
+    assert len(calls) == 1
+    audio.write_bytes(b"longer now")
+    schedule.probe_duration_s(audio)
+    assert len(calls) == 2
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+from thds.core.concurrency import contextful_threadpool_executor
+
+from cc import jobs, spans, stages
+from cc.__main__ import process_audio_file
+from cc.files import hash_file
+from cc.vault import build_vault_index
+
+
+def test_spans_record_nothing_unless_hooked():
+    with spans.span("work", n=1) as s:
+        s.set(m=2)
+    assert s.attributes == {"n": 1, "m": 2} and not s.span_id
+
+    spans.record("work", 0)  # nothing to hand it to
+
+
+def test_spans_nest_across_contextful_threads():
+    with spans.tracing() as trace:
+        with spans.span("outer"), contextful_threadpool_executor(max_workers=2) as ex:
+            ex.submit(_inner_span).result()
+        with spans.span("another"):
+            pass
+
+    by_name = {s.name: s for s in trace.spans}
+    outer, inner, another = by_name["outer"], by_name["threaded"], by_name["another"]
+    assert inner.parent_id == outer.span_id and inner.trace_id == outer.trace_id
+    assert another.parent_id is None and another.trace_id != outer.trace_id
+    assert outer.start_ns <= inner.start_ns <= inner.end_ns <= outer.end_ns
+
+
+def _inner_span() -> None:
+    with spans.span("threaded"):
+        pass
+
+
+def test_a_failed_span_records_the_error_and_reraises():
+    with spans.tracing() as trace, pytest.raises(ValueError), spans.span("work"):
+        raise ValueError("nope")
+    (s,) = trace.spans
+    assert s.error == "ValueError: nope"
+
+
+def test_record_is_a_finished_child_of_the_current_span():
+    with spans.tracing() as trace, spans.span("outer") as outer:
+        spans.record("generated", outer.start_ns, chunks=3)
+
+    generated = next(s for s in trace.spans if s.name == "generated")
+    assert generated.parent_id == outer.span_id
+    assert generated.attributes == {"chunks": 3} and generated.end_ns >= generated.start_ns
+
+
+def test_summary_has_nearest_rank_percentiles():
+    finished = [spans.Span("x", start_ns=0, end_ns=int(i * 1e9)) for i in range(1, 101)]
+    finished.append(spans.Span("y", start_ns=0, end_ns=int(2e9), error="oops"))
+
+    summary = spans.summarize(finished)
+
+    assert summary["x"] == {
+        "count": 100,
+        "errors": 0,
+        "total_s": 5050.0,
+        "p50_s": 50.0,
+        "p90_s": 90.0,
+        "p99_s": 99.0,
+        "max_s": 100.0,
+    }
+    assert summary["y"]["p99_s"] == 2.0 and summary["y"]["errors"] == 1
+
+
+def test_stages_are_spans_with_their_queueing_time():
+    with spans.tracing() as trace, stages.limited(stages.StageLimits()), stages.stage(stages.SPLIT):
+        pass
+    (s,) = trace.spans
+    queued_s = s.attributes["queued_s"]
+    assert s.name == stages.SPLIT and isinstance(queued_s, float) and queued_s >= 0
+
+
+def test_run_report_and_otlp_export(tmp_path):
+    (tmp_path / ".obsidian").mkdir()
+    audio = tmp_path / "Recording 1.webm"
+    audio.write_bytes(b"not really audio")
+    (tmp_path / "daily.md").write_text("Talked to Grant: ![[Recording 1.webm]]\n")
+    note = tmp_path / "talk.md"
+    note.write_text("# Talk\n")
+    journal = jobs.Journal(tmp_path)
+    journal.discovered(audio, hash_file(audio))
+    journal.advance(
+        audio, jobs.SUMMARIZED, title="Talk", note_path=note, new_audio_path=tmp_path / "talk.webm"
+    )
+    reports = tmp_path / "reports"
+
+    with spans.run_report(reports, otlp=True):
+        process_audio_file(build_vault_index(tmp_path), tmp_path, False, audio)
+
+    (report_file,) = reports.glob("coco-run-*[0-9].json")
+    report = json.loads(report_file.read_text())
+    by_name = {s["name"]: s for s in report["spans"]}
+    recording = by_name[spans.RECORDING]
+    assert recording["attributes"] == {
+        "audio": "Recording 1.webm",
+        "bytes": 16,
+        "dry_run": False,
+        "processed": True,
+    }
+    for name in (spans.FIND_LINKS, stages.VAULT, spans.LINK_REWRITE, spans.ARCHIVE):
+        assert by_name[name]["trace_id"] == recording["trace_id"]
+    assert by_name[spans.ARCHIVE]["attributes"]["copied"] is False
+    assert report["summary"][spans.RECORDING]["count"] == 1
+
+    (otlp_file,) = reports.glob("*.otlp.json")
+    (resource_spans,) = json.loads(otlp_file.read_text())["resourceSpans"]
+    otlp_spans = resource_spans["scopeSpans"][0]["spans"]
+    assert len(otlp_spans) == len(report["spans"])
+    archive = next(s for s in otlp_spans if s["name"] == spans.ARCHIVE)
+    assert archive["parentSpanId"] == by_name[stages.VAULT]["span_id"]
+    assert {"key": "copied", "value": {"boolValue": False}} in archive["attributes"]
+    assert int(archive["endTimeUnixNano"]) >= int(archive["startTimeUnixNano"])
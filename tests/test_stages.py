@@ -0,0 +1,47 @@
+import threading
+import time
+
+from thds.core.concurrency import contextful_threadpool_executor
+
+from cc import stages
+
+
+def _max_concurrent_in_stage(name: str, limits: stages.StageLimits, n_jobs: int) -> int:
+    lock = threading.Lock()
+    current = peak = 0
+
+    def job(_: int) -> None:
+        nonlocal current, peak
+        with stages.stage(name):
+            with lock:
+                current += 1
+                peak = max(peak, current)
+            time.sleep(0.01)
+            with lock:
+                current -= 1
+
+    with stages.limited(limits), contextful_threadpool_executor(max_workers=n_jobs) as ex:
+        list(ex.map(job, range(n_jobs)))
+    return peak
+
+
+def test_stage_limits_are_enforced_across_threads():
+    limits = stages.StageLimits(split=2, transcribe=3, llm=1)
+    assert _max_concurrent_in_stage(stages.SPLIT, limits, n_jobs=8) <= 2
+    assert _max_concurrent_in_stage(stages.LLM, limits, n_jobs=8) == 1
+
+
+def test_vault_stage_is_serialized():
+    assert _max_concurrent_in_stage(stages.VAULT, stages.StageLimits(), n_jobs=8) == 1
+
+
+def test_stage_outside_limits_does_not_block():
+    with stages.stage(stages.VAULT), stages.stage(stages.VAULT):
+        pass
+
+
+def test_fan_outs_are_sized_by_the_configured_limits():
+    assert stages.workers(stages.LLM) == stages.DEFAULT_LIMITS.llm
+    with stages.limited(stages.StageLimits(llm=2)):
+        assert stages.workers(stages.LLM) == 2
+        assert stages.workers(stages.VAULT) == 1
@@ -1,9 +1,12 @@
+import os
+import typing as ty
 from pathlib import Path
 
 import pytest
 
 from cc.vault import (
     VaultIndex,
+    VaultIndexCache,
     _find_links_to_file,
     _Link,
     _clean_context,
@@ -13,6 +16,7 @@ from cc.vault import (
     _obsidian_link_matches_target,
     build_vault_index,
     find_link_context,
+    replace_note_links,
 )
 
 
@@ -542,3 +546,67 @@ def test_link_tag_far_away_not_detected(tmp_path: Path) -> None:
     index = build_vault_index(tmp_path)
 
     assert not link_line_has_tag(index, in_md_file=note, target_file=target, tag="#diarize")
+
+
+def test_replace_note_links_keeps_edited_link_text(tmp_path: Path) -> None:
+    provisional = tmp_path / "notes" / "26-01-01_1200_recording-1-transcript.md"
+    final = tmp_path / "notes" / "talk-with-grant.md"
+    daily = tmp_path / "daily.md"
+    daily.write_text(
+        "Talked to Grant: [[notes/26-01-01_1200_recording-1-transcript|Recording 1 (transcript)]]\n"
+        "Again: [the raw one](notes/26-01-01_1200_recording-1-transcript.md)\n"
+        "Unrelated: [[notes/other.md|Other]]\n"
+    )
+
+    changed = replace_note_links(
+        tmp_path, [daily], provisional, final, "Recording 1 (transcript)", "Talk with Grant"
+    )
+
+    assert changed == [daily]
+    assert daily.read_text() == (
+        "Talked to Grant: [[notes/talk-with-grant.md|Talk with Grant]]\n"
+        "Again: [the raw one](notes/talk-with-grant.md)\n"
+        "Unrelated: [[notes/other.md|Other]]\n"
+    )
+
+
+class Test_VaultIndexCache:
+    def _tree(self, root: Path) -> None:
+        (root / "a" / "b").mkdir(parents=True)
+        (root / "top.md").write_text("")
+        (root / "a" / "note.md").write_text("")
+        (root / "a" / "b" / "Recording 1.webm").write_text("")
+
+    def test_builds_the_same_index_as_build_vault_index(self, tmp_path: Path) -> None:
+        self._tree(tmp_path)
+        assert VaultIndexCache().index(tmp_path) == build_vault_index(tmp_path)
+
+    def test_sees_files_added_renamed_and_removed_since_the_last_index(self, tmp_path: Path) -> None:
+        self._tree(tmp_path)
+        cache = VaultIndexCache()
+        cache.index(tmp_path)
+
+        (tmp_path / "a" / "b" / "Recording 2.m4a").write_text("")
+        (tmp_path / "a" / "note.md").rename(tmp_path / "a" / "renamed.md")
+        (tmp_path / "top.md").unlink()
+        (tmp_path / "a" / "new").mkdir()
+        (tmp_path / "a" / "new" / "deep.md").write_text("")
+
+        assert cache.index(tmp_path) == build_vault_index(tmp_path)
+
+    def test_does_not_relist_unchanged_directories(self, tmp_path: Path, monkeypatch) -> None:
+        self._tree(tmp_path)
+        cache = VaultIndexCache()
+        cache.index(tmp_path)
+
+        listed: list[str] = []
+        real_scandir = os.scandir
+
+        def scandir(path: Path) -> ty.Iterator[os.DirEntry[str]]:
+            listed.append(str(path))
+            return real_scandir(path)
+
+        monkeypatch.setattr(os, "scandir", scandir)
+        (tmp_path / "a" / "b" / "Recording 2.m4a").write_text("")
+        cache.index(tmp_path)
+        assert listed == [str(tmp_path / "a" / "b")]
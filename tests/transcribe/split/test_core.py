@@ -2,7 +2,11 @@ from pathlib import Path
 
 import pytest
 
-from cc.transcribe.split.core import _build_extract_audio_cmd
+from thds.core.source import Source
+
+from cc.transcribe.split import core
+from cc.transcribe.split.choose_silence_cuts import Cut
+from cc.transcribe.split.core import _build_extract_audio_cmd, _build_segment_cmd
 
 
 @pytest.mark.parametrize(
@@ -22,8 +26,70 @@ def test_maps_first_stream_for_mono_and_mixes_down_multitrack_inputs(
     cmd = _build_extract_audio_cmd(Path("/tmp/in.m4a"), Path("/tmp/out.m4a"), n_audio_streams)
 
     assert cmd == [
-        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
         "-i", "/tmp/in.m4a",
         "-vn", *expected_stream_args, "-c:a", "aac",
         "/tmp/out.m4a",
     ]
+
+
+def test_segment_cmd_reports_each_finished_chunk_on_stdout():
+    cuts = [
+        Cut(target=1200.0, chosen=1190.5, delta=-9.5),
+        Cut(target=2400.0, chosen=2401.25, delta=1.25),
+    ]
+
+    cmd = _build_segment_cmd(Path("/tmp/in dir/audio.m4a"), cuts, Path("/tmp/chunks"))
+
+    assert cmd == [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-i", "/tmp/in dir/audio.m4a",
+        "-f", "segment", "-segment_times", "1190.5,2401.25", "-reset_timestamps", "1", "-c", "copy",
+        "-segment_list", "pipe:1", "-segment_list_type", "flat",
+        "/tmp/chunks/chunk_%03d.m4a",
+    ]
+
+
+@pytest.fixture
+def segment_list(tmp_path, monkeypatch):
+    """Stands in for ffmpeg: the lines it prints as it finishes each chunk, and the chunks' volumes."""
+    lines: list[str] = []
+    silent: set[str] = set()
+
+    def iter_chunk_files(audio_file, cuts, chunks_dir):
+        for chunk_file in core._chunk_files_in_segment_list(lines, chunks_dir):
+            chunk_file.write_bytes(chunk_file.name.encode())
+            yield chunk_file
+
+    monkeypatch.setattr(core, "which_ffmpeg_or_raise", lambda: "ffmpeg")
+    monkeypatch.setattr(core, "_get_audio_duration", lambda audio_file: 3600.0)
+    monkeypatch.setattr(core, "_iter_chunk_files", iter_chunk_files)
+    monkeypatch.setattr(core, "_is_silent", lambda chunk_file: chunk_file.name in silent)
+    (tmp_path / "audio.m4a").write_bytes(b"not really audio")
+    return lines, silent
+
+
+_CUTS = [Cut(target=1200.0, chosen=1190.5, delta=-9.5), Cut(target=2400.0, chosen=2401.25, delta=1.25)]
+
+
+def test_chunks_from_the_segment_list_span_the_cuts_around_them(tmp_path, segment_list):
+    lines, silent = segment_list
+    lines += ["/elsewhere/chunk_000.m4a\n", "\n", "chunk_001.m4a\n", "chunk_002.m4a\n"]
+    silent.add("chunk_001.m4a")
+
+    chunks = list(core._iter_split_on_silence(Source.from_file(tmp_path / "audio.m4a"), _CUTS, tmp_path))
+
+    assert [(c.index, c.audio_src.path(), c.start_time, c.end_time) for c in chunks] == [
+        (0, tmp_path / "chunk_000.m4a", 0.0, 1190.5),
+        (2, tmp_path / "chunk_002.m4a", 2401.25, 3600.0),
+    ]
+
+
+def test_a_chunk_the_cuts_dont_account_for_is_an_error(tmp_path, segment_list):
+    lines, _silent = segment_list
+    lines += ["chunk_000.m4a\n", "chunk_003.m4a\n"]
+
+    chunks = core._iter_split_on_silence(Source.from_file(tmp_path / "audio.m4a"), _CUTS, tmp_path)
+    assert next(chunks).index == 0
+    with pytest.raises(AssertionError, match="chunk_003.m4a"):
+        next(chunks)
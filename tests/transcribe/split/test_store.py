@@ -0,0 +1,116 @@
+import os
+from pathlib import Path
+
+import pytest
+from thds.core.source import Source
+
+from cc.transcribe import gc
+from cc.transcribe.split import core, store
+from cc.transcribe.workdir import workdir
+
+
+@pytest.fixture
+def out_root(tmp_path: Path, monkeypatch) -> Path:
+    root = tmp_path / ".out"
+    monkeypatch.setattr(store, "_workdir_root", lambda: root)
+    monkeypatch.setattr(gc, "_workdir_root", lambda: root)
+    return root
+
+
+@pytest.fixture
+def decodes(monkeypatch) -> list[Path]:
+    """Stands in for ffmpeg: 'splits' into two chunk files, recording each decode."""
+    calls: list[Path] = []
+
+    def fake_iter_split_into(entry, input_file, every, window, silence_threshold_db):
+        calls.append(entry)
+        (entry / "chunks").mkdir(parents=True, exist_ok=True)
+        for i in range(2):
+            chunk_file = entry / "chunks" / f"chunk_{i:03d}.m4a"
+            chunk_file.write_bytes(f"chunk {i}".encode())
+            yield core.Chunk(
+                i, Source.from_file(chunk_file), start_time=i * 10.0, end_time=(i + 1) * 10.0
+            )
+
+    monkeypatch.setattr(core, "_iter_split_into", fake_iter_split_into)
+    return calls
+
+
+def _split_in(wd: Path, audio: Path, **params) -> list[core.Chunk]:
+    with workdir.set_local(wd):
+        return list(core.iter_split_audio_on_silences(Source.from_file(audio), **params))
+
+
+def test_second_pipeline_reuses_stored_chunks(tmp_path: Path, out_root: Path, decodes: list[Path]):
+    audio = tmp_path / "meeting.m4a"
+    audio.write_bytes(b"the meeting")
+
+    first = _split_in(tmp_path / "transcribe", audio)
+    second = _split_in(tmp_path / "diarize", audio)
+
+    assert len(decodes) == 1
+    assert decodes[0].is_relative_to(out_root / "split-store" / "meeting")
+    assert [c.index for c in second] == [0, 1]
+    assert [c.end_time for c in second] == [10.0, 20.0]
+    for a, b in zip(first, second):
+        assert a.audio_src.path().parent == tmp_path / "transcribe" / "chunks"
+        assert b.audio_src.path().parent == tmp_path / "diarize" / "chunks"
+        assert a.audio_src.path().samefile(b.audio_src.path())  # hardlinks, not copies
+        assert a.audio_src.hash == b.audio_src.hash
+
+
+def test_different_parameters_split_again(tmp_path: Path, out_root: Path, decodes: list[Path]):
+    audio = tmp_path / "meeting.m4a"
+    audio.write_bytes(b"the meeting")
+
+    _split_in(tmp_path / "a", audio, every=600.0)
+    _split_in(tmp_path / "b", audio, every=1200.0)
+
+    assert len(decodes) == 2
+
+
+def test_collected_split_is_not_reused(tmp_path: Path, out_root: Path, decodes: list[Path]):
+    audio = tmp_path / "meeting.m4a"
+    audio.write_bytes(b"the meeting")
+    _split_in(tmp_path / "a", audio)
+
+    (decodes[0] / "chunks" / "chunk_001.m4a").unlink()
+    assert store.load_manifest(decodes[0]) is None
+    _split_in(tmp_path / "b", audio)
+    assert len(decodes) == 2
+
+
+def _make_stale(entry: Path) -> None:
+    for path in [*entry.rglob("*"), entry]:
+        os.utime(path, (1_000, 1_000))
+
+
+def test_a_garbage_collected_split_is_split_again(tmp_path: Path, out_root: Path, decodes: list[Path]):
+    audio = tmp_path / "meeting.m4a"
+    audio.write_bytes(b"the meeting")
+    _split_in(tmp_path / "a", audio)
+    _make_stale(decodes[0])
+
+    assert gc.collect_garbage(out_root, budget_bytes=0).files_removed > 0
+    chunks = _split_in(tmp_path / "b", audio)
+
+    assert len(decodes) == 2
+    assert [c.audio_src.path().read_bytes() for c in chunks] == [b"chunk 0", b"chunk 1"]
+
+
+def test_garbage_collection_leaves_a_locked_split_alone(
+    tmp_path: Path, out_root: Path, decodes: list[Path]
+):
+    audio = tmp_path / "meeting.m4a"
+    audio.write_bytes(b"the meeting")
+    with workdir.set_local(tmp_path / "a"):
+        chunks = core.iter_split_audio_on_silences(Source.from_file(audio))
+        first = next(chunks)  # the split holds the entry's lock until it is finished
+        _make_stale(decodes[0])
+        assert gc.collect_garbage(out_root, budget_bytes=0).files_removed == 0
+        rest = list(chunks)
+
+    assert [c.index for c in [first, *rest]] == [0, 1]
+    assert store.load_manifest(decodes[0]) is not None
+    _split_in(tmp_path / "b", audio)
+    assert len(decodes) == 1
@@ -0,0 +1,164 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from cc.transcribe import gc
+from cc.transcribe.split import store
+
+
+@pytest.fixture(autouse=True)
+def _workdir_root(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(gc, "_workdir_root", lambda: tmp_path)
+
+
+def _workdir(root: Path, stem: str, last_used_s: int, chunk_bytes: int = 1000) -> Path:
+    wd = root / "transcribe" / stem / "SomeHash"
+    (wd / "chunks").mkdir(parents=True)
+    (wd / "audio.m4a").write_bytes(b"a" * chunk_bytes)
+    (wd / "chunks" / "chunk_000.m4a").write_bytes(b"c" * chunk_bytes)
+    (wd / "transcript.txt").write_text("the transcript\n")
+    for path in [*wd.rglob("*"), wd]:
+        os.utime(path, (last_used_s, last_used_s))
+    return wd
+
+
+def _store_entry(root: Path, stem: str, last_used_s: int, chunk_bytes: int = 1000) -> Path:
+    entry = root / "split-store" / stem / "SomeKey"
+    (entry / "chunks").mkdir(parents=True)
+    (entry / "audio.m4a").write_bytes(b"a" * chunk_bytes)
+    (entry / "chunks" / "chunk_000.m4a").write_bytes(b"c" * chunk_bytes)
+    (entry / "split.json").write_text("[]")
+    (entry / ".lock").touch()
+    for path in [*entry.rglob("*"), entry]:
+        os.utime(path, (last_used_s, last_used_s))
+    return entry
+
+
+def _linked_workdir(root: Path, entry: Path, last_used_s: int) -> Path:
+    """A workdir whose chunk is a hardlink into the store entry, as the split leaves it."""
+    wd = root / "transcribe" / entry.parent.name / "SomeHash"
+    (wd / "chunks").mkdir(parents=True)
+    os.link(entry / "chunks" / "chunk_000.m4a", wd / "chunks" / "chunk_000.m4a")
+    (wd / "transcript.txt").write_text("the transcript\n")
+    for path in [*wd.rglob("*"), wd]:
+        os.utime(path, (last_used_s, last_used_s))
+    return wd
+
+
+def test_evicts_least_recently_used_workdirs_first(tmp_path: Path):
+    old = _workdir(tmp_path, "old", last_used_s=1_000)
+    new = _workdir(tmp_path, "new", last_used_s=2_000)
+
+    result = gc.collect_garbage(tmp_path, budget_bytes=2500)
+
+    assert result.files_removed == 2
+    assert result.bytes_freed == 2000
+    assert sorted(p.name for p in old.rglob("*")) == ["transcript.txt"]
+    assert (new / "chunks" / "chunk_000.m4a").exists()
+
+
+def test_final_outputs_are_pinned(tmp_path: Path):
+    wd = _workdir(tmp_path, "only", last_used_s=1_000)
+    (wd / "speakers.toml").write_text("# CHUNK_0_A\n")
+    for path in (wd / "speakers.toml", wd):
+        os.utime(path, (1_000, 1_000))
+
+    result = gc.collect_garbage(tmp_path, budget_bytes=0)
+
+    assert sorted(p.name for p in wd.iterdir()) == ["speakers.toml", "transcript.txt"]
+    assert result.bytes_kept > 0
+
+
+def test_within_budget_and_dry_run_remove_nothing(tmp_path: Path):
+    wd = _workdir(tmp_path, "only", last_used_s=1_000)
+    assert gc.collect_garbage(tmp_path, budget_bytes=10**6).files_removed == 0
+    assert gc.collect_garbage(tmp_path, budget_bytes=0, dry_run=True).files_removed == 2
+    assert (wd / "chunks" / "chunk_000.m4a").exists()
+
+
+def test_recently_used_workdirs_are_kept(tmp_path: Path):
+    old = _workdir(tmp_path, "old", last_used_s=1_000)
+    recent = _workdir(tmp_path, "recent", last_used_s=int(time.time()) - 60)
+
+    result = gc.collect_garbage(tmp_path, budget_bytes=0)
+
+    assert result.files_removed == 2
+    assert sorted(p.name for p in old.rglob("*")) == ["transcript.txt"]
+    assert (recent / "chunks" / "chunk_000.m4a").exists()
+
+
+def test_only_the_given_root_is_collected(tmp_path: Path):
+    wd = _workdir(tmp_path, "only", last_used_s=1_000)
+    others = [tmp_path / "split-store" / "only" / "SomeKey" / "chunk_000.m4a"]
+    others.append(tmp_path / "profile" / "20250101T000000-1" / "split.prof")
+    for path in others:
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"x" * 1000)
+        os.utime(path, (1_000, 1_000))
+
+    result = gc.collect_garbage(tmp_path / "transcribe", budget_bytes=0)
+
+    assert result.files_removed == 2
+    assert sorted(p.name for p in wd.rglob("*")) == ["transcript.txt"]
+    assert all(path.exists() for path in others)
+
+
+def test_old_profiles_are_collected(tmp_path: Path):
+    dump = tmp_path / "profile" / "20250101T000000-1" / "meeting" / "01-split.pstats"
+    dump.parent.mkdir(parents=True)
+    dump.write_bytes(b"x" * 1000)
+    for path in (dump, dump.parent):
+        os.utime(path, (1_000, 1_000))
+
+    result = gc.collect_garbage(tmp_path, budget_bytes=0)
+
+    assert result.bytes_freed == 1000
+    assert list(dump.parent.iterdir()) == []
+
+
+def test_hardlinked_chunks_are_freed_only_with_their_last_link(tmp_path: Path):
+    entry = _store_entry(tmp_path, "meeting", last_used_s=2_000)
+    wd = _linked_workdir(tmp_path, entry, last_used_s=1_000)
+    stored_bytes = sum(p.stat().st_size for p in entry.rglob("*") if p.is_file())
+    transcript_bytes = (wd / "transcript.txt").stat().st_size
+
+    # the chunk is on disk once, so it is counted once
+    assert gc.collect_garbage(tmp_path, budget_bytes=10**6).bytes_kept == stored_bytes + transcript_bytes
+
+    # dropping the workdir's link frees nothing, so the store entry has to go too
+    result = gc.collect_garbage(tmp_path, budget_bytes=stored_bytes + transcript_bytes - 1)
+
+    assert result.files_removed == 4  # the workdir's link, the transcode, the chunk, split.json
+    assert result.bytes_freed == stored_bytes
+    assert result.bytes_kept == transcript_bytes
+    assert sorted(p.name for p in wd.rglob("*")) == ["transcript.txt"]
+    assert sorted(p.name for p in entry.rglob("*")) == [".lock"]
+    assert store.load_manifest(entry) is None
+
+
+def test_locked_store_entries_are_skipped(tmp_path: Path):
+    entry = _store_entry(tmp_path, "meeting", last_used_s=1_000)
+    with store.locked(entry):
+        os.utime(entry, (1_000, 1_000))  # locked long ago, and still held
+        result = gc.collect_garbage(tmp_path, budget_bytes=0)
+
+    assert result.files_removed == 0
+    assert (entry / "split.json").exists()
+    for path in (entry / ".lock", entry):
+        os.utime(path, (1_000, 1_000))
+    assert gc.collect_garbage(tmp_path, budget_bytes=0).files_removed == 3
+
+
+def test_refuses_a_root_outside_the_workdir_root(tmp_path: Path):
+    with pytest.raises(ValueError, match="not inside the workdir root"):
+        gc.collect_garbage(tmp_path.parent, budget_bytes=0)
+    with pytest.raises(SystemExit):
+        gc.main(["--root", str(tmp_path.parent)])
+
+
+def test_parse_size():
+    assert gc.parse_size("1234") == 1234
+    assert gc.parse_size("500M") == 500 * 2**20
+    assert gc.parse_size("1.5GiB") == int(1.5 * 2**30)
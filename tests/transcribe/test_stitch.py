@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pytest
+from thds.core.source import Source
+
+from cc.transcribe.core import transcribe_audio_file
+from cc.transcribe.llm.repair_stitch_boundary import only_whitespace_case_punctuation_changed
+from cc.transcribe.llm.transcribe_chunks import ChunkTranscript
+from cc.transcribe.stitch import (
+    _paragraphize,
+    _single_chunk,
+    _stitch_at_boundaries,
+)
+
+
+class TestOnlyWhitespaceCasePunctuationChanged:
+    def test_accepts_punctuation_and_case_fixes(self):
+        assert only_whitespace_case_punctuation_changed(
+            "and then we. went home so", "And then we went home. So"
+        )
+
+    def test_rejects_changed_words(self):
+        assert not only_whitespace_case_punctuation_changed("we went home", "we walked home")
+
+    def test_rejects_dropped_words(self):
+        assert not only_whitespace_case_punctuation_changed("um we went home", "We went home.")
+
+
+class TestStitchAtBoundaries:
+    def test_only_seams_are_sent_for_repair(self):
+        seen: list[str] = []
+
+        def repair(text: str) -> str:
+            seen.append(text)
+            return text.upper()
+
+        parts = ["one two three four five six", "seven eight nine ten", "eleven twelve"]
+        result = _stitch_at_boundaries(parts, repair, window_words=2)
+
+        assert seen == ["five six seven eight", "nine ten eleven"]
+        assert result == "one two three four FIVE SIX SEVEN EIGHT NINE TEN ELEVEN twelve"
+
+    def test_repair_that_changes_words_is_discarded(self):
+        result = _stitch_at_boundaries(
+            ["the end of. one", "chunk and the start"], lambda _: "something else entirely"
+        )
+        assert result == "the end of. one chunk and the start"
+
+    def test_single_part_needs_no_repair(self):
+        def repair(text: str) -> str:
+            raise AssertionError("should not be called")
+
+        assert _stitch_at_boundaries(["just  one\nchunk"], repair) == "just one chunk"
+
+    def test_seams_between_one_word_parts_are_joined_locally(self):
+        seen: list[str] = []
+
+        def repair(text: str) -> str:
+            seen.append(text)
+            return text
+
+        result = _stitch_at_boundaries(["one", "two", "three four five six"], repair, window_words=2)
+
+        assert seen == ["three four"]
+        assert result == "one two three four five six"
+
+
+class TestParagraphize:
+    def test_breaks_at_sentence_ends(self):
+        text = "First sentence here. Second one! Third? Fourth."
+        assert _paragraphize(text, max_chars=19) == (
+            "First sentence here.\n\nSecond one! Third?\n\nFourth."
+        )
+
+    def test_short_text_is_one_paragraph(self):
+        assert _paragraphize("Hello there. General Kenobi.") == "Hello there. General Kenobi."
+
+
+def test_a_single_chunk_is_the_transcript_as_is(tmp_path: Path) -> None:
+    audio = tmp_path / "chunk_000.m4a"
+    audio.write_bytes(b"not really audio")
+    text = "First sentence here. " * 50
+    out_txt = tmp_path / "transcript.txt"
+
+    single = _single_chunk([ChunkTranscript(0, text, Source.from_file(audio))], out_txt)
+
+    assert single is not None and single.path() == out_txt
+    assert out_txt.read_text() == text.strip() + "\n"  # not broken into paragraphs
+
+
+def test_an_unknown_stitch_mode_fails_before_transcribing(tmp_path: Path) -> None:
+    audio = tmp_path / "Recording 1.m4a"
+    audio.write_bytes(b"not really audio")
+    with pytest.raises(ValueError, match="stitch_mode"):
+        transcribe_audio_file(audio, stitch_mode="seams")
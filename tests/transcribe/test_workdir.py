@@ -0,0 +1,50 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from cc.transcribe import workdir as workdir_module
+from cc.transcribe.workdir import bound_workdir, workdir
+
+
+@pytest.fixture
+def out_root(tmp_path: Path, monkeypatch) -> Path:
+    root = tmp_path / ".out"
+    monkeypatch.setattr(workdir_module, "_workdir_root", lambda: root)
+    return root
+
+
+def test_bound_workdir_is_created_and_unbound_afterwards(tmp_path: Path, out_root: Path):
+    audio = tmp_path / "Recording 1.m4a"
+    audio.write_bytes(b"one")
+    before = workdir()
+
+    with bound_workdir(audio, "transcribe") as wd:
+        assert wd.is_dir()
+        assert wd.is_relative_to(out_root / "transcribe" / "Recording-1")
+        assert workdir() == wd
+
+    assert workdir() == before
+
+
+def test_concurrent_recordings_get_their_own_workdirs(tmp_path: Path, out_root: Path):
+    audios = []
+    for i in range(4):
+        audios.append(tmp_path / f"Recording {i}.m4a")
+        audios[-1].write_bytes(str(i).encode())
+    all_bound = threading.Barrier(len(audios))
+    seen: dict[Path, Path] = {}
+
+    def transcribe(audio: Path) -> None:
+        with bound_workdir(audio, "transcribe"):
+            all_bound.wait(timeout=5)  # every thread has bound its own workdir by now
+            seen[audio] = workdir()
+
+    threads = [threading.Thread(target=transcribe, args=(a,)) for a in audios]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(seen.values())) == len(audios)
+    assert all(seen[a].parent.name == a.stem.replace(" ", "-") for a in audios)